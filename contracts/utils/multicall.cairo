@@ -0,0 +1,49 @@
+# Multicall
+#   Executes many view calls in one call, so off chain readers need a single
+#   round-trip to the gateway for a whole batch (see realms_cli multicall.py).
+#
+# MIT License
+
+%lang starknet
+
+from starkware.cairo.common.alloc import alloc
+from starkware.cairo.common.memcpy import memcpy
+from starkware.starknet.common.syscalls import call_contract
+
+# Calls are packed one after the other as [to, selector, calldata_len, *calldata],
+# their results come back in the same order as [result_len, *result].
+@view
+func aggregate{syscall_ptr : felt*, range_check_ptr}(calls_len : felt, calls : felt*) -> (
+    result_len : felt, result : felt*
+):
+    alloc_locals
+    let (local result : felt*) = alloc()
+    let (result_len) = _aggregate(calls_len, calls, 0, result)
+    return (result_len, result)
+end
+
+func _aggregate{syscall_ptr : felt*, range_check_ptr}(
+    calls_len : felt, calls : felt*, result_len : felt, result : felt*
+) -> (result_len : felt):
+    alloc_locals
+    if calls_len == 0:
+        return (result_len)
+    end
+
+    let calldata_len = calls[2]
+    let (retdata_size, retdata) = call_contract(
+        contract_address=calls[0],
+        function_selector=calls[1],
+        calldata_size=calldata_len,
+        calldata=calls + 3,
+    )
+    assert result[result_len] = retdata_size
+    memcpy(result + result_len + 1, retdata, retdata_size)
+
+    return _aggregate(
+        calls_len - 3 - calldata_len,
+        calls + 3 + calldata_len,
+        result_len + 1 + retdata_size,
+        result,
+    )
+end
@@ -1,7 +1,6 @@
 from realms_cli.caller_invoker import wrapped_call, wrapped_send, compile, deploy
-from realms_cli.deployer import logged_deploy
+from realms_cli.deployer import logged_deploy, wait_for_deploys
 from realms_cli.config import Config, strhex_as_strfelt, safe_load_deployment
-import time
 from realms_cli.shared import uint
 
 
@@ -29,8 +28,7 @@ def run(nre):
     #     ]
     # )
 
-    # print('🕒 Waiting for deploy before invoking... 3 minutes for testnet')
-    time.sleep(180)
+    wait_for_deploys(nre)
 
     # wrapped_send(
     #     network=config.nile_network,
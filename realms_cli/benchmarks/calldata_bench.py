@@ -0,0 +1,53 @@
+"""Encodes and decodes Uint256 arrays of growing size with the calldata builder.
+
+The old `sum([...], ())` flattening is quadratic, so it is only timed up to
+--legacy-max elements:
+
+    python realms_cli/benchmarks/calldata_bench.py --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from realms_cli.calldata import Calldata, CalldataReader
+
+
+def legacy_expanded_uint_list(arr):
+    return list(sum([(a, 0) for a in arr], ()))
+
+
+def best_of(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        values = [rng.getrandbits(120) for _ in range(size)]
+        data = Calldata().uint256_array(values).to_list()
+
+        encode = best_of(lambda: Calldata().uint256_array(values).to_list(), args.repeat)
+        decode = best_of(lambda: CalldataReader(data).uint256_array(), args.repeat)
+        line = (
+            f"n={size:<9} encode={encode * 1000:9.2f}ms ({size / encode / 1e6:5.2f}M/s) "
+            f"decode={decode * 1000:9.2f}ms ({size / decode / 1e6:5.2f}M/s)"
+        )
+        if size <= args.legacy_max:
+            legacy = best_of(lambda: legacy_expanded_uint_list(values), 1)
+            line += f" legacy={legacy * 1000:9.2f}ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Battles per second of the batch combat simulator vs one battle at a time.
+
+Simulates an even matchup (the default squad against itself) and a lopsided
+one, all battles at once, and the same number of single battle runs for a
+baseline. Run from the repo root:
+
+    python realms_cli/benchmarks/combat_sim_bench.py --battles 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from realms_cli.combat_sim import build_squad, run_battles, simulate, unpack_squads
+
+PIKEMAN, KNIGHT, PALADIN = 4, 5, 6
+DEFAULT_SQUAD = [PIKEMAN] * 9 + [KNIGHT] * 5 + [PALADIN]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--battles", type=int, default=10000)
+    parser.add_argument("--single", type=int, default=200, help="battles run one at a time for the baseline")
+    args = parser.parse_args()
+
+    strong, weak = build_squad(DEFAULT_SQUAD), build_squad(DEFAULT_SQUAD[:7])
+    for name, attacker, defender in [("even", strong, strong), ("lopsided", strong, weak)]:
+        start = time.perf_counter()
+        battles = simulate(attacker, defender, battles=args.battles, seed=1)
+        batch = time.perf_counter() - start
+        summary = battles.summary()
+
+        source = np.random.PCG64(1)
+        a, d = unpack_squads(attacker), unpack_squads(defender)
+        start = time.perf_counter()
+        for _ in range(args.single):
+            run_battles(a, d, source)
+        single = (time.perf_counter() - start) / args.single
+
+        print(f"{name:<9} batch {args.battles / batch:10.0f} battles/s ({batch:6.2f}s)  "
+              f"one at a time {1 / single:8.0f} battles/s  "
+              f"attacker wins {summary['attacker_wins']:.3f}  mean steps {summary['mean_steps']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Decoding and geometry of every crypt layout in data/crypts.json.
+
+Compares a per crypt decode and breadth first search against the batch
+decoder, and the batch decoder against reading the cached artifact. Run from
+the repo root:
+
+    python realms_cli/benchmarks/crypt_layouts_bench.py -n 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+
+from realms_cli.crypt_layouts import CRYPTS, build, load_layouts
+
+
+def per_crypt(crypts):
+    """Largest floor component of each crypt, one hex string and grid at a time."""
+    largest = {}
+    for id, crypt in crypts.items():
+        if crypt is None:
+            continue
+        size = crypt["size"]
+        bits = bin(int(crypt["layout"], 16))[2:].zfill(4 * (len(crypt["layout"]) - 2))
+        floor = {(i // size, i % size) for i in range(size * size) if bits[i] == "1"}
+        best = 0
+        while floor:
+            queue, count = deque([floor.pop()]), 0
+            while queue:
+                y, x = queue.popleft()
+                count += 1
+                for cell in ((y + 1, x), (y - 1, x), (y, x + 1), (y, x - 1)):
+                    if cell in floor:
+                        floor.remove(cell)
+                        queue.append(cell)
+            best = max(best, count)
+        largest[int(id)] = best
+    return largest
+
+
+def batch(crypts):
+    layouts = build(crypts)
+    return dict(zip(layouts.ids.tolist(), layouts.stats["largest_component"].tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(CRYPTS) as f:
+        crypts = json.load(f)
+    results = {}
+    for name, function in [("per crypt decode + bfs", per_crypt), ("batch decode + labels", batch)]:
+        seconds = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            results[name] = function(crypts)
+            seconds.append(time.perf_counter() - start)
+        print(f"{name:<24} crypts={len(results[name]):<5} median={statistics.median(seconds) * 1000:9.2f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "crypts_layouts.npz")
+        load_layouts(CRYPTS, cache)
+        seconds = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            load_layouts(CRYPTS, cache)
+            seconds.append(time.perf_counter() - start)
+        print(f"{'cached artifact':<24} crypts={len(results[name]):<5} median={statistics.median(seconds) * 1000:9.2f}ms")
+
+    if len({json.dumps(result, sort_keys=True) for result in results.values()}) != 1:
+        print("the batch labels differ from the per crypt search")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Throughput and peak memory of packing every crypt of data/crypts.json.
+
+Compares loading the whole file and calling map_crypt per crypt against the
+streaming pipeline, which parses, packs and writes one crypt at a time. Peak
+memory is measured with tracemalloc, so absolute times are inflated for both.
+Run from the repo root:
+
+    python realms_cli/benchmarks/crypt_pipeline_bench.py -n 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from realms_cli.binary_converter import map_crypt
+from realms_cli.crypt_pipeline import CRYPTS, load_tables, pack_crypts_file
+
+
+def whole_file(dst):
+    environments, affinities = load_tables()
+    with open(CRYPTS) as f:
+        crypts = json.load(f)
+    packed = [{id: map_crypt(crypt, environments, affinities)} for id, crypt in crypts.items() if crypt is not None]
+    with open(dst, "w") as f:
+        f.write(json.dumps(packed, indent=4))
+    return len(crypts)
+
+
+def streamed(dst):
+    stats = pack_crypts_file(dst=dst)
+    return stats["crypts"] + stats["skipped"]
+
+
+def measure(function, dst, n):
+    seconds = []
+    for _ in range(n):
+        start = time.perf_counter()
+        count = function(dst)
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(dst)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for name, function in [("json.load + map_crypt", whole_file), ("streaming pipeline", streamed)]:
+            dst = os.path.join(tmp, name.split()[0] + ".json")
+            count, seconds, peak = measure(function, dst, args.n)
+            median = statistics.median(seconds)
+            print(
+                f"{name:<22} crypts={count:<5} median={median * 1000:9.2f}ms "
+                f"throughput={count / median:9.0f}/s peak={peak / 1e6:6.2f}MB"
+            )
+            with open(dst) as f:
+                outputs[name] = f.read()
+    if len(set(outputs.values())) != 1:
+        print("the pipeline output differs from map_crypt")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compares the in-process gateway client with spawning `nile call` per read.
+
+Run from the repo root against any node nile can reach, e.g. a devnet:
+
+    python realms_cli/benchmarks/gateway_bench.py --network localhost --alias proxy_realms \
+        --function balanceOf --arguments 0x123 -n 20
+"""
+import argparse
+import statistics
+import time
+
+from realms_cli.caller_invoker import call, nile_call
+
+
+def timed(fn, n, *args):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name, samples):
+    print(
+        f"{name:<12} n={len(samples):<4} "
+        f"mean={statistics.mean(samples) * 1000:9.2f}ms "
+        f"median={statistics.median(samples) * 1000:9.2f}ms "
+        f"total={sum(samples):7.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--network", default="localhost")
+    parser.add_argument("--alias", default="proxy_realms")
+    parser.add_argument("--function", default="balanceOf")
+    parser.add_argument("--arguments", nargs="*", default=["0x0"])
+    parser.add_argument("-n", type=int, default=20)
+    parser.add_argument("--skip-subprocess", action="store_true")
+    args = parser.parse_args()
+
+    call_args = (args.network, args.alias, args.function, args.arguments)
+
+    # first request opens the pooled connection, keep it out of the samples
+    call(*call_args)
+    in_process = timed(call, args.n, *call_args)
+    report("in-process", in_process)
+
+    if not args.skip_subprocess:
+        subprocess_ = timed(nile_call, args.n, *call_args)
+        report("subprocess", subprocess_)
+        print(f"speedup: {statistics.mean(subprocess_) / statistics.mean(in_process):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measures what `nile <command>` pays for loading the realms_cli plugin modules.
+
+nile imports every module registered under `nile_plugins` before running any
+command, so their import time is paid by all of them. Each sample imports the
+modules in a fresh interpreter with `-X importtime`; the run fails when the
+median exceeds the budget or when a module that only commands need at run
+time (nile's Account, the signer, cairo-lang's abi) got imported eagerly.
+Run from the repo root:
+
+    python realms_cli/benchmarks/import_bench.py -n 10 --budget-ms 500
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PYPROJECT = os.path.join(os.path.dirname(__file__), os.pardir, "pyproject.toml")
+
+# loaded on first use by the commands, never at plugin import
+DEFERRED = [
+    "nile.core.account",
+    "nile.signer",
+    "ecdsa",
+    "starkware.starknet.public.abi",
+    "starkware.crypto.signature.signature",
+]
+
+SAMPLE = """
+import sys
+# the repo root has a realms_cli directory of its own, import the installed one
+if "" in sys.path:
+    sys.path.remove("")
+{imports}
+eager = [name for name in {deferred!r} if name in sys.modules]
+if eager:
+    print("eager: " + ", ".join(eager))
+"""
+
+
+def plugin_modules(pyproject=PYPROJECT) -> list:
+    """Modules of the commands registered as nile plugins."""
+    with open(pyproject) as f:
+        text = f.read()
+    section = text.split('[tool.poetry.plugins."nile_plugins"]', 1)[1].split("\n[", 1)[0]
+    targets = re.findall(r'^"[^"]+"\s*=\s*"([\w.]+)"', section, re.M)
+    return sorted({target.rsplit(".", 1)[0] for target in targets})
+
+
+def sample(modules) -> tuple:
+    """(cumulative import microseconds per module, eagerly imported deferred modules)."""
+    code = SAMPLE.format(
+        imports="\n".join(f"import {module}" for module in modules), deferred=DEFERRED
+    )
+    run = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in run.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match and not match.group(2):
+            times[match.group(3)] = int(match.group(1))
+    eager = []
+    for line in run.stdout.splitlines():
+        if line.startswith("eager: "):
+            eager = line[len("eager: "):].split(", ")
+    return times, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=500.0,
+                        help="maximum median import time of all plugin modules together")
+    args = parser.parse_args()
+
+    modules = plugin_modules()
+    totals, per_module, eager = [], {}, set()
+    for _ in range(args.n):
+        times, eager_modules = sample(modules)
+        # top level entries are what each import added on top of the ones before it,
+        # interpreter startup (site, encodings) is left out
+        totals.append(sum(t for name, t in times.items() if name.startswith("realms_cli")) / 1000)
+        for module in modules:
+            per_module.setdefault(module, []).append(times.get(module, 0) / 1000)
+        eager.update(eager_modules)
+
+    for module in modules:
+        print(f"{module:<32} median={statistics.median(per_module[module]):9.2f}ms")
+    total = statistics.median(totals)
+    print(f"{'all plugin modules':<32} median={total:9.2f}ms budget={args.budget_ms:.0f}ms")
+
+    failed = False
+    if eager:
+        print(f"imported at plugin load, should be deferred: {', '.join(sorted(eager))}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"over budget by {total - args.budget_ms:.2f}ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
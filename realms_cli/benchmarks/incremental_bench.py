@@ -0,0 +1,85 @@
+"""Full vs incremental regeneration of the packed crypt (and realm) stores.
+
+Copies the sources to a temporary directory, then times a full pass, a rerun
+with nothing changed and reruns after changing one record. Every incremental
+store must be byte for byte the store of a full pass. Realms are included when
+data/realms.json exists. Run from the repo root:
+
+    python realms_cli/benchmarks/incremental_bench.py -n 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from realms_cli.incremental import CRYPTS, REALMS, regenerate_crypts, regenerate_realms
+
+
+def edit(path, round):
+    """Changes one record, the way a metadata fix would."""
+    with open(path) as f:
+        records = json.load(f)
+    id = sorted((id for id, record in records.items() if record), key=int)[len(records) // 2]
+    record = records[id]
+    if "size" in record:
+        record["size"] = 8 + round % 17
+    else:
+        for attribute in record["attributes"]:
+            if attribute["trait_type"] == "Cities":
+                attribute["value"] = 1 + round % 20
+    with open(path, "w") as f:
+        f.write(json.dumps(records, separators=(",", ":")))
+
+
+def bench(name, regenerate, src, tmp, n):
+    source = os.path.join(tmp, os.path.basename(src))
+    shutil.copy(src, source)
+    store = os.path.join(tmp, name + ".bin")
+    full = os.path.join(tmp, name + ".full.bin")
+
+    def timed(dst):
+        start = time.perf_counter()
+        stats = regenerate(source, dst)
+        return time.perf_counter() - start, stats
+
+    runs = {"full pass": [], "nothing changed": [], "one record changed": []}
+    for round in range(n):
+        for path in (full, full + ".manifest.json"):
+            if os.path.exists(path):
+                os.remove(path)
+        runs["full pass"].append(timed(full)[0])
+        runs["nothing changed"].append(timed(store)[0])
+        edit(source, round)
+        seconds, stats = timed(store)
+        runs["one record changed"].append(seconds)
+        for path in (full, full + ".manifest.json"):
+            os.remove(path)
+        timed(full)
+        with open(store, "rb") as f, open(full, "rb") as g:
+            if f.read() != g.read():
+                print(f"{name}: the incremental store differs from a full pass")
+                sys.exit(1)
+    for label, seconds in runs.items():
+        print(f"{name:<7} {label:<20} median={statistics.median(seconds) * 1000:9.2f}ms")
+    print(f"{name:<7} last edit packed {stats['packed']} of {stats['records']} records")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("crypts", regenerate_crypts, CRYPTS, tmp, args.n)
+        if os.path.exists(REALMS):
+            bench("realms", regenerate_realms, REALMS, tmp, args.n)
+        else:
+            print(f"{REALMS} not found, realms skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Packs the metadata of all 8000 realms with map_realm and with pack_realms.
+
+Both outputs must be identical. Uses data/realms.json when it exists;
+otherwise the realm metadata is rebuilt from data/realms_bit.json. Run from
+the repo root:
+
+    python realms_cli/benchmarks/realm_pack_bench.py -n 5
+    python realms_cli/benchmarks/realm_pack_bench.py --write   # regenerate data/realms_bit.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from realms_cli.binary_converter import map_realm, pack_realms
+
+REALMS_BIT = "data/realms_bit.json"
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def realms_from_bits(stored, resources, wonders, orders):
+    """Realm metadata map_realm packs into the stored values (resource ids sorted)."""
+    names = {r["id"]: r["trait"] for r in resources}
+    order_names = {o["id"]: o["name"] for o in orders}
+    realms = {}
+    for entry in stored:
+        (id, packed), = entry.items()
+        meta = packed.to_bytes(16, "little")
+        slots = max(meta[4], 7)
+        attributes = [
+            {"trait_type": trait_type, "value": value}
+            for trait_type, value in zip(["Regions", "Cities", "Harbors", "Rivers"], meta[:4])
+        ]
+        attributes += [{"trait_type": "Resource", "value": names[i]} for i in meta[5:5 + meta[4]]]
+        wonder, order = meta[5 + slots], meta[6 + slots]
+        if wonder:
+            attributes.append({"trait_type": "Wonder (translated)", "value": wonders[wonder - 1]["trait"]})
+        attributes.append({"trait_type": "Order", "value": f"The Order of {order_names[order]}"})
+        realms[id] = {"attributes": attributes}
+    return realms
+
+
+def timed(function, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        out = function()
+        samples.append(time.perf_counter() - start)
+    return out, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=5)
+    parser.add_argument("--write", action="store_true", help=f"write the packed realms to {REALMS_BIT}")
+    args = parser.parse_args()
+
+    resources = load("data/resources.json")
+    wonders = load("data/wonders.json")
+    orders = load("data/orders.json")
+    if os.path.exists("data/realms.json"):
+        realms = load("data/realms.json")
+    else:
+        print("data/realms.json not found, rebuilding realm metadata from " + REALMS_BIT)
+        realms = realms_from_bits(load(REALMS_BIT), resources, wonders, orders)
+
+    def one_by_one():
+        return [{id: map_realm(realms[id], resources, wonders, orders)} for id in sorted(realms, key=int)]
+
+    expected, reference = timed(one_by_one, args.n)
+    packed, batch = timed(lambda: pack_realms(realms, resources, wonders, orders), args.n)
+    for name, column in [("map_realm", reference), ("pack_realms", batch)]:
+        print(
+            f"{name:<12} realms={len(realms):<5} n={len(column):<3} "
+            f"mean={statistics.mean(column) * 1000:9.2f}ms "
+            f"median={statistics.median(column) * 1000:9.2f}ms"
+        )
+    print(f"speedup      {statistics.median(reference) / statistics.median(batch):.1f}x")
+
+    output = json.dumps(packed, indent=4)
+    if output != json.dumps(expected, indent=4):
+        print("pack_realms output differs from map_realm")
+        sys.exit(1)
+    with open(REALMS_BIT) as f:
+        stored = f.read()
+    print(f"{REALMS_BIT} is {'up to date' if stored == output else 'stale'}")
+    if args.write:
+        with open(REALMS_BIT, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
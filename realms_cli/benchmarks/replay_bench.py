@@ -0,0 +1,87 @@
+"""Client side time of a command, replayed offline from a cassette.
+
+Record the gateway traffic of one run against the network once, then time
+replays of it: no network, no subprocess, only what the CLI itself costs.
+Run from the repo root, where the <network>.deployments.txt files live:
+
+    python realms_cli/benchmarks/replay_bench.py --record get_all_rates
+    python realms_cli/benchmarks/replay_bench.py get_all_rates -n 50
+    python realms_cli/benchmarks/replay_bench.py check_lords --args "--address 0x04ad..." -n 50
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import shlex
+import statistics
+import sys
+import time
+
+# the repo root has a realms_cli directory of its own, import the installed one
+if "" in sys.path:
+    sys.path.remove("")
+
+COMMANDS = {
+    "get_all_rates": "realms_cli.exchange.trade",
+    "get_all_buy_price": "realms_cli.exchange.trade",
+    "get_owned": "realms_cli.player.settle",
+    "check_resources": "realms_cli.player.resources",
+    "check_lords": "realms_cli.player.lords",
+}
+
+
+def run(command, args):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        command.main(args, standalone_mode=False)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--args", default="", help="arguments of the command, quoted")
+    parser.add_argument("--network", default="goerli")
+    parser.add_argument("--cassette", default=None)
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("-n", type=int, default=20)
+    args = parser.parse_args()
+
+    from realms_cli import caller_invoker
+
+    command = getattr(importlib.import_module(COMMANDS[args.command]), args.command)
+    command_args = shlex.split(args.args) + ["--network", args.network]
+    path = args.cassette or f"{args.command}.{args.network}.cassette"
+
+    if args.record:
+        cassette = caller_invoker.use_cassette(path, "record")
+        run(command, command_args)
+        cassette.close()
+        print(f"recorded {cassette.recorded} response(s) to {path}")
+        return
+
+    expected = None
+    samples = []
+    for _ in range(args.n):
+        # cached reads would skip the replayed requests
+        caller_invoker.READ_CACHE.invalidate(args.network)
+        cassette = caller_invoker.use_cassette(path)
+        start = time.perf_counter()
+        output = run(command, command_args)
+        samples.append(time.perf_counter() - start)
+        cassette.close()
+        if expected is None:
+            expected = output
+        elif output != expected:
+            raise SystemExit("replays printed different outputs")
+
+    print(
+        f"{args.command} n={len(samples)} requests/run={cassette.served} "
+        f"mean={statistics.mean(samples) * 1000:.2f}ms "
+        f"median={statistics.median(samples) * 1000:.2f}ms "
+        f"min={min(samples) * 1000:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Forecast of the resources claimed by every realm over N day cycles.
+
+Reads the resource ids of all realms from data/realms_bit.bin, draws a
+random staked state (time staked, vault staked, houses) and times the batch
+forecast against claim_resources run one realm at a time, then checks both
+mint the same. Run from the repo root:
+
+    python realms_cli/benchmarks/resource_production_bench.py --days 365
+"""
+import argparse
+import time
+
+import numpy as np
+
+from realms_cli.packed_store import REALMS_STORE, PackedStore
+from realms_cli.resource_production import DAY, claim_resources, forecast_claims, realm_resources
+
+BUDGET = 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--claim-every", type=int, default=1)
+    parser.add_argument("--single", type=int, default=200, help="realms forecast one at a time for the baseline")
+    args = parser.parse_args()
+
+    with PackedStore(REALMS_STORE) as store:
+        resources = realm_resources(store.slots())
+    rng = np.random.default_rng(25)
+    n = len(resources)
+    start = 10 ** 9
+    time_staked = start - rng.integers(0, 10 * DAY, n)
+    vault_staked = start - rng.integers(0, 10 * DAY, n)
+    houses = rng.integers(0, 6, n)
+
+    begin = time.perf_counter()
+    forecast = forecast_claims(start, args.days, time_staked, vault_staked, resources, houses, args.claim_every)
+    batch = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    for realm in range(args.single):
+        state = time_staked[realm:realm + 1], vault_staked[realm:realm + 1]
+        minted = 0
+        for now in forecast.times:
+            amounts, *state = claim_resources(now, *state, resources[realm:realm + 1], houses[realm:realm + 1])
+            minted += amounts
+        assert (minted == forecast.per_realm[realm]).all(), f"realm {realm + 1} differs from the forecast"
+    single = (time.perf_counter() - begin) / args.single
+
+    print(f"{n} realms over {args.days} days, {len(forecast.times)} claims each")
+    print(f"batch         {batch * 1000:9.1f}ms {'within' if batch < BUDGET else 'over'} the {BUDGET:.0f}s budget")
+    print(f"one at a time {single * n:9.1f}s estimated from {args.single} realms")
+    print(f"minted        {forecast.total().sum():,} resources")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measures what a trivial command pays before doing any real work.
+
+Each sample runs in a fresh interpreter: importing a command module, building
+its Config and reading the one address the command needs (what
+`get_unit_cost` does before its call). Run from the repo root, where the
+<network>.deployments.txt files live:
+
+    python realms_cli/benchmarks/startup_bench.py --network goerli -n 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SAMPLE = """
+import json, sys, time
+# the repo root has a realms_cli directory of its own, import the installed one
+sys.path.remove("")
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from realms_cli.config import Config
+config = Config({network!r})
+constructed = time.perf_counter()
+config.{attribute}
+resolved = time.perf_counter()
+print(json.dumps([imported - start, constructed - imported, resolved - constructed]))
+"""
+
+
+def sample(module, network, attribute):
+    code = SAMPLE.format(module=module, network=network, attribute=attribute)
+    out = subprocess.check_output([sys.executable, "-c", code], stderr=subprocess.DEVNULL)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--network", default="goerli")
+    parser.add_argument("--module", default="realms_cli.player.combat")
+    parser.add_argument("--attribute", default="L06_COMBAT_PROXY_ADDRESS")
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [sample(args.module, args.network, args.attribute) for _ in range(args.n)]
+    for i, name in enumerate(["import", "Config()", "first address"]):
+        column = [s[i] for s in samples]
+        print(
+            f"{name:<14} n={len(column):<4} "
+            f"mean={statistics.mean(column) * 1000:9.2f}ms "
+            f"median={statistics.median(column) * 1000:9.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Draws per second of the batched xoroshiro128** vs calling next() in a loop.
+
+Checks the start of every batch against next() of a generator with the same
+seed, then times batches of growing size, the scalar loop and a 2**64
+jump-ahead. Run from the repo root:
+
+    python realms_cli/benchmarks/xoroshiro_bench.py -n 3
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from realms_cli.xoroshiro import Xoroshiro
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def timed(function, n):
+    seconds = []
+    for _ in range(n):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0x10AF)
+    parser.add_argument("--scalar", type=int, default=100_000, help="draws of the next() loop")
+    args = parser.parse_args()
+
+    for size in SIZES:
+        single = Xoroshiro(args.seed)
+        if Xoroshiro(args.seed).random_raw(size)[:1000].tolist() != [single.next() for _ in range(1000)]:
+            print(f"batch of {size} differs from next()")
+            sys.exit(1)
+        seconds = timed(lambda: Xoroshiro(args.seed).random_raw(size), args.n)
+        print(f"batch  {size:>10} draws {seconds * 1000:9.2f}ms {size / seconds / 1e6:8.2f}M draws/s")
+
+    def loop():
+        rng = Xoroshiro(args.seed)
+        for _ in range(args.scalar):
+            rng.next()
+
+    seconds = timed(loop, args.n)
+    print(f"next() {args.scalar:>10} draws {seconds * 1000:9.2f}ms {args.scalar / seconds / 1e6:8.2f}M draws/s")
+    seconds = timed(lambda: Xoroshiro(args.seed).jump(2**64), args.n)
+    print(f"jump(2**64)            {seconds * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 from collections import namedtuple
-from realms_cli.deployer import logged_deploy
-from realms_cli.caller_invoker import wrapped_send, declare
+from realms_cli.deployer import logged_declare, logged_deploy, wait_for_deploys
+from realms_cli.caller_invoker import wrapped_send
 from realms_cli.config import Config, strhex_as_strfelt, safe_load_deployment
-import time
 
 Contracts = namedtuple('Contracts', 'alias contract_name')
 
@@ -40,6 +39,14 @@ def run(nre):
     # )
     # module, _ = safe_load_deployment("arbiter", nre.network)
 
+    # batches the view calls of realms_cli's Multicall
+    logged_deploy(
+        nre,
+        "multicall",
+        alias="multicall",
+        arguments=[],
+    )
+
     # logged_deploy(
     #     nre,
     #     "ModuleController",
@@ -74,7 +81,7 @@ def run(nre):
             alias=contract.alias,
             arguments=[],
         )
-        declare(contract.contract_name, contract.alias)
+        logged_declare(nre, contract.contract_name, contract.alias)
 
     #---------------- PROXY  ----------------#
     for contract in MODULE_CONTRACT_IMPLEMENTATIONS:
@@ -87,9 +94,7 @@ def run(nre):
             arguments=[strhex_as_strfelt(predeclared_class)],
         )
 
-    # wait 120s - this will reduce on mainnet
-    print('🕒 Waiting for deploy before invoking')
-    time.sleep(120)
+    wait_for_deploys(nre)
 
     #---------------- INIT MODULES  ----------------#
     for contract in MODULE_CONTRACT_IMPLEMENTATIONS:
@@ -34,7 +34,7 @@ def run(nre):
             arguments=[],
         )
 
-        declare(contract.contract_name, contract.alias)
+        declare(contract.contract_name, contract.alias, nre.network)
 
         predeclared_class = nre.get_declaration(contract.alias)
 
@@ -1,9 +1,8 @@
 from collections import namedtuple
-from realms_cli.deployer import logged_deploy
+from realms_cli.deployer import logged_declare, logged_deploy, wait_for_deploys
 from realms_cli.config import Config, strhex_as_strfelt, safe_load_deployment
 from realms_cli.shared import str_to_felt
-from realms_cli.caller_invoker import wrapped_send, declare
-import time
+from realms_cli.caller_invoker import wrapped_send
 
 Contracts = namedtuple('Contracts', 'alias contract_name')
 
@@ -45,7 +44,7 @@ def run(nre):
             arguments=[],
         )
 
-        declare(contract.contract_name, contract.alias)
+        logged_declare(nre, contract.contract_name, contract.alias)
 
         predeclared_class = nre.get_declaration(contract.alias)
 
@@ -56,10 +55,7 @@ def run(nre):
             arguments=[strhex_as_strfelt(predeclared_class)],
         )
 
-    # testnet slow, so waiting period of time before calling otherwise these fail
-    # this should be much faster on mainnet
-    print('🕒 Waiting for deploy before invoking')
-    time.sleep(120)
+    wait_for_deploys(nre)
 
     # init proxies
     wrapped_send(
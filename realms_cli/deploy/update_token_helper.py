@@ -54,7 +54,7 @@ def run(nre):
             arguments=[],
         )
 
-        declare(contract.contract_name, contract.alias)
+        declare(contract.contract_name, contract.alias, nre.network)
 
     #---------------- INIT MODULES  ----------------#
     for contract in NEW_MODULES:
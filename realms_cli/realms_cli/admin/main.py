@@ -1,14 +1,15 @@
 # First, import click dependency
+import os
+
 import click
 
 from nile.core.declare import declare
 
-from realms_cli.caller_invoker import wrapped_call, wrapped_send, compile, deploy
-from realms_cli.config import Config, strhex_as_strfelt, safe_load_deployment
-from realms_cli.shared import uint
-from realms_cli.deployer import logged_deploy
+from realms_cli.caller_invoker import wrapped_send, compile, deploy
+from realms_cli.config import Config, strhex_as_strfelt
+from realms_cli.calldata import Calldata
 
-resources = uint(100000000 * 10 ** 18)
+resources = 100000000 * 10 ** 18
 
 
 @click.command()
@@ -24,8 +25,13 @@ def mint_resources(network):
         signer_alias=config.USER_ALIAS,
         contract_alias="proxy_resources",
         function="mintBatch",
-        arguments=[int(config.ADMIN_ADDRESS, 16), 22, *uint(1), *uint(2), *uint(3), *uint(4), *uint(5), *uint(6), *uint(7), *uint(8), *uint(9), *uint(10), *uint(11), *uint(12), *uint(13), *uint(14), *uint(15), *uint(16), *uint(17), *uint(18), *uint(19), *uint(20), *uint(21), *uint(22), 22, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources, *resources
-                   ],
+        arguments=(
+            Calldata()
+            .felt(config.ADMIN_ADDRESS)
+            .uint256_array(range(1, 23))
+            .uint256_array([resources] * 22)
+            .to_list()
+        ),
     )
 
 
@@ -113,3 +119,18 @@ def set_xoroshiro(network):
         function="set_xoroshiro",
         arguments=[int(config.XOROSHIRO_ADDRESS, 16)],
     )
+
+
+@click.command()
+@click.option("--snapshot", default=None, help="Snapshot file, memory.snapshot by default")
+def create_memory_network(snapshot):
+    """
+    Create the in-memory chain of --network memory with the admin and user accounts
+    """
+    from realms_cli.memory_network import DEFAULT_SNAPSHOT, SNAPSHOT_ENV, create
+
+    config = Config(nile_network="memory")
+    create(
+        snapshot or os.environ.get(SNAPSHOT_ENV, DEFAULT_SNAPSHOT),
+        [config.ADMIN_ALIAS, config.USER_ALIAS],
+    )
@@ -82,6 +82,81 @@ def map_realm(value, resources, wonders, orders):
     return decimalToBinary(meta, 8)
 
 
+def pack_bits(values, chunksize):
+    """decimalToBinary with integer shifts, values[0] lands in the lowest chunk.
+
+    Like decimalToBinary, a value wider than `chunksize` widens its own chunk.
+    """
+    if chunksize == 8:
+        try:
+            return int.from_bytes(bytes(values), "little")
+        except ValueError:
+            pass
+    limit = 1 << chunksize
+    packed = 0
+    offset = 0
+    for value in values:
+        if value < 0:
+            raise ValueError(f"cannot pack negative value {value}")
+        packed |= value << offset
+        offset += chunksize if value < limit else value.bit_length()
+    return packed
+
+
+REALM_TRAITS = ("Cities", "Regions", "Rivers", "Harbors")
+
+
+class RealmPacker:
+    """map_realm for many realms, the trait -> id lookups are built once."""
+
+    def __init__(self, resources, wonders, orders):
+        self.resources = {}
+        for r in resources:
+            self.resources.setdefault(r['trait'], []).append(r['id'])
+        self.wonders = {}
+        for index, w in enumerate(wonders):
+            self.wonders.setdefault(w["trait"], []).append(index + 1)
+        self.orders = orders
+        # attribute value -> order ids, orders match by substring ("The Order of Giants")
+        self._order_ids = {}
+
+    def order_ids(self, value):
+        ids = self._order_ids.get(value)
+        if ids is None:
+            ids = self._order_ids[value] = [o["id"] for o in self.orders if o["name"] in value]
+        return ids
+
+    def meta(self, value):
+        """The values map_realm packs, in the same order."""
+        traits = []
+        resourceIds = []
+        wonder = []
+        order = []
+        for a in value['attributes']:
+            trait_type = a['trait_type']
+            if trait_type in REALM_TRAITS:
+                traits.append(a['value'])
+            elif trait_type == "Resource":
+                resourceIds += self.resources.get(a['value'], ())
+            elif trait_type == "Wonder (translated)":
+                wonder += self.wonders.get(a['value'], ())
+            elif trait_type == "Order":
+                order += self.order_ids(a['value'])
+        resourceIds.sort()
+        resourceLength = [len(resourceIds)]
+        resourceIds += [0] * (7 - len(resourceIds))
+        return traits + resourceLength + resourceIds + (wonder or [0]) + order
+
+    def pack(self, value):
+        return pack_bits(self.meta(value), 8)
+
+
+def pack_realms(realms, resources, wonders, orders):
+    """Packed metadata of every realm by id, in the layout of data/realms_bit.json."""
+    packer = RealmPacker(resources, wonders, orders)
+    return [{id: packer.pack(realms[id])} for id in sorted(realms, key=int)]
+
+
 # Maps the different attributes of a crypt to a series of arrays
 def map_crypt(value, environments, affinities):
     size = []
@@ -130,6 +205,41 @@ def map_crypt(value, environments, affinities):
     # We pack the crypts with 6 bits as our largest number is 55
     return decimalToBinary(meta, 6)
 
+
+class CryptPacker:
+    """map_crypt for many crypts, environments and affinities are looked up by name."""
+
+    def __init__(self, environments, affinities):
+        self.environments = {}
+        for e in environments:
+            self.environments.setdefault(e["name"], []).append(e["id"])
+        # the last affinity of a name wins, like in map_crypt
+        self.affinities = {a["name"]: a["id"] for a in affinities}
+
+    def meta(self, value):
+        """The values map_crypt packs, in the same order."""
+        environment = self.environments.get(value["environment"])
+        if not environment:
+            raise KeyError(f"unknown crypt environment {value['environment']}")
+        return (
+            [23 + int(environment[0])]
+            + environment
+            + [value["legendary"], value["size"], value["numPoints"], value["numDoors"],
+               self.affinities.get(value["affinity"], 0)]
+        )
+
+    def pack(self, value):
+        return pack_bits(self.meta(value), 6)
+
+
+def pack_crypts(crypts, environments, affinities):
+    """(id, packed) of every (id, crypt) item, lazily. Crypts without metadata (null) are skipped."""
+    packer = CryptPacker(environments, affinities)
+    for id, crypt in crypts:
+        if crypt is not None:
+            yield id, packer.pack(crypt)
+
+
 if __name__ == '__main__':
 
     # f = open("data/realms_bit.json", "a")
@@ -0,0 +1,218 @@
+"""Fixed-width bitfield codec for the values the contracts pack into felts.
+
+REALM.pack([4, 21, 15, 36, 1, 3, 0, 0, 0, 0, 0, 0, 0, 5])    # -> felt
+REALM.unpack(felt).cities                                     # -> 21
+SQUAD.pack(squad)            # Squad of Troops, each slot packs the troop's id | vitality << 8
+CRYPT.unpack_columns(felts)  # {"resource": [...], "environment": [...], ...}
+
+A Schema lists its fields from the lowest bit up as (name, bits) or
+(name, Schema) for a nested layout. pack/unpack are compiled once per schema
+into straight-line shift and mask code. Values outside a field raise
+ValueError, bits above the schema are ignored on unpack, like `unpack_data`
+in the contracts. Signed schemas store fields in two's complement, the
+layout of `struct.pack("<b")`.
+"""
+from collections import namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+
+
+class Schema:
+    """Bitfield layout, `fields` are (name, bits) or (name, Schema) from the lowest bit up."""
+
+    def __init__(self, name, fields, signed=False):
+        self.name = name
+        self.signed = signed
+        self.fields = []
+        offset = 0
+        for field_name, kind in fields:
+            bits = kind.bits if isinstance(kind, Schema) else kind
+            self.fields.append((field_name, offset, bits, kind if isinstance(kind, Schema) else None))
+            offset += bits
+        self.bits = offset
+        self.names = [field[0] for field in self.fields]
+        self.record = namedtuple(name, self.names)
+        self._pack, self._unpack = self._compile()
+
+    def __repr__(self):
+        return f"Schema({self.name}, {self.bits} bits)"
+
+    def _compile(self):
+        arguments = ", ".join(f"v{i}" for i in range(len(self.fields)))
+        checks, terms, values = [], [], []
+        scope = {"record": self.record, "ValueError": ValueError}
+        for i, (name, offset, bits, nested) in enumerate(self.fields):
+            mask = (1 << bits) - 1
+            if nested is not None:
+                scope[f"s{i}"] = nested
+                checks.append(f"    v{i} = s{i}.pack_value(v{i})")
+                values.append(f"s{i}.unpack((p >> {offset}) & {mask})")
+            elif self.signed:
+                half = 1 << (bits - 1)
+                checks.append(
+                    f"    if (v{i} + {half}) >> {bits}:\n"
+                    f"        raise ValueError(f'{self.name}.{name} does not fit {bits} signed bits: {{v{i}}}')"
+                )
+                terms.append(f"((v{i} & {mask}) << {offset})")
+                values.append(f"(((p >> {offset}) & {mask}) ^ {half}) - {half}")
+                continue
+            else:
+                checks.append(
+                    f"    if v{i} >> {bits} or v{i} < 0:\n"
+                    f"        raise ValueError(f'{self.name}.{name} does not fit {bits} bits: {{v{i}}}')"
+                )
+                values.append(f"(p >> {offset}) & {mask}")
+            terms.append(f"(v{i} << {offset})")
+        source = (
+            f"def pack({arguments}):\n"
+            + "\n".join(checks)
+            + f"\n    return {' | '.join(terms) or '0'}\n\n"
+            f"def unpack(p):\n"
+            f"    return record({', '.join(values)})\n"
+        )
+        exec(source, scope)
+        return scope["pack"], scope["unpack"]
+
+    def values_of(self, value) -> list:
+        """Field values of a sequence in field order, a mapping or an object with the field names."""
+        if isinstance(value, Mapping):
+            return [value[name] for name in self.names]
+        if all(hasattr(value, name) for name in self.names):
+            return [getattr(value, name) for name in self.names]
+        value = list(value)
+        if len(value) != len(self.fields):
+            raise ValueError(f"{self.name} has {len(self.fields)} fields, got {len(value)} values")
+        return value
+
+    def pack(self, value) -> int:
+        return self._pack(*self.values_of(value))
+
+    def pack_value(self, value) -> int:
+        """pack, or an int taken as already packed."""
+        if isinstance(value, int):
+            if value >> self.bits or value < 0:
+                raise ValueError(f"{self.name} does not fit {self.bits} bits: {value}")
+            return value
+        return self.pack(value)
+
+    def unpack(self, packed):
+        return self._unpack(int(packed))
+
+    def pack_many(self, values) -> list:
+        return [self._pack(*self.values_of(value)) for value in values]
+
+    def unpack_many(self, packed) -> list:
+        unpack = self._unpack
+        return [unpack(int(p)) for p in packed]
+
+    def pack_columns(self, columns):
+        """Packs {field: values} of equal length, lists or NumPy arrays (elementwise)."""
+        rows = [columns[name] for name in self.names]
+        if any(hasattr(column, "dtype") for column in rows):
+            return self._pack_arrays(rows)
+        return [self._pack(*row) for row in zip(*rows)]
+
+    def unpack_columns(self, packed) -> dict:
+        """{field: values} of many packed values, NumPy arrays in, NumPy arrays out."""
+        if hasattr(packed, "dtype"):
+            return self._unpack_arrays(packed)
+        records = self.unpack_many(packed)
+        return {name: [record[i] for record in records] for i, name in enumerate(self.names)}
+
+    def _array_type(self, np):
+        # exact python ints in object arrays past 64 bits, felts usually are
+        return np.uint64 if self.bits <= 64 else object
+
+    def _pack_arrays(self, rows):
+        import numpy as np
+
+        dtype = self._array_type(np)
+        packed = np.zeros(len(rows[0]), dtype=dtype)
+        for (name, offset, bits, nested), column in zip(self.fields, rows):
+            if nested is not None:
+                column = [nested.pack_value(v) for v in column]
+            column = np.asarray(column, dtype=np.int64 if dtype is np.uint64 else object)
+            if self.signed:
+                out_of_range = ((column + (1 << (bits - 1))) >> bits) != 0
+            else:
+                out_of_range = (column < 0) | ((column >> bits) != 0)
+            if out_of_range.any():
+                raise ValueError(f"{self.name}.{name} does not fit {bits}{' signed' if self.signed else ''} bits")
+            column = (column & ((1 << bits) - 1)).astype(dtype)
+            packed |= column << (np.uint64(offset) if dtype is np.uint64 else offset)
+        return packed
+
+    def _unpack_arrays(self, packed):
+        import numpy as np
+
+        dtype = self._array_type(np)
+        packed = np.asarray(packed, dtype=dtype)
+        columns = {}
+        for name, offset, bits, nested in self.fields:
+            if dtype is np.uint64:
+                column = (packed >> np.uint64(offset)) & np.uint64((1 << bits) - 1)
+            else:
+                column = (packed >> offset) & ((1 << bits) - 1)
+            if nested is not None:
+                column = nested._unpack_arrays(column)
+            elif self.signed:
+                half = 1 << (bits - 1)
+                column = (column.astype(np.int64) ^ half) - half
+            columns[name] = column
+        return columns
+
+
+@lru_cache(maxsize=None)
+def signed_bytes(count) -> Schema:
+    """`count` signed bytes, the layout of shared.pack_values."""
+    return Schema(f"signed_bytes_{count}", [(f"value_{i}", 8) for i in range(count)], signed=True)
+
+
+# Realms_ERC721_Mintable.fetch_realm_data, packed by binary_converter.map_realm
+REALM = Schema("RealmData", [
+    ("regions", 8), ("cities", 8), ("harbours", 8), ("rivers", 8), ("resource_number", 8),
+    ("resource_1", 8), ("resource_2", 8), ("resource_3", 8), ("resource_4", 8),
+    ("resource_5", 8), ("resource_6", 8), ("resource_7", 8), ("wonder", 8), ("order", 8),
+])
+
+# Crypts_ERC721_Mintable.fetch_crypt_data, packed by binary_converter.map_crypt
+CRYPT = Schema("CryptData", [
+    ("resource", 6), ("environment", 6), ("legendary", 6), ("size", 6),
+    ("num_doors", 6), ("num_points", 6), ("affinity", 6),
+])
+
+# library_combat pack_troop / pack_squad: a troop slot is id + vitality * 0x100,
+# slots are 0x100 ** 2 apart
+TROOP = Schema("PackedTroop", [("id", 8), ("vitality", 8)])
+SQUAD = Schema("PackedSquad", [
+    (name, TROOP)
+    for name in ["t1_1", "t1_2", "t1_3", "t1_4", "t1_5", "t1_6", "t1_7", "t1_8", "t1_9",
+                 "t2_1", "t2_2", "t2_3", "t2_4", "t2_5", "t3_1"]
+])
+
+# modules/food/library.cairo pack_food_buildings, three SHIFT_41 fields
+FOOD_BUILDINGS = Schema("FoodBuildings", [
+    ("number_built", 41), ("collections_left", 41), ("update_time", 41),
+])
+
+
+def pack_cost(ids, amounts) -> tuple:
+    """(resource_count, bits, packed_ids, packed_amounts) of a building or troop Cost."""
+    return (
+        len(ids),
+        8,
+        signed_bytes(len(ids)).pack(ids),
+        signed_bytes(len(amounts)).pack(amounts),
+    )
+
+
+def unpack_cost(cost, amounts_count=None) -> tuple:
+    """(ids, amounts) of a Cost; `amounts_count` defaults to its resource_count."""
+    resource_count, bits, packed_ids, packed_amounts = cost[:4]
+    if bits != 8:
+        raise ValueError(f"costs are packed in 8 bit fields, got {bits}")
+    count = resource_count if amounts_count is None else amounts_count
+    return (
+        list(signed_bytes(resource_count).unpack(packed_ids)),
+        list(signed_bytes(count).unpack(packed_amounts)),
+    )
@@ -0,0 +1,174 @@
+"""Linear-time calldata encoding and decoding.
+
+Felts are written into one growable list at a cursor, arrays are sized once
+and filled with slice assignment, so building calldata is O(n) in the number
+of felts however many pieces it is made of.
+
+data = (
+    Calldata()
+    .uint256(max_currency)
+    .uint256_array(resource_ids)
+    .uint256_array(resource_values, scale=10 ** 18)
+    .felt(deadline)
+    .to_list()
+)
+"""
+from itertools import chain
+
+UINT128_MASK = 2 ** 128 - 1
+
+
+def to_int(value) -> int:
+    """Accepts ints, decimal strings and 0x-prefixed hex strings, floats are truncated like int()."""
+    if type(value) is int:
+        return value
+    if isinstance(value, float):
+        return int(value)
+    value = str(value).strip()
+    if value.startswith(("0x", "-0x")):
+        return int(value, 16)
+    return int(value)
+
+
+def _ints(values, scale=1) -> list:
+    values = [v if type(v) is int else to_int(v) for v in values]
+    if scale != 1:
+        values = [v * scale for v in values]
+    return values
+
+
+class Calldata:
+    """Felt buffer with encoders for the shapes Cairo entrypoints take."""
+
+    def __init__(self, capacity: int = 64):
+        self._buffer = [0] * capacity
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def _reserve(self, n: int) -> int:
+        """Makes room for n more felts, returns where they start."""
+        start = self._length
+        needed = start + n
+        if needed > len(self._buffer):
+            self._buffer.extend([0] * max(needed - len(self._buffer), len(self._buffer)))
+        self._length = needed
+        return start
+
+    def felt(self, value):
+        start = self._reserve(1)
+        self._buffer[start] = to_int(value)
+        return self
+
+    def felts(self, values):
+        """Felts as they are, without a length prefix."""
+        values = _ints(values)
+        start = self._reserve(len(values))
+        self._buffer[start:start + len(values)] = values
+        return self
+
+    def array(self, values):
+        """Length-prefixed felt array (`arr_len, arr`)."""
+        values = _ints(values)
+        start = self._reserve(len(values) + 1)
+        self._buffer[start] = len(values)
+        self._buffer[start + 1:start + 1 + len(values)] = values
+        return self
+
+    def uint256(self, value, scale=1):
+        value = to_int(value) * scale
+        start = self._reserve(2)
+        self._buffer[start] = value & UINT128_MASK
+        self._buffer[start + 1] = value >> 128
+        return self
+
+    def uint256s(self, values, scale=1):
+        """(low, high) pairs without a length prefix."""
+        values = _ints(values, scale)
+        start = self._reserve(2 * len(values))
+        end = start + 2 * len(values)
+        if all(0 <= v <= UINT128_MASK for v in values):
+            self._buffer[start:end:2] = values
+            self._buffer[start + 1:end:2] = [0] * len(values)
+        else:
+            self._buffer[start:end:2] = [v & UINT128_MASK for v in values]
+            self._buffer[start + 1:end:2] = [v >> 128 for v in values]
+        return self
+
+    def uint256_array(self, values, scale=1):
+        """Length-prefixed Uint256 array, the length counting uints not felts."""
+        values = list(values)
+        self.felt(len(values))
+        return self.uint256s(values, scale)
+
+    def struct_array(self, structs):
+        """Length-prefixed array of equally sized structs given as tuples."""
+        structs = list(structs)
+        self.felt(len(structs))
+        return self.felts(chain.from_iterable(structs))
+
+    def call_array(self, calls):
+        """Account `__execute__` calls: (to, selector, data) into call_array + calldata."""
+        entries = []
+        data = []
+        for to, selector, call_data in calls:
+            call_data = _ints(call_data)
+            entries.append((to_int(to), to_int(selector), len(data), len(call_data)))
+            data.extend(call_data)
+        return self.struct_array(entries).array(data)
+
+    def to_list(self) -> list:
+        return self._buffer[:self._length]
+
+
+class CalldataReader:
+    """Reads felts back in the shapes Calldata writes them."""
+
+    def __init__(self, felts):
+        self._felts = felts if isinstance(felts, list) else list(felts)
+        self._position = 0
+
+    def remaining(self) -> int:
+        return len(self._felts) - self._position
+
+    def felt(self) -> int:
+        value = self._felts[self._position]
+        self._position += 1
+        return value
+
+    def felts(self, n: int) -> list:
+        start = self._position
+        self._position += n
+        if self._position > len(self._felts):
+            raise ValueError(f"calldata too short: wanted {n} felts at {start}")
+        return self._felts[start:self._position]
+
+    def array(self) -> list:
+        return self.felts(self.felt())
+
+    def uint256(self) -> int:
+        low, high = self.felts(2)
+        return low + (high << 128)
+
+    def uint256s(self, n: int) -> list:
+        pairs = self.felts(2 * n)
+        return [low + (high << 128) for low, high in zip(pairs[::2], pairs[1::2])]
+
+    def uint256_array(self) -> list:
+        return self.uint256s(self.felt())
+
+    def struct_array(self, size: int) -> list:
+        flat = self.felts(self.felt() * size)
+        return [tuple(flat[i:i + size]) for i in range(0, len(flat), size)]
+
+    def call_array(self) -> list:
+        """Inverse of Calldata.call_array, returns (to, selector, data) triples."""
+        entries = self.struct_array(4)
+        data = self.array()
+        return [(to, selector, data[offset:offset + n]) for to, selector, offset, n in entries]
+
+
+def encode_uint256s(values, scale=1) -> list:
+    """Flattened (low, high) pairs of `values`."""
+    return Calldata(2 * len(values)).uint256s(values, scale).to_list()
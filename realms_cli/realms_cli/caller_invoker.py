@@ -1,71 +1,204 @@
+import json
 import os
 import re
 import subprocess
-import asyncio
 
-from nile.core.account import Account
 from nile import deployments
-from nile.core.call_or_invoke import call_or_invoke
+from nile.common import ABIS_DIRECTORY, BUILD_DIRECTORY
 
+from realms_cli.calldata import Calldata
+from realms_cli.decoder import get_decoder
+from realms_cli.fee_oracle import FALLBACK_MAX_FEE, FeeOracle
+from realms_cli.cassette import Cassette, REPLAY
+from realms_cli.gateway import MEMORY_NETWORK, get_gateway, format_result, use_cassette as use_gateway_cassette
+from realms_cli.scheduler import CallScheduler
+from realms_cli import nonce as nonces
+from realms_cli import registry, tx_tracker
+from realms_cli.read_cache import CACHE_PATH_ENV, ReadCache
 
-def send_multi(self, to, method, calldata, nonce=None):
-    """Execute a tx going through an Account contract. Inspired from openzeppelin."""
-    target_address, _ = next(deployments.load(to, self.network)) or to
-    calldata = [[int(x) for x in c] for c in calldata]
+MAX_FEE = FALLBACK_MAX_FEE
 
+# shared so its stats accumulate over a whole script, see scheduler.SchedulerStats
+DEFAULT_SCHEDULER = CallScheduler()
+
+READ_CACHE = ReadCache(
+    latest_block=lambda network: get_gateway(network).get_block("latest")["block_number"],
+    path=os.environ.get(CACHE_PATH_ENV),
+)
+
+# shares the block number lookups of the read cache
+FEE_ORACLE = FeeOracle(latest_block=READ_CACHE.block)
+
+
+def use_cassette(path, mode=REPLAY) -> Cassette:
+    """Records the gateway traffic of every call and send to `path`, or replays it offline.
+
+    Same as setting REALMS_CLI_CASSETTE / REALMS_CLI_CASSETTE_MODE before the first request.
+    """
+    cassette = Cassette(path, mode)
+    use_gateway_cassette(cassette)
+    return cassette
+
+
+def resolve_address(contract_alias, network) -> str:
+    """Returns the deployed address of an alias, or the input if it already is an address."""
+    deployment = registry.deployment(contract_alias, network)
+    if deployment is not None:
+        return deployment[0]
+    return contract_alias
+
+
+def account_nonces(account) -> nonces.NonceManager:
+    """Returns the local nonce manager of a nile Account."""
+    gateway = get_gateway(account.network)
+    return nonces.get_nonce_manager(
+        account.address,
+        account.network,
+        lambda: gateway.call_contract(account.address, "get_nonce", [])[0],
+    )
+
+
+def execute_params(call_array, calldata, nonce) -> list:
+    """Calldata of an account's __execute__."""
+    return (
+        Calldata(len(call_array) * 4 + len(calldata) + 3)
+        .struct_array(call_array)
+        .array(calldata)
+        .felt(nonce)
+        .to_list()
+    )
+
+
+def send_multi(self, to, method, calldata, nonce=None, max_fee=None):
+    """Execute a tx going through an Account contract. Inspired from openzeppelin.
+
+    Without `max_fee` it comes from FEE_ORACLE.
+    """
+    return send_calls(self, [(to, method, c) for c in calldata], nonce=nonce, max_fee=max_fee)
+
+
+def send_calls(self, calls, nonce=None, max_fee=None):
+    """Like send_multi, `calls` being (contract_alias, method, calldata) to any contracts."""
+    addresses = {}
+    for to, _, _ in calls:
+        if to not in addresses:
+            addresses[to] = resolve_address(to, self.network)
+    calls = [[addresses[to], method, [int(x) for x in c]] for to, method, c in calls]
+    gateway = get_gateway(self.network)
+
+    manager = None
     if nonce is None:
-        nonce = int(
-            call_or_invoke(self.address, "call", "get_nonce", [], self.network)
+        manager = account_nonces(self)
+        nonce = manager.reserve()
+
+    if max_fee is None and self.network == MEMORY_NETWORK:
+        # no fees, and a block per transaction would make every estimate a miss
+        max_fee = 0
+    elif max_fee is None:
+        def _estimate():
+            (call_array, flat, sig_r, sig_s) = self.signer.sign_transaction(
+                sender=self.address, calls=calls, nonce=nonce, max_fee="0")
+            return gateway.estimate_fee(
+                self.address, "__execute__", execute_params(call_array, flat, nonce),
+                signature=[sig_r, sig_s])
+
+        from starkware.starknet.public.abi import get_selector_from_name
+
+        max_fee = FEE_ORACLE.max_fee(
+            self.network,
+            [(int(to, 16), get_selector_from_name(method)) for to, method, _ in calls],
+            sum(len(c) for _, _, c in calls),
+            _estimate,
         )
 
     (call_array, calldata, sig_r, sig_s) = self.signer.sign_transaction(
         sender=self.address,
-        calls=[[target_address, method, c] for c in calldata],
+        calls=calls,
         nonce=nonce,
-        max_fee='8989832783197500',
+        max_fee=str(max_fee),
     )
+    params = execute_params(call_array, calldata, nonce)
 
-    params = []
-    params.append(str(len(call_array)))
-    params.extend([str(elem) for sublist in call_array for elem in sublist])
-    params.append(str(len(calldata)))
-    params.extend([str(param) for param in calldata])
-    params.append(str(nonce))
-
-    return call_or_invoke(
-        contract=self.address,
-        type="invoke",
-        method="__execute__",
-        params=params,
-        network=self.network,
-        signature=[str(sig_r), str(sig_s)],
-        max_fee='8989832783197500',
+    try:
+        out = gateway.invoke(
+            self.address,
+            "__execute__",
+            params,
+            signature=[sig_r, sig_s],
+            max_fee=max_fee,
+        )
+    except Exception as exc:
+        if manager is not None and nonces.is_invalid_nonce(exc):
+            # the chain disagrees with every nonce reserved from this one on
+            manager.reject(nonce)
+            manager.sync()
+        elif manager is not None:
+            manager.release(nonce)
+        raise
+    self.last_nonce = nonce
+    if manager is not None:
+        nonces.track(out["transaction_hash"], manager, nonce)
+    # same wording as the starknet CLI so callers can keep parsing it
+    return (
+        "Invoke transaction was sent.\n"
+        f"Contract address: 0x{int(self.address, 16):064x}\n"
+        f"Transaction hash: {out['transaction_hash']}"
     )
 
 
-# bind it to the account class, needed for signage
-Account.send_multi = send_multi
+def load_account(signer_alias, network):
+    """nile Account of a signer alias, with send_multi / send_calls bound.
+
+    nile (and the starkware signing code it loads) is only imported here, when
+    a command first needs an account, so importing a command module stays cheap.
+    """
+    from nile.core.account import Account
+
+    # bind them to the account class, needed for signage
+    Account.send_multi = send_multi
+    Account.send_calls = send_calls
+    return Account(signer_alias, network)
 
 
 def call(network, contract_alias, function, arguments) -> str:
-    """Nile call function."""
+    """Call a view function through the in-process gateway client."""
+    address = resolve_address(contract_alias, network)
+    result = get_gateway(network).call_contract(address, function, arguments)
+    return format_result(result)
 
-    command = [
-        "nile",
-        "call",
-        "--network",
-        network,
-        contract_alias,
-        function,
-        *map(str, arguments),
-    ]
-    return subprocess.check_output(command).strip().decode("utf-8")
 
+def cached_felts(network, contract_alias, function, arguments) -> list:
+    """Raw result felts of a view call through READ_CACHE, pinned to the block they are cached for."""
+
+    def _call(block):
+        address = resolve_address(contract_alias, network)
+        return get_gateway(network).call_contract(
+            address, function, arguments,
+            block_number="pending" if block is None else block,
+        )
 
-async def _call_async(network, contract_alias, function, arguments) -> str:
-    """Nile async call function."""
+    return READ_CACHE.fetch(network, contract_alias, function, arguments, _call)
 
-    command = " ".join([
+
+def cached_call(network, contract_alias, function, arguments) -> str:
+    """`call` through READ_CACHE."""
+    return format_result(cached_felts(network, contract_alias, function, arguments))
+
+
+def typed_call(network, contract_alias, function, arguments, cached=True):
+    """Calls a view function and decodes its outputs with the contract ABI, see decoder.py."""
+    if cached:
+        felts = cached_felts(network, contract_alias, function, arguments)
+    else:
+        address = resolve_address(contract_alias, network)
+        felts = get_gateway(network).call_contract(address, function, arguments)
+    return get_decoder(contract_alias, network, function).decode(function, felts)
+
+
+def nile_call(network, contract_alias, function, arguments) -> str:
+    """Nile call function, spawning a `nile` process per call."""
+
+    command = [
         "nile",
         "call",
         "--network",
@@ -73,44 +206,40 @@ async def _call_async(network, contract_alias, function, arguments) -> str:
         contract_alias,
         function,
         *map(str, arguments),
-    ])
-    proc = await asyncio.create_subprocess_shell(
-        command,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE)
-
-    stdout, stderr = await proc.communicate()
-
-    if stderr:
-        print(f'[stderr]\n{stderr.decode()}')
-    return stdout.decode()
+    ]
+    return subprocess.check_output(command).strip().decode("utf-8")
 
 
-async def _call_sync_manager(network, contract_alias, function, calldata) -> str:
-    """"Helper function to create multiple coroutines."""
-    stdout = await asyncio.gather(*[
-        _call_async(network, contract_alias, function, arguments)
-        for arguments in calldata
-    ])
+def call_multi(network, contract_alias, function, calldata, scheduler=None, return_exceptions=False) -> list:
+    """Runs one call per calldata row through a bounded, retrying scheduler.
 
-    return stdout
+    Results keep the order of `calldata`. A failed row raises MultiCallError,
+    or is returned as a CallError in its slot when `return_exceptions` is set.
+    """
+    scheduler = scheduler or DEFAULT_SCHEDULER
+    address = resolve_address(contract_alias, network)
+    gateway = get_gateway(network)
 
+    def _call(arguments):
+        return format_result(gateway.call_contract(address, function, arguments))
 
-def call_multi(network, contract_alias, function, calldata) -> str:
-    """Launches the async call manager to launch a pool of calls."""
-    return asyncio.run(_call_sync_manager(network, contract_alias, function, calldata))
+    return scheduler.run(_call, calldata, return_exceptions=return_exceptions)
 
 
-def wrapped_call(network, contract_alias, function, arguments) -> str:
-    """Send command with some extra functionality such as tx status check and built-in timeout.
-    (only supported for non-localhost networks)
+def wrapped_call(network, contract_alias, function, arguments, cached=True, typed=False):
+    """Call command with some extra functionality such as read caching.
 
-    tx statuses:
-    RECEIVED -> PENDING -> ACCEPTED_ON_L2
+    Returns the `nile call` style output string, or with `typed` the outputs
+    decoded with the contract ABI (see decoder.py).
     """
     print("------- CALL ----------------------------------------------------")
     print(f"calling {function} from {contract_alias} with {arguments}")
-    out = call(network, contract_alias, function, arguments)
+    if typed:
+        out = typed_call(network, contract_alias, function, arguments, cached=cached)
+    elif cached:
+        out = cached_call(network, contract_alias, function, arguments)
+    else:
+        out = call(network, contract_alias, function, arguments)
     print("------- CALL ----------------------------------------------------")
     # return out such that it can be prettified at a higher level
     return out
@@ -118,15 +247,14 @@ def wrapped_call(network, contract_alias, function, arguments) -> str:
 
 def send(network, signer_alias, contract_alias, function, arguments) -> str:
     """Nile send function."""
-    account = Account(signer_alias, network)
+    account = load_account(signer_alias, network)
     if isinstance(arguments[0], list):
         return account.send_multi(contract_alias, function, arguments)
     return account.send_multi(contract_alias, function, [arguments])
 
 
 def wrapped_send(network, signer_alias, contract_alias, function, arguments):
-    """Send command with some extra functionality such as tx status check and built-in timeout.
-    (only supported for non-localhost networks)
+    """Send command with some extra functionality such as tx status check.
 
     tx statuses:
     RECEIVED -> PENDING -> ACCEPTED_ON_L2
@@ -136,20 +264,53 @@ def wrapped_send(network, signer_alias, contract_alias, function, arguments):
     out = send(network, signer_alias, contract_alias, function, arguments)
     _, tx_hash = parse_send(out)
     get_tx_status(network, tx_hash,)
+    READ_CACHE.invalidate(network, contract_alias)
     print("------- SEND ----------------------------------------------------")
 
 
-def get_tx_status(network, tx_hash: str) -> dict:
-    """Returns transaction receipt in dict."""
-    command = [
-        "nile",
-        "debug",
-        "--network",
-        network,
-        tx_hash,
+def send_batch(network, signer_alias, transactions, wait=True) -> list:
+    """Submits several transactions of one signer back-to-back.
+
+    `transactions` holds (contract_alias, function, arguments) tuples, arguments
+    being one calldata list or a list of them as for `send`. Nonces are reserved
+    locally so no submission waits on the previous one. With `wait` the statuses
+    of all of them are awaited afterwards.
+
+    Returns a list of (tx_hash, nonce) or, when waiting, (tx_hash, nonce, status).
+    """
+    account = load_account(signer_alias, network)
+    submitted = []
+    for contract_alias, function, arguments in transactions:
+        if not isinstance(arguments[0], list):
+            arguments = [arguments]
+        out = account.send_multi(contract_alias, function, arguments)
+        _, tx_hash = parse_send(out)
+        print(f"sent {function} to {contract_alias} with nonce {account.last_nonce}: {tx_hash}")
+        submitted.append((tx_hash, account.last_nonce))
+
+    statuses = wait_for_txs(network, [tx_hash for tx_hash, _ in submitted]) if wait else None
+    # once, after the transactions had their effect when waiting
+    for contract_alias in {contract_alias for contract_alias, _, _ in transactions}:
+        READ_CACHE.invalidate(network, contract_alias)
+    if not wait:
+        return submitted
+    return [
+        (tx_hash, nonce, status)
+        for (tx_hash, nonce), status in zip(submitted, statuses)
     ]
-    out_raw = subprocess.check_output(command).strip().decode("utf-8")
-    return out_raw
+
+
+def wait_for_txs(network, tx_hashes) -> list:
+    """Waits until every transaction is accepted or rejected, returns their status dicts."""
+    return tx_tracker.wait_for_txs(network, tx_hashes)
+
+
+def get_tx_status(network, tx_hash: str) -> dict:
+    """Waits for the transaction to be accepted or rejected and returns its status dict."""
+    return tx_tracker.wait_for_txs(
+        network, [tx_hash],
+        callback=lambda _, __, status: print(f"Transaction status: {status['tx_status']}"),
+    )[0]
 
 
 def parse_send(x):
@@ -163,7 +324,24 @@ def parse_send(x):
     return 0x0, 0x0
 
 
-def deploy(network, alias) -> str:
+def deploy(network, alias, arguments=None, contract_name=None) -> str:
+    """Deploy a compiled artifact through the in-process gateway client and register it."""
+    contract_name = contract_name or alias
+    with open(f"{BUILD_DIRECTORY}/{contract_name}.json") as fp:
+        contract_class = json.load(fp)
+
+    out = get_gateway(network).deploy(contract_class, arguments or [])
+    address = f"0x{int(out['address'], 16):064x}"
+    deployments.register(
+        address, f"{ABIS_DIRECTORY}/{contract_name}.json", network, alias)
+    return (
+        "Deploy transaction was sent.\n"
+        f"Contract address: {address}\n"
+        f"Transaction hash: {out['transaction_hash']}"
+    )
+
+
+def nile_deploy(network, alias) -> str:
     """Nile deploy function."""
     command = [
         "nile",
@@ -187,8 +365,15 @@ def compile(contract_alias) -> str:
     return subprocess.check_output(command).strip().decode("utf-8")
 
 
-def declare(contract_name, alias) -> str:
-    """Nile declare function."""
+def declare(contract_name, alias, network=None) -> str:
+    """Nile declare function, in-process on the memory network."""
+    if network == MEMORY_NETWORK:
+        with open(f"{BUILD_DIRECTORY}/{contract_name}.json") as fp:
+            contract_class = json.load(fp)
+        out = get_gateway(network).declare(contract_class)
+        deployments.register_class_hash(out["class_hash"], network, alias)
+        return f"Contract class hash: {out['class_hash']}"
+
     command = [
         "nile",
         "declare",
@@ -196,4 +381,13 @@ def declare(contract_name, alias) -> str:
         "--alias",
         alias,
     ]
-    return subprocess.check_output(command).strip().decode("utf-8")
+    if network is not None:
+        command += ["--network", network]
+    # nile logs the class and transaction hash to stderr
+    return subprocess.check_output(command, stderr=subprocess.STDOUT).strip().decode("utf-8")
+
+
+def parse_declare(x):
+    """Transaction hash of declare output, None when it was declared in-process (memory network)."""
+    found = re.search("Transaction hash: (0x[\\da-f]{1,64})", str(x))
+    return found.group(1) if found else None
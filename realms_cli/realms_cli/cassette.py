@@ -0,0 +1,133 @@
+"""Record/replay of gateway traffic.
+
+REALMS_CLI_CASSETTE=goerli.cassette REALMS_CLI_CASSETTE_MODE=record nile get_all_rates
+REALMS_CLI_CASSETTE=goerli.cassette nile get_all_rates      # offline, same output
+
+In record mode every gateway request and its response (errors included) is
+appended to the cassette, after what earlier commands recorded in it; delete
+the file to start over. In replay mode requests are answered from it and
+nothing touches the network; a request that was never recorded raises
+CassetteMiss. The same request recorded several times (e.g. polling a
+transaction status) is answered with its responses in recorded order, the
+last one repeating.
+
+File layout: a magic header, then one record per response:
+sha1 of the request (20 bytes), status (uint16), length (uint32), zlib
+compressed body. Opening a cassette only reads the record headers to build
+the index, bodies are decompressed when served.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+
+CASSETTE_ENV = "REALMS_CLI_CASSETTE"
+MODE_ENV = "REALMS_CLI_CASSETTE_MODE"
+RECORD = "record"
+REPLAY = "replay"
+
+MAGIC = b"RCAS1\n"
+HEADER = struct.Struct("<20sHI")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode for a request the cassette has no response to."""
+
+
+def request_key(method, endpoint, params=None, payload=None) -> bytes:
+    """sha1 of a request, insensitive to dict ordering."""
+    if payload is not None and payload.get("type") == "DEPLOY":
+        # the salt is random on every deploy
+        payload = {k: v for k, v in payload.items() if k != "contract_address_salt"}
+    canonical = json.dumps([method, endpoint, params or {}, payload], sort_keys=True)
+    return hashlib.sha1(canonical.encode()).digest()
+
+
+class Cassette:
+    """Recorded responses of one cassette file, `mode` is "record" or "replay"."""
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"unknown cassette mode {mode}")
+        self.path = path
+        self.mode = mode
+        self.served = 0
+        self.recorded = 0
+        # request key -> [(status, offset, length)]
+        self._index = {}
+        self._played = {}
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self._fp = open(path, "rb")
+            self._load()
+        elif os.path.exists(path) and os.path.getsize(path) > 0:
+            # later commands of a session append to what earlier ones recorded
+            self._fp = open(path, "r+b")
+            end = self._load()
+            self._fp.seek(end)
+            self._fp.truncate()
+        else:
+            self._fp = open(path, "wb")
+            self._fp.write(MAGIC)
+
+    def _load(self) -> int:
+        """Indexes the records, returns the offset after the last complete one."""
+        if self._fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a cassette")
+        offset = len(MAGIC)
+        size = os.fstat(self._fp.fileno()).st_size
+        while offset + HEADER.size <= size:
+            self._fp.seek(offset)
+            key, status, length = HEADER.unpack(self._fp.read(HEADER.size))
+            if offset + HEADER.size + length > size:
+                # a record cut short by an interrupted recording
+                break
+            self._index.setdefault(key, []).append((status, offset + HEADER.size, length))
+            offset += HEADER.size + length
+        return offset
+
+    key = staticmethod(request_key)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def __len__(self):
+        return sum(len(responses) for responses in self._index.values())
+
+    def record(self, key, status, body):
+        """Appends a response, `body` is the decoded json or the error text."""
+        data = zlib.compress(json.dumps(body, separators=(",", ":")).encode())
+        with self._lock:
+            offset = self._fp.tell() + HEADER.size
+            self._fp.write(HEADER.pack(key, status, len(data)) + data)
+            self._fp.flush()
+            self._index.setdefault(key, []).append((status, offset, len(data)))
+            self.recorded += 1
+
+    def play(self, key):
+        """Returns the next (status, body) recorded for a request."""
+        with self._lock:
+            responses = self._index.get(key)
+            if not responses:
+                raise CassetteMiss(f"request {key.hex()} is not in {self.path}")
+            played = self._played.get(key, 0)
+            status, offset, length = responses[min(played, len(responses) - 1)]
+            self._played[key] = played + 1
+            self._fp.seek(offset)
+            data = self._fp.read(length)
+            self.served += 1
+        return status, json.loads(zlib.decompress(data))
+
+    def close(self):
+        self._fp.close()
+
+
+def from_env():
+    """The cassette configured in the environment, or None."""
+    path = os.environ.get(CASSETTE_ENV)
+    if not path:
+        return None
+    return Cassette(path, os.environ.get(MODE_ENV, REPLAY))
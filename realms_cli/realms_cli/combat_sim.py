@@ -0,0 +1,238 @@
+"""Monte Carlo battles between packed squads, by the rules of L06_Combat.
+
+battles = simulate(attacker, defender, battles=10000, seed=1)   # packed squads
+battles.summary()      # {"attacker_wins": 0.73, "defender_wins": 0.27, ...}
+battles.outcome        # COMBAT_OUTCOME_* per battle, 0 if undecided after max_steps
+
+All battles run at once as (battles, 15) NumPy arrays of troop ids and
+vitality in the slot order of a Squad. A step is one `attack` of
+run_combat_loop: the first vital troop of one side hits the first vital troop
+of the other with calculate_hit_points, for a roll of `rnd % 12 + 1` where rnd
+is the next 64 bit value of `source` (anything with the random_raw(size) of a
+NumPy BitGenerator). With a single battle the values are used in the order
+the contract draws them from its xoroshiro, one per step, so a
+xoroshiro.Xoroshiro with the seed of the deployed contract replays a battle.
+
+On chain run_combat_loop has no step limit, a battle where neither side can
+hit ends the transaction. Here it stops after `max_steps` as undecided.
+"""
+import numpy as np
+
+SLOTS = 15
+SHIFT = 0x100
+TROOP_ID_SIZE = 13
+COMBAT_OUTCOME_ATTACKER_WINS = 1
+COMBAT_OUTCOME_DEFENDER_WINS = 2
+POPULATION_PER_HIT_POINT = 50
+MAX_WALL_DEFENSE_HIT_POINTS = 5
+MAX_STEPS = 4000
+
+# TroopProps in game_structs.cairo by troop id, row 0 is the empty troop
+#                    tier agility attack armor vitality wisdom
+TROOP_PROPS = np.array([
+    [0, 0, 0, 0, 0, 0],
+    [1, 2, 7, 2, 53, 2],     # Skirmisher
+    [2, 4, 7, 3, 53, 3],     # Longbow
+    [3, 6, 9, 4, 53, 4],     # Crossbow
+    [1, 7, 4, 5, 53, 1],     # Pikeman
+    [2, 9, 7, 8, 79, 2],     # Knight
+    [3, 9, 9, 9, 106, 3],    # Paladin
+    [1, 4, 11, 4, 53, 2],    # Ballista
+    [2, 4, 10, 5, 53, 3],    # Mangonel
+    [3, 4, 12, 6, 53, 4],    # Trebuchet
+    [1, 7, 7, 2, 53, 8],     # Apprentice
+    [2, 7, 9, 2, 53, 9],     # Mage
+    [3, 7, 11, 2, 53, 10],   # Arcanist
+], dtype=np.int64)
+TIER, AGILITY, ATTACK, ARMOR, VITALITY, WISDOM = TROOP_PROPS.T
+# Squad slots of each tier, in the order find_first_free_troop_slot_in_squad fills them
+TIER_SLOTS = {1: range(0, 9), 2: range(9, 14), 3: range(14, 15)}
+
+
+def build_squad(troop_ids) -> int:
+    """Packed squad of new troops, each in the first free slot of its tier like add_troops_to_squad."""
+    ids = [0] * SLOTS
+    for troop_id in troop_ids:
+        if not 0 < troop_id < TROOP_ID_SIZE:
+            raise ValueError(f"unknown troop id {troop_id}")
+        slot = next((s for s in TIER_SLOTS[int(TIER[troop_id])] if ids[s] == 0), None)
+        if slot is None:
+            raise ValueError(f"no free slot for troop {troop_id}")
+        ids[slot] = troop_id
+    return sum((id + int(VITALITY[id]) * SHIFT) << (16 * slot) for slot, id in enumerate(ids))
+
+
+def unpack_squads(packed) -> tuple:
+    """(ids, vitality) (n, SLOTS) arrays of packed squads, like unpack_squad."""
+    packed = [int(p) for p in np.atleast_1d(np.asarray(packed, dtype=object))]
+    if any(p < 0 or p >> (16 * SLOTS) for p in packed):
+        raise ValueError("a packed squad does not fit 15 troop slots")
+    raw = b"".join(p.to_bytes(2 * SLOTS, "little") for p in packed)
+    slots = np.frombuffer(raw, dtype=np.uint8).reshape(len(packed), SLOTS, 2).astype(np.int64)
+    ids, vitality = slots[..., 0], slots[..., 1]
+    if (ids >= TROOP_ID_SIZE).any():
+        raise ValueError("unknown troop id in a packed squad")
+    # unpack_troop turns slots without an id into the empty troop
+    return ids, np.where(ids == 0, 0, vitality)
+
+
+def pack_squads(ids, vitality) -> list:
+    """Packed squads of (n, SLOTS) id and vitality arrays, like pack_squad."""
+    slots = np.stack([ids, vitality], axis=-1).astype(np.uint8)
+    return [int.from_bytes(row.tobytes(), "little") for row in slots]
+
+
+def apply_hunger_penalty(vitality) -> np.ndarray:
+    """Halves the vitality of every troop; troops left at 0 keep their slot."""
+    return vitality // 2
+
+
+def first_vital_troop(vitality) -> tuple:
+    """(slot, found) of the first troop with vitality in each squad, slot 0 if none."""
+    vital = vitality > 0
+    return vital.argmax(axis=1), vital.any(axis=1)
+
+
+def calculate_hit_points(attacker_ids, defender_ids, dice_roll) -> np.ndarray:
+    """Hits of attacking troops on defending troops, negative hits are 0 like is_nn."""
+    hits = (
+        (AGILITY[attacker_ids] - AGILITY[defender_ids])
+        + ATTACK[attacker_ids] * (dice_roll - ARMOR[defender_ids])
+        - (WISDOM[defender_ids] - WISDOM[attacker_ids])
+    )
+    return np.maximum(hits, 0)
+
+
+def hit_troop_in_squad(ids, vitality, rows, slots, hits):
+    """Takes `hits` off troop `slots` of squads `rows` in place; troops left without vitality are removed."""
+    left = vitality[rows, slots] - hits
+    killed = (hits > 0) & (left <= 0)
+    vitality[rows, slots] = np.where(killed, 0, np.where(hits > 0, left, vitality[rows, slots]))
+    ids[rows[killed], slots[killed]] = 0
+
+
+def roll_dice(source, count) -> np.ndarray:
+    """`count` 12 sided rolls (1 to 12) of the next raw values of `source`, like roll_dice."""
+    return (np.asarray(source.random_raw(count), dtype=np.uint64) % np.uint64(12)).astype(np.int64) + 1
+
+
+def _attack(a_ids, a_vit, d_ids, d_vit, rows, source):
+    """One `attack` for squads `rows`: the first vital troop of a hits the first vital troop of d."""
+    a_slot, a_found = first_vital_troop(a_vit[rows])
+    d_slot, d_found = first_vital_troop(d_vit[rows])
+    # get_first_vital_troop returns the empty troop when there is none
+    attacker = np.where(a_found, a_ids[rows, a_slot], 0)
+    defender = np.where(d_found, d_ids[rows, d_slot], 0)
+    hits = calculate_hit_points(attacker, defender, roll_dice(source, len(rows)))
+    hit_troop_in_squad(d_ids, d_vit, rows, d_slot, hits)
+    return hits
+
+
+class Battles:
+    """Outcome and final squads of a batch of battles."""
+
+    def __init__(self, outcome, steps, start, end):
+        self.outcome = outcome
+        self.steps = steps
+        self.attacker_start, self.defender_start = start
+        self.attacker_end, self.defender_end = end
+
+    def __len__(self):
+        return len(self.outcome)
+
+    def losses(self) -> dict:
+        """Vitality and troops lost per battle and side."""
+        (a_ids, a_vit), (d_ids, d_vit) = self.attacker_start, self.defender_start
+        (a_ids_end, a_vit_end), (d_ids_end, d_vit_end) = self.attacker_end, self.defender_end
+        return {
+            "attacker_vitality": a_vit.sum(axis=1) - a_vit_end.sum(axis=1),
+            "defender_vitality": d_vit.sum(axis=1) - d_vit_end.sum(axis=1),
+            "attacker_troops": (a_ids > 0).sum(axis=1) - (a_ids_end > 0).sum(axis=1),
+            "defender_troops": (d_ids > 0).sum(axis=1) - (d_ids_end > 0).sum(axis=1),
+        }
+
+    def summary(self) -> dict:
+        """Outcome shares, expected losses and the distribution of surviving troops."""
+        n = len(self)
+        summary = {
+            "battles": n,
+            "attacker_wins": float(np.mean(self.outcome == COMBAT_OUTCOME_ATTACKER_WINS)) if n else 0.0,
+            "defender_wins": float(np.mean(self.outcome == COMBAT_OUTCOME_DEFENDER_WINS)) if n else 0.0,
+            "undecided": float(np.mean(self.outcome == 0)) if n else 0.0,
+            "mean_steps": float(np.mean(self.steps)) if n else 0.0,
+        }
+        for name, values in self.losses().items():
+            summary[f"expected_{name}_lost"] = float(np.mean(values)) if n else 0.0
+        for side, (ids, _) in [("attacker", self.attacker_end), ("defender", self.defender_end)]:
+            survivors = np.bincount((ids > 0).sum(axis=1), minlength=SLOTS + 1)
+            summary[f"{side}_survivors"] = (survivors / max(n, 1)).tolist()
+        return summary
+
+    def packed(self) -> tuple:
+        """(attackers, defenders) packed squads after the battles."""
+        return pack_squads(*self.attacker_end), pack_squads(*self.defender_end)
+
+
+def run_battles(attacker, defender, source, max_steps=MAX_STEPS) -> Battles:
+    """run_combat_loop over (ids, vitality) squads, one battle per row.
+
+    The attacker strikes first; a battle ends as soon as one side has no
+    vitality left, its outcome is 0 if that takes more than `max_steps` attacks.
+    """
+    a_ids, a_vit = (np.array(a, dtype=np.int64) for a in attacker)
+    d_ids, d_vit = (np.array(d, dtype=np.int64) for d in defender)
+    start = ((a_ids.copy(), a_vit.copy()), (d_ids.copy(), d_vit.copy()))
+    n = len(a_ids)
+    outcome = np.zeros(n, dtype=np.int8)
+    steps = np.zeros(n, dtype=np.int64)
+    active = np.arange(n)
+    for step in range(max_steps):
+        if not len(active):
+            break
+        if step % 2 == 0:
+            _attack(a_ids, a_vit, d_ids, d_vit, active, source)
+            over = d_vit[active].sum(axis=1) == 0
+            outcome[active[over]] = COMBAT_OUTCOME_ATTACKER_WINS
+        else:
+            _attack(d_ids, d_vit, a_ids, a_vit, active, source)
+            over = a_vit[active].sum(axis=1) == 0
+            outcome[active[over]] = COMBAT_OUTCOME_DEFENDER_WINS
+        steps[active] += 1
+        active = active[~over]
+    return Battles(outcome, steps, start, ((a_ids, a_vit), (d_ids, d_vit)))
+
+
+def inflict_wall_defense(ids, vitality):
+    """Damage of breaching the wall to the first vital attacking troop, in place.
+
+    Like the contract, the population it should depend on is still a constant 5,
+    so the hit is 5 // POPULATION_PER_HIT_POINT = 0 for now.
+    """
+    hit_points = min(5 // POPULATION_PER_HIT_POINT, MAX_WALL_DEFENSE_HIT_POINTS)
+    rows = np.arange(len(ids))
+    slots, _ = first_vital_troop(vitality)
+    hit_troop_in_squad(ids, vitality, rows, slots, np.full(len(ids), hit_points))
+
+
+def simulate(attacker, defender, battles=10000, seed=None, source=None, attacker_hungry=False,
+             defender_hungry=False, max_steps=MAX_STEPS) -> Battles:
+    """`battles` runs of initiate_combat between packed squads.
+
+    `attacker` and `defender` are packed squads, one each or one per battle.
+    Rolls come from `source`, by default a PCG64 seeded with `seed`. Hungry sides
+    (no food in store) get the hunger penalty first, then the attacker breaches
+    the wall.
+    """
+    a_ids, a_vit = unpack_squads(attacker)
+    d_ids, d_vit = unpack_squads(defender)
+    if len(a_ids) == 1 and len(d_ids) == 1:
+        a_ids, a_vit, d_ids, d_vit = (np.repeat(x, battles, axis=0) for x in (a_ids, a_vit, d_ids, d_vit))
+    elif len(a_ids) != len(d_ids):
+        raise ValueError(f"{len(a_ids)} attackers for {len(d_ids)} defenders")
+    if attacker_hungry:
+        a_vit = apply_hunger_penalty(a_vit)
+    if defender_hungry:
+        d_vit = apply_hunger_penalty(d_vit)
+    inflict_wall_defense(a_ids, a_vit)
+    source = source if source is not None else np.random.PCG64(seed)
+    return run_battles((a_ids, a_vit), (d_ids, d_vit), source, max_steps)
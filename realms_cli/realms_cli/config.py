@@ -6,27 +6,30 @@ from realms_cli.realms_cli.config import Config
 
 ... = Config.NILE_NETWORK
 """
-from nile import deployments
 from nile.core.declare import alias_exists
 import os
 
+from realms_cli import registry
+
 
 def safe_load_deployment(alias: str, network: str):
     """Safely loads address from deployments file"""
-    try:
-        address, _ = next(deployments.load(alias, network))
-        print(f"Found deployment for alias {alias}.")
-        return address, _
-    except StopIteration:
+    found = registry.deployment(alias, network)
+    if found is None:
         print(f"Deployment for alias {alias} not found.")
         return None, None
+    print(f"Found deployment for alias {alias}.")
+    return found
 
 
 def safe_load_declarations(alias: str, network: str):
-    """Safely loads address from deployments file"""
-    address, _ = next(deployments.load_class(alias, network), None)
-    print(f"Found deployment for alias {alias}.")
-    return address
+    """Safely loads class hash from declarations file"""
+    class_hash = registry.declaration(alias, network)
+    if class_hash is None:
+        print(f"Declaration for alias {alias} not found.")
+        return None
+    print(f"Found declaration for alias {alias}.")
+    return class_hash
 
 
 def strhex_as_strfelt(strhex: str):
@@ -37,84 +40,60 @@ def strhex_as_strfelt(strhex: str):
         print("strhex address is None.")
 
 
+# Config attribute -> deployment alias, resolved on first access
+DEPLOYMENT_ALIASES = {
+    "ADMIN_ADDRESS": "account-0",
+    "USER_ADDRESS": "account-1",
+
+    "ARBITER_ADDRESS": "arbiter",
+    "CONTROLLER_ADDRESS": "moduleController",
+
+    "LORDS_ADDRESS": "lords",
+    "REALMS_ADDRESS": "realms",
+    "RESOURCES_ADDRESS": "resources",
+    "S_REALMS_ADDRESS": "s_realms",
+    "CRYPTS_ADDRESS": "crypts",
+    "S_CRYPTS_ADDRESS": "s_crypts",
+
+    "LORDS_PROXY_ADDRESS": "proxy_lords",
+    "REALMS_PROXY_ADDRESS": "proxy_realms",
+    "RESOURCES_PROXY_ADDRESS": "proxy_resources",
+    "S_REALMS_PROXY_ADDRESS": "proxy_s_realms",
+    # "CRYPTS_PROXY_ADDRESS": "proxy_crypts",
+    # "S_CRYPTS_PROXY_ADDRESS": "proxy_s_crypts",
+
+    "SETTLING_ADDRESS": "Settling",
+    "L02_RESOURCES_ADDRESS": "L02_Resources",
+    "L03_BUILDINGS_ADDRESS": "L03_Buildings",
+    "L04_CALCULATOR_ADDRESS": "L04_Calculator",
+    "L05_WONDERS_ADDRESS": "L05_Wonders",
+    "L06_COMBAT_ADDRESS": "L06_Combat",
+    # "L07_CRYPTS_ADDRESS": "L07_Crypts",
+
+    "SETTLING_PROXY_ADDRESS": "proxy_Settling",
+    "L02_RESOURCES_PROXY_ADDRESS": "proxy_L02_Resources",
+    "L03_BUILDINGS_PROXY_ADDRESS": "proxy_L03_Buildings",
+    "L04_CALCULATOR_PROXY_ADDRESS": "proxy_L04_Calculator",
+    "L05_WONDERS_PROXY_ADDRESS": "proxy_L05_Wonders",
+    "L06_COMBAT_PROXY_ADDRESS": "proxy_L06_Combat",
+    # "L07_CRYPTS_PROXY_ADDRESS": "proxy_L07_Crypts",
+
+    "XOROSHIRO_ADDRESS": "xoroshiro128_starstar",
+
+    "Exchange_ERC20_1155_ADDRESS": "Exchange_ERC20_1155",
+    "Exchange_ERC20_1155_PROXY_ADDRESS": "proxy_Exchange_ERC20_1155",
+}
+
+
 class Config:
+    """Addresses in DEPLOYMENT_ALIASES are only looked up when first read."""
+
     def __init__(self, nile_network: str):
         self.nile_network = "127.0.0.1" if nile_network == "localhost" else nile_network
 
         self.ADMIN_ALIAS = "STARKNET_ADMIN_PRIVATE_KEY"
-        self.ADMIN_ADDRESS, _ = safe_load_deployment(
-            "account-0", self.nile_network)
-
         self.INITIAL_LORDS_SUPPLY = 500000000 * (10 ** 18)
-
         self.USER_ALIAS = "STARKNET_PRIVATE_KEY"
-        self.USER_ADDRESS, _ = safe_load_deployment(
-            "account-1", self.nile_network)
-
-        self.ARBITER_ADDRESS, _ = safe_load_deployment(
-            "arbiter", self.nile_network)
-        self.CONTROLLER_ADDRESS, _ = safe_load_deployment(
-            "moduleController", self.nile_network)
-
-        self.LORDS_ADDRESS, _ = safe_load_deployment(
-            "lords", self.nile_network)
-        self.REALMS_ADDRESS, _ = safe_load_deployment(
-            "realms", self.nile_network)
-        self.RESOURCES_ADDRESS, _ = safe_load_deployment(
-            "resources", self.nile_network)
-        self.S_REALMS_ADDRESS, _ = safe_load_deployment(
-            "s_realms", self.nile_network)
-        self.CRYPTS_ADDRESS, _ = safe_load_deployment(
-            "crypts", self.nile_network)
-        self.S_CRYPTS_ADDRESS, _ = safe_load_deployment(
-            "s_crypts", self.nile_network)
-
-        self.LORDS_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_lords", self.nile_network)
-        self.REALMS_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_realms", self.nile_network)
-        self.RESOURCES_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_resources", self.nile_network)
-        self.S_REALMS_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_s_realms", self.nile_network)
-        # self.CRYPTS_PROXY_ADDRESS, _ = safe_load_deployment("proxy_crypts", self.nile_network)
-        # self.S_CRYPTS_PROXY_ADDRESS, _ = safe_load_deployment("proxy_s_crypts", self.nile_network)
-
-        self.SETTLING_ADDRESS, _ = safe_load_deployment(
-            "Settling", self.nile_network)
-        self.L02_RESOURCES_ADDRESS, _ = safe_load_deployment(
-            "L02_Resources", self.nile_network)
-        self.L03_BUILDINGS_ADDRESS, _ = safe_load_deployment(
-            "L03_Buildings", self.nile_network)
-        self.L04_CALCULATOR_ADDRESS, _ = safe_load_deployment(
-            "L04_Calculator", self.nile_network)
-        self.L05_WONDERS_ADDRESS, _ = safe_load_deployment(
-            "L05_Wonders", self.nile_network)
-        self.L06_COMBAT_ADDRESS, _ = safe_load_deployment(
-            "L06_Combat", self.nile_network)
-        # self.L07_CRYPTS_ADDRESS, _ = safe_load_deployment("L07_Crypts", self.nile_network)
-
-        self.SETTLING_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_Settling", self.nile_network)
-        self.L02_RESOURCES_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_L02_Resources", self.nile_network)
-        self.L03_BUILDINGS_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_L03_Buildings", self.nile_network)
-        self.L04_CALCULATOR_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_L04_Calculator", self.nile_network)
-        self.L05_WONDERS_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_L05_Wonders", self.nile_network)
-        self.L06_COMBAT_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_L06_Combat", self.nile_network)
-        # self.L07_CRYPTS_PROXY_ADDRESS, _ = safe_load_deployment("proxy_L07_Crypts", self.nile_network)
-
-        self.XOROSHIRO_ADDRESS, _ = safe_load_deployment(
-            "xoroshiro128_starstar", self.nile_network)
-
-        self.Exchange_ERC20_1155_ADDRESS, _ = safe_load_deployment(
-            "Exchange_ERC20_1155", self.nile_network)
-        self.Exchange_ERC20_1155_PROXY_ADDRESS, _ = safe_load_deployment(
-            "proxy_Exchange_ERC20_1155", self.nile_network)
 
         self.RESOURCES = [
             "Wood",
@@ -160,3 +139,12 @@ class Config:
             "ArcherTower",
             "Castle",
         ]
+
+    def __getattr__(self, name):
+        alias = DEPLOYMENT_ALIASES.get(name)
+        if alias is None or "nile_network" not in self.__dict__:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        address, _ = safe_load_deployment(alias, self.nile_network)
+        # memoized, later reads never reach __getattr__
+        setattr(self, name, address)
+        return address
@@ -0,0 +1,205 @@
+"""Decoded crypt layouts and their geometry, cached next to data/crypts.json.
+
+layouts = load_layouts()            # decodes once, then reads data/crypts_layouts.npz
+layouts.grid(1)                     # (size, size) bool array, True is floor
+layouts.stats["components"]         # one value per crypt, in layouts.ids order
+
+A `layout` is the hex of a size x size bitmap, row major and most significant
+bit first, then zero bits up to the end of its size * size // 256 + 1 32 byte
+words; 1 is floor, 0 is wall. All layouts are decoded together per size with
+np.unpackbits and kept bit packed in one (crypts, MAX_SIZE * MAX_SIZE / 8)
+uint8 array, grids padded with walls.
+
+Door positions are not part of the metadata, only their count, so
+`door_reachability` is the probability that two doors on uniformly random
+floor tiles are in the same (4-connected) floor component.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CRYPTS = "data/crypts.json"
+CACHE = "data/crypts_layouts.npz"
+MAX_SIZE = 25
+STATS = ["floor", "walls", "floor_ratio", "wall_floor_ratio", "components", "largest_component",
+         "door_reachability"]
+
+
+def decode(layouts, sizes) -> np.ndarray:
+    """(n, MAX_SIZE, MAX_SIZE) bool grids of hex layouts, floor is True."""
+    sizes = np.asarray(sizes)
+    grids = np.zeros((len(layouts), MAX_SIZE, MAX_SIZE), dtype=bool)
+    for size in np.unique(sizes):
+        rows = np.flatnonzero(sizes == size)
+        raw = b"".join(bytes.fromhex(layouts[i][2:].rjust(2 * _layout_bytes(size), "0")) for i in rows)
+        bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8).reshape(len(rows), -1), axis=1)
+        grids[rows, :size, :size] = bits[:, :size * size].reshape(len(rows), size, size)
+    return grids
+
+
+def _layout_bytes(size) -> int:
+    # one 32 byte word more than size * size bits need, a full one at size 16
+    return (size * size // 256 + 1) * 32
+
+
+def _forward_run_minimum(labels, floor, wall):
+    # runs of floor are numbered along axis 0, later runs get a smaller
+    # offset so the running minimum restarts after each wall
+    offset = (np.int32(len(labels) + 1) - np.cumsum(~floor, axis=0, dtype=np.int32)) * np.int32(wall + 1)
+    return np.minimum.accumulate(labels + offset, axis=0) - offset
+
+
+def _run_minimum(labels, floor, wall):
+    """Minimum label of each run of floor along axis 0.
+
+    The scan axis comes first so accumulate works on whole rows of the batch.
+    """
+    backward = _forward_run_minimum(labels[::-1], floor[::-1], wall)[::-1]
+    return np.where(floor, np.minimum(_forward_run_minimum(labels, floor, wall), backward), labels)
+
+
+def label_components(grids) -> np.ndarray:
+    """4-connected floor component labels of a batch of grids, -1 on walls.
+
+    Every floor cell ends up labelled with the smallest flat index of its
+    component. Each round takes the minimum over whole horizontal then
+    vertical runs of floor and jumps label pointers, for all the grids whose
+    labels still changed in the previous round at once.
+    """
+    n, height, width = grids.shape
+    # walls carry a label no floor cell takes, the last slot of `flat` holds it
+    wall = n * height * width
+    if (height + 1) * (wall + 1) * 2 >= 2 ** 31:
+        raise ValueError(f"too many grids to label at once: {n}")
+    flat = np.append(np.arange(wall, dtype=np.int32), np.int32(wall))
+    labels = flat[:-1].reshape(grids.shape)
+    labels[~grids] = wall
+    active = np.arange(n)
+    while len(active):
+        floor = grids[active]
+        previous = labels[active]
+        current = _run_minimum(
+            np.ascontiguousarray(previous.transpose(2, 0, 1)),
+            np.ascontiguousarray(floor.transpose(2, 0, 1)), wall,
+        ).transpose(1, 2, 0)
+        current = _run_minimum(
+            np.ascontiguousarray(current.transpose(1, 0, 2)),
+            np.ascontiguousarray(floor.transpose(1, 0, 2)), wall,
+        ).transpose(1, 0, 2)
+        labels[active] = current
+        # pointer jumping: take the label of the cell the label points at
+        for _ in range(4):
+            current = flat[current]
+        labels[active] = current
+        active = active[(current != previous).any(axis=(1, 2))]
+    return np.where(grids, labels, -1)
+
+
+def statistics(grids, sizes) -> dict:
+    """Per grid geometry, see STATS."""
+    n = len(grids)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    floor = grids.reshape(n, -1).sum(axis=1)
+    walls = sizes * sizes - floor
+    owners, sized_counts = [], []
+    # labelled per size, the padding would be most of the work
+    for size in np.unique(sizes):
+        rows = np.flatnonzero(sizes == size)
+        labels = label_components(np.ascontiguousarray(grids[rows, :size, :size])).ravel()
+        roots, counts = np.unique(labels[labels >= 0], return_counts=True)
+        owners.append(rows[roots // (size * size)])
+        sized_counts.append(counts)
+    owner = np.concatenate(owners) if owners else np.zeros(0, dtype=np.int64)
+    counts = np.concatenate(sized_counts) if sized_counts else np.zeros(0, dtype=np.int64)
+    components = np.bincount(owner, minlength=n)
+    largest = np.zeros(n, dtype=np.int64)
+    np.maximum.at(largest, owner, counts)
+    same_component = np.bincount(owner, weights=counts.astype(np.float64) ** 2, minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "floor": floor,
+            "walls": walls,
+            "floor_ratio": floor / (sizes * sizes),
+            "wall_floor_ratio": np.where(floor > 0, walls / np.maximum(floor, 1), np.inf),
+            "components": components,
+            "largest_component": largest,
+            "door_reachability": np.where(floor > 0, same_component / np.maximum(floor, 1) ** 2, 0.0),
+        }
+
+
+class CryptLayouts:
+    """Bit packed grids and geometry of every crypt with metadata."""
+
+    def __init__(self, ids, sizes, packed, num_doors, num_points, stats):
+        self.ids = ids
+        self.sizes = sizes
+        self.packed = packed
+        self.num_doors = num_doors
+        self.num_points = num_points
+        self.stats = stats
+        self._rows = {int(id): row for row, id in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def grids(self) -> np.ndarray:
+        """(crypts, MAX_SIZE, MAX_SIZE) bool grids, padded with walls."""
+        bits = np.unpackbits(self.packed, axis=1, count=MAX_SIZE * MAX_SIZE)
+        return bits.reshape(len(self.ids), MAX_SIZE, MAX_SIZE).astype(bool)
+
+    def grid(self, crypt_id) -> np.ndarray:
+        row = self._rows[int(crypt_id)]
+        size = int(self.sizes[row])
+        bits = np.unpackbits(self.packed[row], count=MAX_SIZE * MAX_SIZE).reshape(MAX_SIZE, MAX_SIZE)
+        return bits[:size, :size].astype(bool)
+
+    def row(self, crypt_id) -> dict:
+        """Geometry of one crypt."""
+        row = self._rows[int(crypt_id)]
+        return {name: values[row].item() for name, values in self.stats.items()}
+
+
+def build(crypts) -> CryptLayouts:
+    """Decodes the layouts of a crypts.json dict, crypts without metadata are left out."""
+    entries = [(int(id), crypt) for id, crypt in crypts.items() if crypt is not None]
+    entries.sort(key=lambda entry: entry[0])
+    sizes = np.array([crypt["size"] for _, crypt in entries], dtype=np.int64)
+    grids = decode([crypt["layout"] for _, crypt in entries], sizes)
+    return CryptLayouts(
+        ids=np.array([id for id, _ in entries], dtype=np.int64),
+        sizes=sizes,
+        packed=np.packbits(grids.reshape(len(entries), -1), axis=1),
+        num_doors=np.array([crypt["numDoors"] for _, crypt in entries], dtype=np.int64),
+        num_points=np.array([crypt["numPoints"] for _, crypt in entries], dtype=np.int64),
+        stats=statistics(grids, sizes),
+    )
+
+
+def _digest(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_layouts(src=CRYPTS, cache=CACHE) -> CryptLayouts:
+    """Layouts of `src`, from `cache` unless `src` changed since it was written."""
+    digest = _digest(src)
+    if cache and os.path.exists(cache):
+        with np.load(cache) as saved:
+            if str(saved["source"]) == digest:
+                return CryptLayouts(
+                    saved["ids"], saved["sizes"], saved["packed"], saved["num_doors"],
+                    saved["num_points"], {name: saved[name] for name in STATS},
+                )
+    with open(src) as f:
+        layouts = build(json.load(f))
+    if cache:
+        temporary = cache + ".tmp.npz"
+        np.savez_compressed(
+            temporary, source=np.array(digest), ids=layouts.ids, sizes=layouts.sizes,
+            packed=layouts.packed, num_doors=layouts.num_doors, num_points=layouts.num_points,
+            **layouts.stats,
+        )
+        os.replace(temporary, cache)
+    return layouts
@@ -0,0 +1,80 @@
+"""Packs crypt metadata from data/crypts.json into data/crypts_bit.json.
+
+stats = pack_crypts_file()    # {"crypts": 8772, "skipped": 227, "seconds": ..., "per_second": ...}
+write_crypts_store()          # the same values in data/crypts_bit.bin, see packed_store
+
+Crypts are parsed one at a time from the json file, packed with the precomputed
+environment and affinity maps and written out in chunks. Memory stays bounded
+by the read chunk and `write_every` packed values, not by the collection.
+"""
+import json
+import os
+import time
+
+from realms_cli.binary_converter import CryptPacker, pack_crypts
+from realms_cli.json_stream import WRITE_EVERY, iter_object_items, write_json_list
+from realms_cli.packed_store import CRYPTS_STORE, PackedStore, write_store
+
+CRYPTS = "data/crypts.json"
+CRYPTS_BIT = "data/crypts_bit.json"
+ENVIRONMENTS = "data/crypts_environments.json"
+AFFINITIES = "data/crypts_affinities.json"
+
+
+def load_tables(environments=ENVIRONMENTS, affinities=AFFINITIES):
+    with open(environments) as f, open(affinities) as g:
+        return json.load(f), json.load(g)
+
+
+def crypt_of(crypt_token_id, path=CRYPTS):
+    """Metadata of one crypt, reading the file only up to it."""
+    for id, crypt in iter_object_items(path):
+        if id == str(crypt_token_id) and crypt is not None:
+            return crypt
+    raise KeyError(f"crypt {crypt_token_id} has no metadata in {path}")
+
+
+def packed_crypt(crypt_token_id, path=CRYPTS, store=CRYPTS_STORE):
+    """Packed data of one crypt, from the binary store when there is one."""
+    if store and os.path.exists(store):
+        with PackedStore(store) as crypts:
+            packed = crypts.get(int(crypt_token_id))
+        if packed is None:
+            raise KeyError(f"crypt {crypt_token_id} has no metadata in {store}")
+        return packed
+    return CryptPacker(*load_tables()).pack(crypt_of(crypt_token_id, path))
+
+
+def write_crypts_store(src=CRYPTS, dst=CRYPTS_STORE) -> int:
+    """Streams every crypt of `src` through the packer into a binary store, returns its slots."""
+    environments, affinities = load_tables()
+    return write_store(dst, pack_crypts(iter_object_items(src), environments, affinities))
+
+
+def pack_crypts_file(src=CRYPTS, dst=CRYPTS_BIT, write_every=WRITE_EVERY) -> dict:
+    """Streams every crypt of `src` through the packer into `dst`, as [{id: packed}].
+
+    Returns how many crypts were packed, skipped for lack of metadata, and the throughput.
+    """
+    environments, affinities = load_tables()
+    read = 0
+
+    def items():
+        nonlocal read
+        for item in iter_object_items(src):
+            read += 1
+            yield item
+
+    start = time.perf_counter()
+    count = write_json_list(
+        dst,
+        ({id: packed} for id, packed in pack_crypts(items(), environments, affinities)),
+        write_every,
+    )
+    seconds = time.perf_counter() - start
+    return {
+        "crypts": count,
+        "skipped": read - count,
+        "seconds": seconds,
+        "per_second": read / seconds if seconds else 0.0,
+    }
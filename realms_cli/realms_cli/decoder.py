@@ -0,0 +1,223 @@
+"""Decodes raw call output felts into typed values, driven by contract ABIs.
+
+decoder = Decoder(abi)
+out = decoder.decode("get_realm_info", felts)      # Outputs(realm_data=...)
+out.realm_data.regions
+
+Felts become ints, Uint256 a Uint256(low, high) with `.value`, structs a
+namedtuple per ABI struct, tuples tuples and `T*` outputs an ArrayView over the
+result list that decodes elements as they are read instead of copying them.
+Each function's output layout is compiled once and decoded in a single pass.
+"""
+import json
+from collections import namedtuple
+from collections.abc import Sequence
+from functools import lru_cache
+
+from nile.common import ABIS_DIRECTORY
+
+
+class Uint256(namedtuple("Uint256", "low high")):
+    __slots__ = ()
+
+    @property
+    def value(self) -> int:
+        return self.low + (self.high << 128)
+
+    def __int__(self):
+        return self.value
+
+
+class ArrayView(Sequence):
+    """Read-only view of `length` elements of `size` felts starting at `start`."""
+
+    __slots__ = ("_felts", "_start", "_length", "_size", "_read")
+
+    def __init__(self, felts, start, length, size, read):
+        self._felts = felts
+        self._start = start
+        self._length = length
+        self._size = size
+        self._read = read
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("array index out of range")
+        return self._read(self._felts, self._start + index * self._size)[0]
+
+    def __iter__(self):
+        felts, read = self._felts, self._read
+        position = self._start
+        for _ in range(self._length):
+            value, position = read(felts, position)
+            yield value
+
+    def __repr__(self):
+        return f"ArrayView({list(self)!r})"
+
+
+def _read_felt(felts, position):
+    return felts[position], position + 1
+
+
+def _read_uint256(felts, position):
+    return Uint256(felts[position], felts[position + 1]), position + 2
+
+
+def _split_tuple(type_):
+    """'(a: felt, b: (felt, felt))' -> [('a', 'felt'), ('b', '(felt, felt)')]"""
+    parts, depth, current = [], 0, ""
+    for char in type_[1:-1]:
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    named = []
+    for i, part in enumerate(parts):
+        if ":" in part and not part.startswith("("):
+            name, part = part.split(":", 1)
+            named.append((name.strip(), part.strip()))
+        else:
+            named.append((f"_{i}", part))
+    return named
+
+
+class Decoder:
+    """Output decoder of one contract ABI."""
+
+    def __init__(self, abi: list):
+        self.structs = {}
+        self.functions = {}
+        for entry in abi:
+            if entry["type"] == "struct":
+                self.structs[entry["name"]] = entry
+            elif entry["type"] == "function":
+                self.functions[entry["name"]] = entry
+        self._readers = {}
+        self._outputs = {}
+
+    def reader(self, type_):
+        """Returns (read, size): read(felts, position) -> (value, next position)."""
+        cached = self._readers.get(type_)
+        if cached is not None:
+            return cached
+        if type_ == "felt":
+            reader = (_read_felt, 1)
+        elif type_ == "Uint256":
+            reader = (_read_uint256, 2)
+        elif type_.startswith("("):
+            members = [self.reader(t) for _, t in _split_tuple(type_)]
+            reader = (self._sequence(members, tuple), sum(size for _, size in members))
+        elif type_ in self.structs:
+            struct = self.structs[type_]
+            members = sorted(struct["members"], key=lambda m: m["offset"])
+            cls = namedtuple(type_, [m["name"] for m in members])
+            readers = [self.reader(m["type"]) for m in members]
+            reader = (self._sequence(readers, lambda values: cls(*values)), struct["size"])
+        elif type_.endswith("*"):
+            raise ValueError(f"pointer {type_} outside of an output array")
+        else:
+            raise ValueError(f"unknown ABI type {type_}")
+        self._readers[type_] = reader
+        return reader
+
+    @staticmethod
+    def _sequence(readers, build):
+        reads = [read for read, _ in readers]
+
+        def read(felts, position):
+            values = []
+            for read_member in reads:
+                value, position = read_member(felts, position)
+                values.append(value)
+            return build(values), position
+
+        return read
+
+    def _compile(self, function):
+        entry = self.functions.get(function)
+        if entry is None:
+            raise KeyError(f"{function} is not in the ABI")
+        names = [output["name"] for output in entry["outputs"]]
+        steps = []
+        for output in entry["outputs"]:
+            type_ = output["type"]
+            if type_.endswith("*"):
+                read, size = self.reader(type_[:-1])
+                steps.append((True, read, size))
+            else:
+                steps.append((False,) + self.reader(type_))
+        cls = namedtuple(f"{function}_outputs", names, rename=True)
+        self._outputs[function] = (cls, steps)
+        return cls, steps
+
+    def decode(self, function, felts):
+        """Decodes the outputs of `function` from the raw result felts."""
+        cls, steps = self._outputs.get(function) or self._compile(function)
+        if not isinstance(felts, list):
+            felts = list(felts)
+        values = []
+        position = 0
+        for is_array, read, size in steps:
+            if is_array:
+                # Cairo ABIs put the length in the output right before the array
+                length = values[-1]
+                values.append(ArrayView(felts, position, length, size, read))
+                position += length * size
+            else:
+                value, position = read(felts, position)
+                values.append(value)
+        if position != len(felts):
+            raise ValueError(f"{function} returned {len(felts)} felts, its ABI describes {position}")
+        return cls(*values)
+
+
+@lru_cache(maxsize=None)
+def load_decoder(abi_path: str) -> Decoder:
+    with open(abi_path) as fp:
+        return Decoder(json.load(fp))
+
+
+def get_decoder(contract_alias, network, function=None) -> Decoder:
+    """Decoder of a deployed alias, from the ABI it was registered with.
+
+    Proxies registered with the proxy ABI fall back to the ABI of their
+    implementation alias (proxy_X -> X) when `function` is not in it.
+    """
+    from realms_cli import registry
+
+    candidates = []
+    deployment = registry.deployment(contract_alias, network)
+    if deployment is not None:
+        candidates.append(deployment[1])
+    if str(contract_alias).startswith("proxy_"):
+        implementation = str(contract_alias)[len("proxy_"):]
+        deployment = registry.deployment(implementation, network)
+        if deployment is not None:
+            candidates.append(deployment[1])
+        candidates.append(f"{ABIS_DIRECTORY}/{implementation}.json")
+    candidates.append(f"{ABIS_DIRECTORY}/{contract_alias}.json")
+
+    for abi_path in candidates:
+        try:
+            decoder = load_decoder(abi_path)
+        except FileNotFoundError:
+            continue
+        if function is None or function in decoder.functions:
+            return decoder
+    raise FileNotFoundError(
+        f"no ABI of {contract_alias} describing {function} (tried {', '.join(candidates)}), "
+        "compile the contracts first"
+    )
@@ -1,16 +1,41 @@
 """Helper functions for repeating nre patterns."""
 
-import time
+from nile.common import ABIS_DIRECTORY
+
+from realms_cli.caller_invoker import declare, deploy, parse_declare, parse_send
+from realms_cli.tx_tracker import wait_for_txs
+
+# deploy and declare tx hashes sent by logged_deploy / logged_declare that nobody waited for yet
+_pending_deploys = []
+
 
 def logged_deploy(nre, contract_name, alias, arguments):
     print(f"deploying {alias} contract")
-    address, abi = nre.deploy(
-        contract_name,
-        alias=alias,
-        arguments=arguments,
-    )
+    out = deploy(nre.network, alias, arguments=arguments, contract_name=contract_name)
+    address, tx_hash = parse_send(out)
+    abi = f"{ABIS_DIRECTORY}/{contract_name}.json"
     print(address, abi)
-    print("waiting 5 sec")
-    time.sleep(5)
+    _pending_deploys.append(tx_hash)
 
     return address, abi
+
+
+def logged_declare(nre, contract_name, alias):
+    print(f"declaring {alias} contract")
+    out = declare(contract_name, alias, nre.network)
+    tx_hash = parse_declare(out)
+    if tx_hash is not None:
+        _pending_deploys.append(tx_hash)
+    return out
+
+
+def wait_for_deploys(nre) -> list:
+    """Blocks until every deploy and declare sent so far is accepted, instead of a fixed sleep."""
+    tx_hashes = list(_pending_deploys)
+    _pending_deploys.clear()
+    print(f"🕒 Waiting for {len(tx_hashes)} deploy(s) before invoking")
+    statuses = wait_for_txs(nre.network, tx_hashes)
+    rejected = [h for h, s in zip(tx_hashes, statuses) if s["tx_status"] == "REJECTED"]
+    if rejected:
+        raise RuntimeError(f"deploy transaction(s) rejected: {', '.join(rejected)}")
+    return statuses
@@ -0,0 +1,291 @@
+"""Local SQLite index of settling, relic, trade and desiege events.
+
+indexer = EventIndexer.for_network("goerli")
+indexer.sync("goerli")                         # blocks since the last sync
+indexer.rows("settling", token_id=5042)        # who settled / unsettled it
+
+Blocks are read from the feeder gateway in chunks, the events of the tracked
+contracts are decoded with the layouts below and bulk inserted, and a cursor
+per (network, contract) records the last indexed block so the next sync only
+reads newer blocks. Inserts are keyed by (tx_hash, event_index): replaying a
+range, e.g. events captured from the in-memory `Starknet` test state, is
+idempotent.
+"""
+import sqlite3
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from realms_cli.calldata import to_int
+
+DEFAULT_PATH = ".{network}.events.db"
+CHUNK_BLOCKS = 50
+
+# sqlite integers are signed 64 bit, bigger values are stored as decimal text
+MAX_SQL_INT = 2 ** 63 - 1
+
+EventSpec = namedtuple("EventSpec", "name table kind columns")
+RawEvent = namedtuple("RawEvent", "block_number timestamp tx_hash event_index from_address keys data")
+
+# data layouts of the @event functions, column kinds are felt, uint256 and address
+SETTLING = [("owner", "address"), ("token_id", "uint256")]
+TIMES = [("token_id", "uint256"), ("time_staked", "felt")]
+EVENTS = [
+    EventSpec("Settled", "settling", "settled", SETTLING),
+    EventSpec("UnSettled", "settling", "unsettled", SETTLING),
+    EventSpec("VaultTime", "settling_times", "vault", TIMES),
+    EventSpec("ClaimTime", "settling_times", "claim", TIMES),
+    EventSpec("RelicUpdate", "relics", None, [("relic_id", "uint256"), ("owner_token_id", "uint256")]),
+    EventSpec("TradeAction", "trades", None, [
+        ("token_contract", "address"), ("token_id", "uint256"), ("expiration", "felt"),
+        ("price", "felt"), ("poster", "address"), ("status", "felt"), ("trade_id", "felt"),
+    ]),
+    EventSpec("game_action", "game_actions", None, [
+        ("game_idx", "felt"), ("token_id", "felt"), ("token_offset", "felt"),
+        ("amount", "felt"), ("action_type", "felt"),
+    ]),
+]
+
+# deployment aliases, first deployed one wins -> events it emits
+# (module events come from the proxy address)
+SOURCES = {
+    ("proxy_Settling", "proxy_L01_Settling"): ("Settled", "UnSettled", "VaultTime", "ClaimTime"),
+    ("proxy_Relics",): ("RelicUpdate",),
+    ("bibliotheca_marketplace",): ("TradeAction",),
+    ("01_TowerDefence",): ("game_action",),
+}
+
+INDEXES = {
+    "settling": ["token_id", "owner"],
+    "settling_times": ["token_id"],
+    "relics": ["relic_id", "owner_token_id"],
+    "trades": ["token_id", "poster", "trade_id"],
+    "game_actions": ["token_id", "game_idx"],
+}
+
+
+def selector(name) -> int:
+    # imported on first use, it loads most of cairo-lang
+    from starkware.starknet.public.abi import get_selector_from_name
+
+    return get_selector_from_name(name)
+
+
+@lru_cache(maxsize=None)
+def events_by_selector() -> dict:
+    return {selector(spec.name): spec for spec in EVENTS}
+
+
+def sql_value(kind, value):
+    """Stored form of a decoded column value."""
+    if kind == "address":
+        return hex(value)
+    return value if value <= MAX_SQL_INT else str(value)
+
+
+def decode(spec, data) -> list:
+    """Column values of one event from its data felts."""
+    size = sum(2 if kind == "uint256" else 1 for _, kind in spec.columns)
+    if len(data) != size:
+        raise ValueError(f"{spec.name} has {len(data)} data felts, its layout describes {size}")
+    values, position = [], 0
+    for _, kind in spec.columns:
+        if kind == "uint256":
+            value = data[position] + (data[position + 1] << 128)
+            position += 2
+        else:
+            value = data[position]
+            position += 1
+        values.append(sql_value(kind, value))
+    return values
+
+
+def events_of_block(block) -> list:
+    """RawEvents of a feeder gateway block."""
+    events = []
+    # position in the block, so (block_number, event_index) is chain order
+    event_index = 0
+    for receipt in block.get("transaction_receipts", []):
+        tx_hash = hex(to_int(receipt["transaction_hash"]))
+        for event in receipt.get("events", []):
+            events.append(RawEvent(
+                block["block_number"], block.get("timestamp"), tx_hash, event_index,
+                to_int(event["from_address"]),
+                [to_int(key) for key in event["keys"]],
+                [to_int(felt) for felt in event["data"]],
+            ))
+            event_index += 1
+    return events
+
+
+def events_of_execution(block_number, execution_info, tx_hash, timestamp=None, first_index=0) -> list:
+    """RawEvents of a transaction executed on the in-memory `Starknet` state.
+
+    `first_index` is the position of its first event in the block.
+    """
+    return [
+        RawEvent(block_number, timestamp, hex(to_int(tx_hash)), first_index + i,
+                 event.from_address, list(event.keys), list(event.data))
+        for i, event in enumerate(execution_info.raw_events)
+    ]
+
+
+class EventIndexer:
+    """SQLite store of decoded events; `sources` maps contract addresses to event names."""
+
+    def __init__(self, path=":memory:", sources=None):
+        self.path = path
+        self.sources = {}
+        for address, names in (sources or {}).items():
+            self.track(address, names)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._create()
+
+    @classmethod
+    def for_network(cls, network, path=None, aliases=SOURCES):
+        """Indexer of the deployed SOURCES aliases, unknown aliases are skipped."""
+        from realms_cli import registry
+
+        sources = {}
+        for candidates, names in aliases.items():
+            deployments = [registry.deployment(alias, network) for alias in candidates]
+            deployments = [d for d in deployments if d is not None]
+            if not deployments:
+                print(f"{' / '.join(candidates)} not deployed on {network}, not indexing {', '.join(names)}")
+                continue
+            sources[deployments[0][0]] = names
+        return cls(path or DEFAULT_PATH.format(network=network), sources)
+
+    def track(self, address, names):
+        self.sources[to_int(address)] = {selector(name) for name in names}
+
+    def _create(self):
+        tables = {}
+        for spec in EVENTS:
+            tables.setdefault(spec.table, (spec.kind is not None, spec.columns))
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cursors ("
+                "network TEXT, address TEXT, block_number INTEGER, PRIMARY KEY (network, address))"
+            )
+            for table, (has_kind, columns) in tables.items():
+                definitions = ["block_number INTEGER", "timestamp INTEGER", "tx_hash TEXT",
+                               "event_index INTEGER", "from_address TEXT"]
+                if has_kind:
+                    definitions.append("kind TEXT")
+                definitions += [name for name, _ in columns]
+                self._db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)}, "
+                    "PRIMARY KEY (tx_hash, event_index))"
+                )
+                for column in INDEXES.get(table, []) + ["block_number"]:
+                    self._db.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})"
+                    )
+
+    def _rows(self, events):
+        """Groups the tracked ones of `events` into table -> row tuples."""
+        rows = {}
+        specs = events_by_selector()
+        for event in events:
+            if not event.keys:
+                continue
+            selectors = self.sources.get(event.from_address)
+            if selectors is None or event.keys[0] not in selectors:
+                continue
+            spec = specs[event.keys[0]]
+            row = [event.block_number, event.timestamp, event.tx_hash, event.event_index,
+                   hex(event.from_address)]
+            if spec.kind is not None:
+                row.append(spec.kind)
+            row += decode(spec, event.data)
+            rows.setdefault(spec.table, []).append(tuple(row))
+        return rows
+
+    def ingest(self, events, network=None, block_number=None) -> int:
+        """Inserts the tracked ones of `events`, returns how many rows were new.
+
+        With `network`, the cursors of every tracked contract move to
+        `block_number` in the same transaction.
+        """
+        rows = self._rows(events)
+        inserted = 0
+        with self._lock, self._db:
+            for table, values in rows.items():
+                placeholders = ", ".join("?" * len(values[0]))
+                before = self._db.total_changes
+                self._db.executemany(f"INSERT OR IGNORE INTO {table} VALUES ({placeholders})", values)
+                inserted += self._db.total_changes - before
+            if network is not None:
+                self._db.executemany(
+                    "INSERT INTO cursors VALUES (?, ?, ?) ON CONFLICT (network, address) "
+                    "DO UPDATE SET block_number = max(block_number, excluded.block_number)",
+                    [(network, hex(address), block_number) for address in self.sources],
+                )
+        return inserted
+
+    def cursor(self, network, address=None):
+        """Last indexed block of a contract, or the oldest one of every tracked contract.
+
+        None when some contract was never indexed.
+        """
+        addresses = [address] if address is not None else list(self.sources)
+        blocks = []
+        for tracked in addresses:
+            row = self._db.execute(
+                "SELECT block_number FROM cursors WHERE network = ? AND address = ?",
+                (network, hex(to_int(tracked))),
+            ).fetchone()
+            if row is None:
+                return None
+            blocks.append(row[0])
+        return min(blocks) if blocks else None
+
+    def sync(self, network, from_block=0, to_block=None, get_block=None, scheduler=None) -> int:
+        """Indexes the blocks after the cursor up to `to_block` (latest by default).
+
+        Returns the number of new rows.
+        """
+        if get_block is None:
+            from realms_cli.gateway import get_gateway
+
+            get_block = get_gateway(network).get_block
+        if scheduler is None:
+            from realms_cli.scheduler import CallScheduler
+
+            scheduler = CallScheduler()
+        if to_block is None:
+            to_block = get_block("latest")["block_number"]
+        cursor = self.cursor(network)
+        start = from_block if cursor is None else max(from_block, cursor + 1)
+        inserted = 0
+        for first in range(start, to_block + 1, CHUNK_BLOCKS):
+            last = min(to_block, first + CHUNK_BLOCKS - 1)
+            blocks = scheduler.run(get_block, range(first, last + 1))
+            events = [event for block in blocks for event in events_of_block(block)]
+            inserted += self.ingest(events, network, last)
+            print(f"indexed blocks {first}-{last} of {network}, {inserted} new event(s)")
+        return inserted
+
+    def rows(self, table, **where) -> list:
+        """Rows of `table` matching the column equalities, oldest first, as dicts."""
+        tables = {spec.table: spec for spec in EVENTS}
+        if table not in tables:
+            raise KeyError(f"unknown event table {table}")
+        kinds = dict(tables[table].columns)
+        conditions, parameters = [], []
+        for column, value in where.items():
+            conditions.append(f"{column} = ?")
+            if column in kinds:
+                value = sql_value(kinds[column], to_int(value))
+            parameters.append(value)
+        clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self._db.execute(
+            f"SELECT * FROM {table}{clause} ORDER BY block_number, event_index", parameters
+        )
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self._db.close()
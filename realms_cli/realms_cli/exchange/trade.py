@@ -1,13 +1,12 @@
 # First, import click dependency
 import click
-from nile.core.account import Account
-from realms_cli.caller_invoker import wrapped_call, wrapped_send, compile, deploy
-from realms_cli.config import Config, strhex_as_strfelt, safe_load_deployment
-from realms_cli.shared import uint, expanded_uint_list, expanded_uint_list_decimals, uint_decimal, from_bn
-from realms_cli.deployer import logged_deploy
+from realms_cli.caller_invoker import load_account, wrapped_call, wrapped_send
+from realms_cli.multicall import Multicall
+from realms_cli.config import Config, strhex_as_strfelt
+from realms_cli.shared import uint, from_bn
+from realms_cli.calldata import Calldata
 from realms_cli.utils import print_over_colums
 import time
-import sys
 
 @click.command()
 @click.option('--max_currency', type=click.STRING, help='Maximum to sell', prompt=True)
@@ -33,14 +32,14 @@ def buy_tokens(resource_ids, resource_values, max_currency, network):
         signer_alias=config.USER_ALIAS,
         contract_alias="proxy_Exchange_ERC20_1155",
         function="buy_tokens",
-        arguments=[
-            *uint_decimal(max_currency), #computed
-            len(resource_ids),
-            *expanded_uint_list(resource_ids),
-            len(resource_ids),
-            *expanded_uint_list_decimals(resource_values),
-            int(time.time() + 3000)
-        ],
+        arguments=(
+            Calldata()
+            .uint256(max_currency, scale=10 ** 18)  # computed
+            .uint256_array(resource_ids)
+            .uint256_array(resource_values, scale=10 ** 18)
+            .felt(int(time.time() + 3000))
+            .to_list()
+        ),
     )
 
 
@@ -68,14 +67,14 @@ def sell_tokens(resource_ids, resource_values, min_currency, network):
         signer_alias=config.USER_ALIAS,
         contract_alias="proxy_Exchange_ERC20_1155",
         function="sell_tokens",
-        arguments=[
-            *uint_decimal(min_currency), #computed
-            len(resource_ids),
-            *expanded_uint_list(resource_ids),
-            len(resource_ids),
-            *expanded_uint_list_decimals(resource_values),
-            int(time.time() + 3000)
-        ],
+        arguments=(
+            Calldata()
+            .uint256(min_currency, scale=10 ** 18)  # computed
+            .uint256_array(resource_ids)
+            .uint256_array(resource_values, scale=10 ** 18)
+            .felt(int(time.time() + 3000))
+            .to_list()
+        ),
     )
 
 @click.command()
@@ -105,12 +104,12 @@ def get_all_sell_price(network):
             n_resources,
             *values,
         ],
+        typed=True,
     )
     
-    out = out.split(" ")
     pretty_out = []
-    for i, resource in enumerate(config.RESOURCES):
-        pretty_out.append(f"1 {resource} sells {from_bn(out[i*2+1])}  $LORDS")
+    for resource, price in zip(config.RESOURCES, out.sell_value):
+        pretty_out.append(f"1 {resource} sells {from_bn(price)}  $LORDS")
     print('MARKET SELL PRICES PER LORDS')
     print_over_colums(pretty_out)
 
@@ -143,13 +142,12 @@ def get_all_buy_price(network):
             n_resources,
             *values,
         ],
+        typed=True,
     )
-    # print(out)
-    
-    out = out.split(" ")
+
     pretty_out = []
-    for i, resource in enumerate(config.RESOURCES):
-        pretty_out.append(f"1 {resource} buys {from_bn(out[i*2+1])} $LORDS")
+    for resource, price in zip(config.RESOURCES, out.prices):
+        pretty_out.append(f"1 {resource} buys {from_bn(price)} $LORDS")
     print('MARKET BUY PRICES PER LORDS')
     print_over_colums(pretty_out)
 
@@ -176,12 +174,12 @@ def get_buy_price(resource_ids, resource_values, network):
         network=config.nile_network,
         contract_alias="proxy_Exchange_ERC20_1155",
         function="get_all_buy_price",
-        arguments=[
-            n_resources,
-            *expanded_uint_list(resource_ids),
-            n_resources,
-            *expanded_uint_list_decimals(resource_values),
-        ],
+        arguments=(
+            Calldata()
+            .uint256_array(resource_ids)
+            .uint256_array(resource_values, scale=10 ** 18)
+            .to_list()
+        ),
     )
     print(out)
     
@@ -215,19 +213,19 @@ def add_liq(resource_ids, resource_values, max_currency, network):
         signer_alias=config.ADMIN_ALIAS,
         contract_alias="proxy_Exchange_ERC20_1155",
         function="add_liquidity",
-        arguments=[
-            len(resource_ids),
-            *expanded_uint_list_decimals(currency),
-            len(resource_ids),
-            *expanded_uint_list(resource_ids),
-            len(resource_ids),
-            *expanded_uint_list_decimals(resource_values),
-            int(time.time() + 3000)
-        ],
+        arguments=(
+            Calldata()
+            .felt(len(resource_ids))
+            .uint256s(currency, scale=10 ** 18)
+            .uint256_array(resource_ids)
+            .uint256_array(resource_values, scale=10 ** 18)
+            .felt(int(time.time() + 3000))
+            .to_list()
+        ),
     )
 
 @click.command()
-@click.option("--address", default="", help="Account address in hex format 0x...")
+@click.option("--address", default="", help="Account address(es) in hex format 0x..., comma separated")
 @click.option("--network", default="goerli")
 def get_lp_pos(address, network):
     """
@@ -237,8 +235,9 @@ def get_lp_pos(address, network):
     config = Config(nile_network=network)
 
     if address == "":
-        nile_account = Account(config.ADMIN_ALIAS, network)
+        nile_account = load_account(config.ADMIN_ALIAS, network)
         address = nile_account.address
+    addresses = [a.strip() for a in address.split(",")]
 
     n_resources = len(config.RESOURCES)
 
@@ -247,24 +246,23 @@ def get_lp_pos(address, network):
         uints.append(str(i+1))
         uints.append("0")
 
-    out = wrapped_call(
-        network=config.nile_network,
-        contract_alias="proxy_Exchange_ERC20_1155",
-        function="balanceOfBatch",
-        arguments=[
+    mc = Multicall(config.nile_network)
+    for account in addresses:
+        mc.add("proxy_Exchange_ERC20_1155", "balanceOfBatch", [
             n_resources,
-            *[address for _ in range(n_resources)],
+            *[account for _ in range(n_resources)],
             n_resources,
             *uints,
-        ],
-    )
+        ])
 
-    out = out.split(" ")
-    pretty_out = []
-    for i, resource in enumerate(config.RESOURCES):
-        pretty_out.append(f"LP {resource} : {from_bn(out[i*2+1])}")
+    for account, out in zip(addresses, mc.execute(typed=True)):
+        pretty_out = []
+        for resource, balance in zip(config.RESOURCES, out.balances):
+            pretty_out.append(f"LP {resource} : {from_bn(balance)}")
 
-    print_over_colums(pretty_out)
+        if len(addresses) > 1:
+            print(f"\n{account}")
+        print_over_colums(pretty_out)
 
 @click.command()
 @click.argument("token_id", nargs=1)
@@ -282,9 +280,9 @@ def get_currency_r(token_id, network):
         arguments=[
                 *uint(token_id)
         ],
+        typed=True,
     )
-    out = out.split(" ")
-    print(from_bn(out[0]))
+    print(from_bn(out.currency_reserves))
     # print(int(out[0]))
 
 @click.command()
@@ -304,9 +302,9 @@ def get_token_r(token_id, network):
             strhex_as_strfelt(config.Exchange_ERC20_1155_PROXY_ADDRESS),
             *uint(token_id)
         ],
+        typed=True,
     )
-    out = out.split(" ")
-    print(from_bn(out[0]))
+    print(from_bn(out.balance))
     # print(int(out[0]))    
 
 @click.command()
@@ -336,11 +334,11 @@ def get_all_rates(network):
             n_resources,
             *values,
         ],
+        typed=True,
     )
     
-    out = out.split(" ")
     pretty_out = []
-    for i, resource in enumerate(config.RESOURCES):
-        pretty_out.append(f"1 {resource} sells {from_bn(out[i*2+1])}  $LORDS")
+    for resource, price in zip(config.RESOURCES, out.prices):
+        pretty_out.append(f"1 {resource} sells {from_bn(price)}  $LORDS")
     print('MARKET SELL PRICES PER LORDS')
     print_over_colums(pretty_out)
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""max_fee for account transactions from cached fee estimates.
+
+Estimates are keyed by (network, called (contract, selector) set, calldata
+length bucket, block): a batch of similar transactions pays one estimate
+round-trip, later ones reuse it, scaled up when their calldata is longer than
+the one that was estimated. The estimate times `multiplier` is the max_fee.
+
+When a transaction cannot be estimated (e.g. its nonce is still ahead of the
+chain in a pipelined batch and nothing similar is cached), the fixed
+`fallback` fee is used as before.
+"""
+import os
+import threading
+
+MULTIPLIER_ENV = "REALMS_CLI_FEE_MULTIPLIER"
+DEFAULT_MULTIPLIER = 1.5
+
+MAX_ENTRIES = 256
+
+# what send_multi used to sign every transaction with
+FALLBACK_MAX_FEE = 8989832783197500
+
+
+def length_bucket(length: int) -> int:
+    """Smallest power of two >= length."""
+    return 1 << max(0, length - 1).bit_length()
+
+
+def fee_of(estimate: dict) -> int:
+    """Fee in wei of a feeder gateway estimate_fee response."""
+    fee = estimate.get("overall_fee", estimate.get("amount"))
+    return int(fee, 16) if isinstance(fee, str) else int(fee)
+
+
+class FeeOracle:
+    """Caches fee estimates, `latest_block(network)` is only used to key them."""
+
+    def __init__(self, latest_block, multiplier=None, fallback=FALLBACK_MAX_FEE):
+        if multiplier is None:
+            multiplier = float(os.environ.get(MULTIPLIER_ENV, DEFAULT_MULTIPLIER))
+        self.latest_block = latest_block
+        self.multiplier = multiplier
+        self.fallback = fallback
+        self.estimates = 0
+        self.reused = 0
+        self.fallbacks = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def key(self, network, calls, calldata_length, block) -> tuple:
+        """`calls` are (contract address, selector) pairs of one __execute__."""
+        targets = tuple(sorted({(int(to), int(selector)) for to, selector in calls}))
+        return (network, targets, length_bucket(calldata_length), block)
+
+    def max_fee(self, network, calls, calldata_length, estimate) -> int:
+        """max_fee for a transaction; `estimate()` returns its estimate_fee response."""
+        key = self.key(network, calls, calldata_length, self.latest_block(network))
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            self.reused += 1
+            fee, estimated_length = cached
+        else:
+            try:
+                fee = fee_of(estimate())
+            except Exception as exc:
+                self.fallbacks += 1
+                print(f"fee estimation failed, using max_fee {self.fallback}: {exc}")
+                return self.fallback
+            self.estimates += 1
+            estimated_length = max(1, calldata_length)
+            with self._lock:
+                if len(self._cache) >= MAX_ENTRIES:
+                    # estimates of older blocks are never looked up again
+                    self._cache = {k: v for k, v in self._cache.items() if k[3] == key[3]}
+                self._cache[key] = (fee, estimated_length)
+        scale = max(1.0, calldata_length / estimated_length)
+        return int(fee * scale * self.multiplier)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,312 @@
+"""In-process StarkNet gateway client.
+
+Replaces spawning a `nile`/`starknet` process per request with a single
+long-lived client that keeps its HTTP connections pooled.
+"""
+import base64
+import gzip
+import json
+import os
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nile.common import GATEWAYS
+
+from realms_cli.calldata import to_int
+
+FELT_PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
+
+# Same hosts the starknet CLI uses for STARKNET_NETWORK=alpha-*
+PUBLIC_GATEWAYS = {
+    "goerli": "https://alpha4.starknet.io",
+    "mainnet": "https://alpha-mainnet.starknet.io",
+}
+
+# Environment override, mostly useful to point the CLI at a stand-in gateway
+GATEWAY_URL_ENV = "REALMS_GATEWAY_URL"
+# served in-process by memory_network.MemoryGateway
+MEMORY_NETWORK = "memory"
+# Optional StarkNet JSON-RPC node (pathfinder, devnet...) used to batch reads
+RPC_URL_ENV = "REALMS_RPC_URL"
+
+POOL_SIZE = 32
+TIMEOUT = 60
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+# False until the environment was read, see get_cassette
+_cassette = False
+
+
+class GatewayError(Exception):
+    """Raised when the gateway answers with an error payload."""
+
+    def __init__(self, status, message):
+        super().__init__(f"gateway error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def felt_formatter(felt) -> str:
+    """Formats a felt the same way `starknet call` prints its results."""
+    val = int(felt, 16) if isinstance(felt, str) else int(felt)
+    shifted = (val + FELT_PRIME // 2) % FELT_PRIME - (FELT_PRIME // 2)
+    if abs(shifted) < 2 ** 40:
+        return str(shifted)
+    if abs(shifted) < 2 ** 100:
+        return hex(shifted)
+    return hex(val)
+
+
+def format_result(result) -> str:
+    """Joins a list of felts into the whitespace separated `nile call` output."""
+    return " ".join(felt_formatter(felt) for felt in result)
+
+
+def get_gateway_url(network: str) -> str:
+    """Resolves the base url of the node serving `network`."""
+    url = os.environ.get(GATEWAY_URL_ENV)
+    if url:
+        return url.rstrip("/")
+    if network in PUBLIC_GATEWAYS:
+        return PUBLIC_GATEWAYS[network]
+    # Config maps localhost to 127.0.0.1 for the deployment files
+    gateways = GATEWAYS or {}
+    url = gateways.get(network) or gateways.get("localhost")
+    if url is None:
+        raise ValueError(f"No gateway configured for network {network}")
+    return url.rstrip("/")
+
+
+class GatewayClient:
+    """Thin client for the StarkNet gateway and feeder gateway HTTP APIs."""
+
+    def __init__(self, base_url: str, pool_size: int = POOL_SIZE, timeout: int = TIMEOUT, cassette=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cassette = cassette
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, endpoint, params=None, payload=None):
+        cassette = self.cassette
+        if cassette is not None and cassette.replaying:
+            status, body = cassette.play(cassette.key(method, endpoint, params, payload))
+            if status != 200:
+                raise GatewayError(status, body)
+            return body
+        response = self.session.request(
+            method,
+            f"{self.base_url}/{endpoint}",
+            params=params,
+            data=None if payload is None else json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        if cassette is not None:
+            cassette.record(
+                cassette.key(method, endpoint, params, payload),
+                response.status_code,
+                response.json() if response.status_code == 200 else response.text,
+            )
+        if response.status_code != 200:
+            raise GatewayError(response.status_code, response.text)
+        return response.json()
+
+    @staticmethod
+    def invoke_payload(address, function, calldata, signature=None, max_fee=0) -> dict:
+        """Builds an INVOKE_FUNCTION transaction as the gateway expects it."""
+        # imported on first use, it loads most of cairo-lang
+        from starkware.starknet.public.abi import get_selector_from_name
+
+        return {
+            "type": "INVOKE_FUNCTION",
+            "contract_address": hex(to_int(address)),
+            "entry_point_selector": hex(get_selector_from_name(function)),
+            "calldata": [str(to_int(x) % FELT_PRIME) for x in calldata],
+            "signature": [str(to_int(x)) for x in signature or []],
+            "max_fee": hex(to_int(max_fee)),
+            "version": "0x0",
+        }
+
+    def call_contract(self, address, function, calldata, block_number="pending") -> list:
+        """Executes a view function and returns the raw result felts as ints."""
+        out = self._request(
+            "POST",
+            "feeder_gateway/call_contract",
+            params={"blockNumber": block_number},
+            payload=self.invoke_payload(address, function, calldata),
+        )
+        return [int(felt, 16) for felt in out["result"]]
+
+    def estimate_fee(self, address, function, calldata, signature=None, block_number="pending") -> dict:
+        """Returns the fee estimation dict of an invoke."""
+        return self._request(
+            "POST",
+            "feeder_gateway/estimate_fee",
+            params={"blockNumber": block_number},
+            payload=self.invoke_payload(address, function, calldata, signature),
+        )
+
+    def invoke(self, address, function, calldata, signature, max_fee) -> dict:
+        """Submits an invoke transaction, returns the gateway response."""
+        return self._request(
+            "POST",
+            "gateway/add_transaction",
+            payload=self.invoke_payload(address, function, calldata, signature, max_fee),
+        )
+
+    def deploy(self, contract_class: dict, constructor_calldata, salt=None) -> dict:
+        """Submits a deploy transaction for a compiled contract artifact."""
+        if salt is None:
+            salt = random.getrandbits(251)
+        definition = dict(contract_class)
+        program = json.dumps(definition["program"]).encode("ascii")
+        definition["program"] = base64.b64encode(gzip.compress(program)).decode("ascii")
+        return self._request(
+            "POST",
+            "gateway/add_transaction",
+            payload={
+                "type": "DEPLOY",
+                "contract_address_salt": hex(salt),
+                "contract_definition": definition,
+                "constructor_calldata": [str(to_int(x)) for x in constructor_calldata],
+                "version": "0x0",
+            },
+        )
+
+    def get_transaction_status(self, tx_hash) -> dict:
+        """Returns the status dict of a transaction."""
+        return self._request(
+            "GET",
+            "feeder_gateway/get_transaction_status",
+            params={"transactionHash": hex(to_int(tx_hash))},
+        )
+
+    def get_transaction_receipt(self, tx_hash) -> dict:
+        """Returns the receipt of a transaction."""
+        return self._request(
+            "GET",
+            "feeder_gateway/get_transaction_receipt",
+            params={"transactionHash": hex(to_int(tx_hash))},
+        )
+
+    def get_block(self, block_number="pending") -> dict:
+        """Returns a block, the pending one by default."""
+        return self._request(
+            "GET",
+            "feeder_gateway/get_block",
+            params={"blockNumber": block_number},
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class JsonRpcClient:
+    """Minimal StarkNet JSON-RPC client, only what batched reads need."""
+
+    def __init__(self, url: str, pool_size: int = POOL_SIZE, timeout: int = TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def call_request(request_id, address, function, calldata, block_id="pending") -> dict:
+        """Builds a `starknet_call` request object."""
+        from starkware.starknet.public.abi import get_selector_from_name
+
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "starknet_call",
+            "params": [
+                {
+                    "contract_address": hex(to_int(address)),
+                    "entry_point_selector": hex(get_selector_from_name(function)),
+                    "calldata": [hex(to_int(x) % FELT_PRIME) for x in calldata],
+                },
+                block_id,
+            ],
+        }
+
+    def batch(self, requests_: list) -> list:
+        """Posts a JSON-RPC batch and returns the responses ordered like the requests."""
+        response = self.session.post(
+            self.url,
+            data=json.dumps(requests_),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise GatewayError(response.status_code, response.text)
+        by_id = {item["id"]: item for item in response.json()}
+        return [by_id.get(request["id"]) for request in requests_]
+
+    def close(self):
+        self.session.close()
+
+
+def get_cassette():
+    """The process wide cassette, read from the environment on first use."""
+    global _cassette
+    with _clients_lock:
+        if _cassette is False:
+            from realms_cli.cassette import from_env
+
+            _cassette = from_env()
+    return _cassette
+
+
+def use_cassette(cassette):
+    """Records to / replays from `cassette` (None to go back to the network)."""
+    global _cassette
+    with _clients_lock:
+        _cassette = cassette
+        for client in _clients.values():
+            if isinstance(client, GatewayClient):
+                client.cassette = cassette
+
+
+def get_rpc_client(network: str):
+    """Returns the process wide JSON-RPC client, or None when no node is configured.
+
+    Always None with a cassette, its reads then go through the recorded gateway,
+    and on the memory network.
+    """
+    if get_cassette() is not None or network == MEMORY_NETWORK:
+        return None
+    url = os.environ.get(RPC_URL_ENV) or (GATEWAYS or {}).get(f"{network}_rpc")
+    if not url:
+        return None
+    with _clients_lock:
+        client = _clients.get(("rpc", url))
+        if client is None:
+            client = JsonRpcClient(url)
+            _clients[("rpc", url)] = client
+    return client
+
+
+def get_gateway(network: str) -> GatewayClient:
+    """Returns the process wide client of `network`, creating it on first use."""
+    if network == MEMORY_NETWORK:
+        from realms_cli.memory_network import get_memory_gateway
+
+        return get_memory_gateway()
+    url = get_gateway_url(network)
+    cassette = get_cassette()
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is None:
+            client = GatewayClient(url, cassette=cassette)
+            _clients[url] = client
+    return client
@@ -0,0 +1,257 @@
+"""Incremental regeneration of the packed realm and crypt metadata artifacts.
+
+stats = regenerate_crypts()    # data/crypts.json -> data/crypts_bit.bin
+stats = regenerate_realms()    # data/realms.json -> data/realms_bit.bin
+stats["packed"], stats["reused"]
+
+Source records are hashed from their json text as it is in the file, GROUP
+consecutive records at a time (so reformatting the whole file packs everything
+again), the lookup tables (resources, wonders, orders, crypt environments and
+affinities) as files. A manifest next to the artifact keeps those digests. A
+group whose text is unchanged is not even decoded and its records keep their
+packed value from the artifact; only the records of changed groups are packed
+again. A changed table, or an artifact that no longer matches its manifest,
+packs everything. An untouched source is noticed from its file digest alone.
+
+Artifacts are .bin packed stores or [{id: packed}] json lists, by extension.
+The artifact, then its manifest, is written to a temporary file in the same
+directory and moved into place with os.replace, so a reader sees either the
+old or the new file and an interrupted run leaves a stale manifest that
+forces a full pass next time.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from realms_cli.binary_converter import CryptPacker, RealmPacker
+from realms_cli.json_stream import WRITE_EVERY, write_json_list
+from realms_cli.packed_store import CRYPTS_STORE, REALMS_STORE, PackedStore, write_store
+
+VERSION = 1
+
+REALMS = "data/realms.json"
+CRYPTS = "data/crypts.json"
+REALM_TABLES = {
+    "resources": "data/resources.json",
+    "wonders": "data/wonders.json",
+    "orders": "data/orders.json",
+}
+CRYPT_TABLES = {
+    "environments": "data/crypts_environments.json",
+    "affinities": "data/crypts_affinities.json",
+}
+
+
+def manifest_path(dst) -> str:
+    return dst + ".manifest.json"
+
+
+def _file_digest(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _text_digest(text) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=10).hexdigest()
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == VERSION else None
+
+
+def _is_store(path) -> bool:
+    return path.endswith(".bin")
+
+
+def _read_artifact(path) -> dict:
+    """{id: packed} of an existing artifact."""
+    if _is_store(path):
+        with PackedStore(path) as store:
+            return {str(id): packed for id, packed in store.items()}
+    with open(path) as f:
+        return {id: packed for entry in json.load(f) for id, packed in entry.items()}
+
+
+def _write_artifact(path, packed, store):
+    items = sorted(packed.items(), key=lambda item: int(item[0]))
+    if store:
+        write_store(path, items)
+    else:
+        write_json_list(path, ({id: value} for id, value in items), WRITE_EVERY)
+
+
+def replace_atomically(dst, write):
+    """Calls write(path) on a temporary file next to `dst`, then moves it over `dst`."""
+    directory, name = os.path.split(os.path.abspath(dst))
+    fd, temporary = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        if os.path.exists(dst):
+            shutil.copymode(dst, temporary)
+        write(temporary)
+        os.replace(temporary, dst)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+GROUP = 64
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decode = json.JSONDecoder().raw_decode
+# the value of an item in a group whose text did not change, it is not decoded
+UNCHANGED = object()
+
+
+def scan_object(text, groups=()) -> tuple:
+    """Items of the top level json object in `text` and their groups.
+
+    Items are hashed GROUP at a time, a group is [keys, length, digest] of the
+    text from its first key to its last value. Where the text still holds one
+    of `groups`, its items are not decoded and their value is UNCHANGED.
+    Returns ([(key, value), ...], groups of `text`).
+    """
+    known = {group[0][0]: group for group in groups if group[0]}
+    skip = _WHITESPACE.match
+    items, scanned, pending = [], [], []
+    group_start = None
+
+    def close(end):
+        keys = [key for key, _ in pending]
+        scanned.append([keys, end - group_start, _text_digest(text[group_start:end])])
+        pending.clear()
+
+    position = skip(text).end()
+    if text[position:position + 1] != "{":
+        raise ValueError("expected a json object")
+    position = skip(text, position + 1).end()
+    end = None
+    while text[position:position + 1] != "}":
+        key, after_key = _decode(text, position)
+        group = known.get(key) if not pending else None
+        if group is not None:
+            keys, length, digest = group
+            end = position + length
+            following = skip(text, end).end()
+            if text[following:following + 1] in (",", "}") and _text_digest(text[position:end]) == digest:
+                items.extend((key, UNCHANGED) for key in keys)
+                scanned.append(group)
+                position = following
+                if text[position] == ",":
+                    position = skip(text, position + 1).end()
+                continue
+        colon = skip(text, after_key).end()
+        if text[colon:colon + 1] != ":":
+            raise ValueError(f"expected ':' after {key!r}")
+        if not pending:
+            group_start = position
+        value, end = _decode(text, skip(text, colon + 1).end())
+        items.append((key, value))
+        pending.append((key, value))
+        position = skip(text, end).end()
+        # a group ends after GROUP items, or where a known group may start
+        if len(pending) == GROUP or text[position:position + 1] == "}":
+            close(end)
+        elif text[position:position + 1] == ",":
+            position = skip(text, position + 1).end()
+            if text[position:position + 1] == '"' and _decode(text, position)[0] in known:
+                close(end)
+        else:
+            raise ValueError(f"expected ',' or '}}' after {key!r}")
+        if text[position:position + 1] == ",":
+            position = skip(text, position + 1).end()
+    return items, scanned
+
+
+def regenerate(src, dst, packer, tables) -> dict:
+    """Brings `dst` up to date with the records of `src`, packing only what changed.
+
+    `packer` packs one record, `tables` are the {name: path} lookup tables it was
+    built from. Returns counts of the records packed, reused from the previous
+    artifact and skipped for lack of metadata (null), and the time taken.
+    """
+    start = time.perf_counter()
+    with open(src, "rb") as f:
+        raw = f.read()
+    source = hashlib.sha1(raw).hexdigest()
+    tables_digest = hashlib.sha1(json.dumps(
+        [type(packer).__name__] + [[name, _file_digest(path)] for name, path in sorted(tables.items())]
+    ).encode()).hexdigest()
+
+    manifest = _read_manifest(manifest_path(dst))
+    current = (
+        manifest is not None
+        and manifest["tables"] == tables_digest
+        and os.path.exists(dst)
+        and manifest["artifact"] == _file_digest(dst)
+    )
+    if current and manifest["source"] == source:
+        records, skipped = manifest["records"], manifest["skipped"]
+        return {"records": records, "packed": 0, "reused": records - skipped, "skipped": skipped,
+                "seconds": time.perf_counter() - start}
+    items, groups = scan_object(raw.decode(), manifest["groups"] if current else ())
+    previous_packed = _read_artifact(dst) if current else {}
+
+    packed = {}
+    count = skipped = 0
+    for id, record in items:
+        if record is UNCHANGED:
+            if id in previous_packed:
+                packed[id] = previous_packed[id]
+            else:
+                skipped += 1
+        elif record is None:
+            skipped += 1
+        else:
+            packed[id] = packer.pack(record)
+            count += 1
+
+    replace_atomically(dst, lambda path: _write_artifact(path, packed, _is_store(dst)))
+    manifest = {"version": VERSION, "tables": tables_digest, "source": source, "artifact": _file_digest(dst),
+                "records": len(items), "skipped": skipped, "groups": groups}
+    text = json.dumps(manifest, separators=(",", ":"))
+
+    def write_manifest(path):
+        with open(path, "w") as f:
+            f.write(text)
+
+    replace_atomically(manifest_path(dst), write_manifest)
+    return {"records": len(items), "packed": count, "reused": len(packed) - count,
+            "skipped": skipped, "seconds": time.perf_counter() - start}
+
+
+def _load_tables(tables):
+    loaded = {}
+    for name, path in tables.items():
+        with open(path) as f:
+            loaded[name] = json.load(f)
+    return loaded
+
+
+def regenerate_realms(src=REALMS, dst=REALMS_STORE, tables=None) -> dict:
+    tables = tables or REALM_TABLES
+    return regenerate(src, dst, RealmPacker(**_load_tables(tables)), tables)
+
+
+def regenerate_crypts(src=CRYPTS, dst=CRYPTS_STORE, tables=None) -> dict:
+    tables = tables or CRYPT_TABLES
+    return regenerate(src, dst, CryptPacker(**_load_tables(tables)), tables)
+
+
+if __name__ == "__main__":
+    for name, function, src in [("realms", regenerate_realms, REALMS), ("crypts", regenerate_crypts, CRYPTS)]:
+        if not os.path.exists(src):
+            print(f"{src} not found, {name} skipped")
+            continue
+        stats = function()
+        print(f"{name}: {stats['packed']} packed, {stats['reused']} reused, "
+              f"{stats['skipped']} without metadata in {stats['seconds'] * 1000:.1f}ms")
@@ -0,0 +1,116 @@
+"""Incremental reading and chunked writing of big json files.
+
+for key, value in iter_object_items("data/crypts.json"):   # one item in memory at a time
+    ...
+
+write_json_list("data/crypts_bit.json", ({key: value} for ...))
+
+iter_object_items reads a top level json object in fixed size chunks and
+yields its items as they are parsed. write_json_list writes a list item by
+item, in the same bytes `json.dumps(items, indent=4)` produces.
+"""
+import json
+
+CHUNK_SIZE = 1 << 16
+WRITE_EVERY = 1000
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Reads one more chunk, drops what was consumed. False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return not self.eof
+
+    def skip(self):
+        """Moves past whitespace, returns the next character or "" at end of file."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ""
+
+    def expect(self, characters):
+        character = self.skip()
+        if character == "" or character not in characters:
+            raise ValueError(f"expected one of {characters!r}, got {character or 'end of file'!r}")
+        self.position += 1
+        return character
+
+    def value(self):
+        self.skip()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # a number or literal ending at the buffer end may go on in the next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_object_items(path_or_file, chunk_size=CHUNK_SIZE):
+    """(key, value) items of the top level json object, parsed incrementally."""
+    if isinstance(path_or_file, str):
+        with open(path_or_file) as fp:
+            yield from iter_object_items(fp, chunk_size)
+        return
+    reader = _Reader(path_or_file, chunk_size)
+    reader.expect("{")
+    if reader.skip() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        yield key, reader.value()
+        if reader.expect(",}") == "}":
+            return
+
+
+def _dumps_item(item) -> str:
+    """json.dumps(item, indent=4), directly for the flat {key: int} items packers write."""
+    if isinstance(item, dict) and item and all(
+        type(k) is str and type(v) is int for k, v in item.items()
+    ):
+        return "{\n" + ",\n".join(
+            f"    {json.dumps(k)}: {v}" for k, v in item.items()
+        ) + "\n}"
+    return json.dumps(item, indent=4)
+
+
+def write_json_list(path, items, write_every=WRITE_EVERY) -> int:
+    """Writes `items` as a json list, `write_every` items at a time; returns how many."""
+    count = 0
+    pending = []
+    with open(path, "w") as f:
+        f.write("[")
+        for item in items:
+            text = _dumps_item(item).replace("\n", "\n    ")
+            pending.append(("\n    " if count == 0 else ",\n    ") + text)
+            count += 1
+            if len(pending) >= write_every:
+                f.write("".join(pending))
+                pending = []
+        f.write("".join(pending))
+        f.write("\n]" if count else "]")
+    return count
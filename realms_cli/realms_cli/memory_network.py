@@ -0,0 +1,366 @@
+"""In-process StarkNet backend of `--network memory`.
+
+nile create_memory_network                          # chain with the signer accounts
+nile run realms_cli/deploy/token_contracts.py --network memory
+nile check_realms --network memory                  # milliseconds, no devnet
+
+get_gateway("memory") returns a MemoryGateway: the same methods as the HTTP
+GatewayClient, answered by a `StarknetState` like the ones the pytest fixtures
+build, so every wrapped_call / wrapped_send (signing, nonces, fee estimates,
+tracking) runs unchanged. Every transaction is a block of its own, fees are 0.
+
+The chain lives in a snapshot file (REALMS_CLI_MEMORY_SNAPSHOT, memory.snapshot
+by default) together with the memory.* deployments, declarations and accounts
+files nile resolves aliases with. It is loaded on first use and saved when the
+process exits, if anything was written. `save_snapshot` turns a pytest
+deployment state into one.
+"""
+import asyncio
+import atexit
+import copy
+import dataclasses
+import json
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cachetools
+from nile.common import ACCOUNTS_FILENAME, DECLARATIONS_FILENAME, DEPLOYMENTS_FILENAME
+from starkware.starknet.business_logic.state.state import ContractCarriedState
+from starkware.starknet.core.os.class_hash import class_hash_cache_ctx_var
+from starkware.starknet.definitions import constants
+from starkware.starknet.services.api.contract_class import ContractClass, EntryPointType
+from starkware.starknet.testing.state import StarknetState, create_invoke_function
+from starkware.starkware_utils.error_handling import StarkException
+
+from realms_cli.calldata import to_int
+from realms_cli.gateway import FELT_PRIME, MEMORY_NETWORK, GatewayError
+
+SNAPSHOT_ENV = "REALMS_CLI_MEMORY_SNAPSHOT"
+DEFAULT_SNAPSHOT = "memory.snapshot"
+SNAPSHOT_VERSION = 1
+
+# nile bookkeeping of the memory network, stored in the snapshot
+FILES = [
+    f"{MEMORY_NETWORK}.{DEPLOYMENTS_FILENAME}",
+    f"{MEMORY_NETWORK}.{DECLARATIONS_FILENAME}",
+    f"{MEMORY_NETWORK}.{ACCOUNTS_FILENAME}",
+]
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+class _EmptyContract:
+    """Picklable stand-in of the lambda `StarknetState.empty` creates contract states with."""
+
+    def __init__(self, state):
+        self.state = state
+
+    def __call__(self):
+        return ContractCarriedState.from_state(state=copy.deepcopy(self.state))
+
+
+def _picklable(state: StarknetState) -> StarknetState:
+    for contracts in state.state.contract_states.maps:
+        factory = getattr(contracts, "default_factory", None)
+        if factory is not None and not isinstance(factory, _EmptyContract):
+            contracts.default_factory = _EmptyContract(factory().state)
+    return state
+
+
+def _error(exc: StarkException) -> GatewayError:
+    # the body the gateway answers failed calls with
+    return GatewayError(500, {"code": str(exc.code), "message": exc.message})
+
+
+def _event(event) -> dict:
+    return {
+        "from_address": hex(event.from_address),
+        "keys": [hex(key) for key in event.keys],
+        "data": [hex(felt) for felt in event.data],
+    }
+
+
+class MemoryGateway:
+    """GatewayClient lookalike over a StarknetState."""
+
+    def __init__(self, state, path=None, blocks=None, transactions=None, class_hashes=None, clock_offset=0):
+        self.state = state
+        self.path = path
+        # one block per transaction, a block is its receipts like the feeder gateway's
+        self.blocks = blocks if blocks is not None else []
+        self.transactions = transactions if transactions is not None else {}
+        self.class_hashes = class_hashes if class_hashes is not None else cachetools.LRUCache(maxsize=256)
+        self.clock_offset = clock_offset
+        self.dirty = False
+        # transactions open a block, execute and record their receipt as one step
+        self._lock = threading.RLock()
+        self._loop = asyncio.new_event_loop()
+        # the state is not thread safe, every request runs on this one thread
+        self._worker = ThreadPoolExecutor(max_workers=1)
+
+    @classmethod
+    def empty(cls, path=None) -> "MemoryGateway":
+        loop = asyncio.new_event_loop()
+        try:
+            state = loop.run_until_complete(StarknetState.empty())
+        finally:
+            loop.close()
+        gateway = cls(state, path)
+        gateway._add_block([])
+        return gateway
+
+    @classmethod
+    def load(cls, path, restore_files=True) -> "MemoryGateway":
+        """Loads a snapshot and, with `restore_files`, writes its memory.* files to the cwd."""
+        with open(path, "rb") as fp:
+            snapshot = pickle.load(fp)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} memory snapshot")
+        if restore_files:
+            for name, text in snapshot["files"].items():
+                with open(name, "w") as fp:
+                    fp.write(text)
+        return cls(
+            snapshot["state"],
+            path,
+            snapshot["blocks"],
+            snapshot["transactions"],
+            snapshot["class_hashes"],
+            snapshot["clock_offset"],
+        )
+
+    def save(self, path=None, files=None):
+        """Writes the chain and the memory.* files (of the cwd by default) to the snapshot, atomically."""
+        path = path or self.path
+        if files is None:
+            files = {}
+            for name in FILES:
+                if os.path.exists(name):
+                    with open(name) as fp:
+                        files[name] = fp.read()
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "state": _picklable(self.state),
+            "blocks": self.blocks,
+            "transactions": self.transactions,
+            "class_hashes": self.class_hashes,
+            "clock_offset": self.clock_offset,
+            "files": files,
+        }
+        with open(f"{path}.tmp", "wb") as fp:
+            pickle.dump(snapshot, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{path}.tmp", path)
+        self.dirty = False
+
+    def _execute(self, coro):
+        token = class_hash_cache_ctx_var.set(self.class_hashes)
+        try:
+            return self._loop.run_until_complete(coro)
+        finally:
+            class_hash_cache_ctx_var.reset(token)
+
+    def _run(self, coro):
+        return self._worker.submit(self._execute, coro).result()
+
+    def advance_clock(self, seconds):
+        """Moves the timestamps of the next blocks `seconds` into the future."""
+        self.clock_offset += seconds
+
+    def _add_block(self, receipts) -> dict:
+        number = len(self.blocks)
+        info = self.state.state.block_info
+        timestamp = max(info.block_timestamp, int(time.time()) + self.clock_offset)
+        self.state.state.block_info = dataclasses.replace(
+            info, block_number=number, block_timestamp=timestamp)
+        block = {
+            "block_number": number,
+            "block_hash": hex(number),
+            "timestamp": timestamp,
+            "status": "ACCEPTED_ON_L2",
+            "transaction_receipts": receipts,
+        }
+        self.blocks.append(block)
+        return block
+
+    def _record(self, tx_hash, status, events=(), failure=None):
+        # the block is opened before executing so the transaction sees its number and time
+        block = self.blocks[-1]
+        receipt = {
+            "status": status,
+            "block_number": block["block_number"],
+            "block_hash": block["block_hash"],
+            "transaction_hash": hex(tx_hash),
+            "transaction_index": len(block["transaction_receipts"]),
+            "events": [_event(event) for event in events],
+            "actual_fee": "0x0",
+        }
+        if failure is not None:
+            receipt["transaction_failure_reason"] = failure
+        block["transaction_receipts"].append(receipt)
+        self.transactions[hex(tx_hash)] = receipt
+        self.dirty = True
+        return hex(tx_hash)
+
+    def call_contract(self, address, function, calldata, block_number="pending") -> list:
+        """Executes a view function on the current state, returns the result felts."""
+        try:
+            call_info = self._run(self.state.call_raw(
+                contract_address=to_int(address),
+                selector=function,
+                calldata=[to_int(x) % FELT_PRIME for x in calldata],
+                caller_address=0,
+                max_fee=0,
+            ))
+        except StarkException as exc:
+            raise _error(exc)
+        return list(call_info.retdata)
+
+    def estimate_fee(self, address, function, calldata, signature=None, block_number="pending") -> dict:
+        """The memory network charges no fees."""
+        return {"overall_fee": 0, "unit": "wei", "gas_price": 0, "gas_usage": 0}
+
+    def invoke(self, address, function, calldata, signature, max_fee) -> dict:
+        """Executes a transaction in a new block; rejected ones get a REJECTED receipt."""
+        tx = create_invoke_function(
+            contract_address=to_int(address),
+            selector=function,
+            calldata=[to_int(x) % FELT_PRIME for x in calldata],
+            caller_address=0,
+            max_fee=to_int(max_fee),
+            version=constants.TRANSACTION_VERSION,
+            signature=[to_int(x) for x in signature or []],
+            entry_point_type=EntryPointType.EXTERNAL,
+            nonce=None,
+            chain_id=self.state.general_config.chain_id.value,
+        )
+
+        async def apply():
+            with self.state.state.copy_and_apply() as state_copy:
+                return await tx.apply_state_updates(
+                    state=state_copy, general_config=self.state.general_config)
+
+        with self._lock:
+            self._add_block([])
+            try:
+                info = self._run(apply())
+            except StarkException as exc:
+                failure = {"code": str(exc.code), "error_message": exc.message}
+                tx_hash = self._record(tx.hash_value, "REJECTED", failure=failure)
+            else:
+                events = info.get_sorted_events()
+                self.state.events += events
+                tx_hash = self._record(tx.hash_value, "ACCEPTED_ON_L2", events)
+        return {"code": "TRANSACTION_RECEIVED", "transaction_hash": tx_hash}
+
+    def deploy(self, contract_class: dict, constructor_calldata, salt=None) -> dict:
+        """Deploys a compiled artifact in a new block."""
+        with self._lock:
+            self._add_block([])
+            try:
+                address, info = self._run(self.state.deploy(
+                    contract_class=ContractClass.load(contract_class),
+                    constructor_calldata=[to_int(x) for x in constructor_calldata],
+                    contract_address_salt=salt,
+                ))
+            except StarkException as exc:
+                raise _error(exc)
+            # the testing state does not hash deploys, the address identifies this one
+            tx_hash = self._record(address, "ACCEPTED_ON_L2", info.get_sorted_events())
+        return {"code": "TRANSACTION_RECEIVED", "transaction_hash": tx_hash, "address": hex(address)}
+
+    def declare(self, contract_class: dict) -> dict:
+        """Declares a compiled artifact, returns its class hash like the gateway."""
+        with self._lock:
+            try:
+                info = self._run(self.state.declare(ContractClass.load(contract_class)))
+            except StarkException as exc:
+                raise _error(exc)
+            self.dirty = True
+        # the testing state keeps class hashes as 32 bytes
+        class_hash = int.from_bytes(info.call_info.class_hash, "big")
+        return {"code": "TRANSACTION_RECEIVED", "class_hash": hex(class_hash)}
+
+    def get_transaction_status(self, tx_hash) -> dict:
+        receipt = self.transactions.get(hex(to_int(tx_hash)))
+        if receipt is None:
+            return {"tx_status": "NOT_RECEIVED"}
+        status = {"tx_status": receipt["status"], "block_hash": receipt["block_hash"]}
+        if "transaction_failure_reason" in receipt:
+            status["tx_failure_reason"] = receipt["transaction_failure_reason"]
+        return status
+
+    def get_transaction_receipt(self, tx_hash) -> dict:
+        return self.transactions.get(hex(to_int(tx_hash)), {"status": "NOT_RECEIVED"})
+
+    def get_block(self, block_number="pending") -> dict:
+        if block_number in ("latest", "pending"):
+            return self.blocks[-1]
+        number = int(block_number)
+        if not 0 <= number < len(self.blocks):
+            raise GatewayError(500, {"code": "StarknetErrorCode.BLOCK_NOT_FOUND"})
+        return self.blocks[number]
+
+    def close(self):
+        if self.dirty and self.path is not None:
+            self.save()
+
+
+def get_memory_gateway() -> MemoryGateway:
+    """The process wide memory chain, loaded from its snapshot on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            path = os.environ.get(SNAPSHOT_ENV, DEFAULT_SNAPSHOT)
+            if os.path.exists(path):
+                _gateway = MemoryGateway.load(path)
+            else:
+                _gateway = MemoryGateway.empty(path)
+            atexit.register(_gateway.close)
+    return _gateway
+
+
+def create(path, signer_aliases) -> MemoryGateway:
+    """New chain with an account (nile's Account contract) per signer alias set in the env.
+
+    Replaces the memory.* files of the cwd.
+    """
+    from nile import accounts, deployments
+    from nile.signer import Signer
+
+    for name in FILES:
+        with open(name, "w") as fp:
+            fp.write("{}" if name.endswith(".json") else "")
+    gateway = MemoryGateway.empty(path)
+    artifacts = os.path.join(os.path.dirname(accounts.__file__), "artifacts")
+    with open(os.path.join(artifacts, "Account.json")) as fp:
+        account_class = json.load(fp)
+    for index, alias in enumerate(a for a in signer_aliases if os.environ.get(a)):
+        signer = Signer(int(os.environ[alias]))
+        address = gateway.deploy(account_class, [signer.public_key], salt=index)["address"]
+        address = f"0x{int(address, 16):064x}"
+        accounts.register(str(signer.public_key), address, index, MEMORY_NETWORK)
+        deployments.register(address, os.path.join(artifacts, "abis", "Account.json"), MEMORY_NETWORK, f"account-{index}")
+        print(f"{alias}: account-{index} at {address}")
+    gateway.save()
+    return gateway
+
+
+def save_snapshot(path, state: StarknetState, deployments=None, accounts=None):
+    """Snapshot of a pytest deployment.
+
+    `deployments` are (address, abi path, alias) and `accounts` public key ->
+    address, they become the memory.* files when the snapshot is loaded.
+    """
+    gateway = MemoryGateway(state.copy(), path)
+    gateway._add_block([])
+    lines = [f"{hex(to_int(address))}:{abi}:{alias}\n" for address, abi, alias in deployments or []]
+    known = {
+        str(public_key): {"address": hex(to_int(address)), "index": index}
+        for index, (public_key, address) in enumerate((accounts or {}).items())
+    }
+    gateway.save(files={FILES[0]: "".join(lines), FILES[2]: json.dumps(known)})
+    return gateway
@@ -0,0 +1,186 @@
+"""Aggregates many independent view calls into few round-trips.
+
+With a JSON-RPC node configured (see gateway.RPC_URL_ENV) calls are packed into
+`starknet_call` batches of `batch_size`, chunks that the node rejects as too
+large are split in half and resent. Without one, batches go to the `aggregate`
+view of contracts/utils/multicall.cairo when the network has it deployed as
+`multicall`, one feeder gateway call each. A reverted call reverts its whole
+batch, which is then split in half until the call is found. Otherwise calls
+fall back to the bounded scheduler against the feeder gateway, one by one.
+"""
+import threading
+from collections import namedtuple
+
+from realms_cli import registry
+from realms_cli.caller_invoker import DEFAULT_SCHEDULER, resolve_address
+from realms_cli.decoder import get_decoder
+from realms_cli.gateway import GatewayError, get_gateway, get_rpc_client
+from realms_cli.scheduler import CallError, MultiCallError, is_retryable
+
+DEFAULT_BATCH_SIZE = 200
+
+# deployment alias of contracts/utils/multicall.cairo
+AGGREGATOR_ALIAS = "multicall"
+
+# statuses nodes and proxies use for oversized bodies/batches
+TOO_LARGE_STATUSES = (413, 414, 431)
+
+ViewCall = namedtuple("ViewCall", "address function calldata")
+
+
+class Multicall:
+    """Collects view calls and executes them with as few requests as possible.
+
+    mc = Multicall(network)
+    for i in range(n):
+        mc.add("proxy_realms", "tokenOfOwnerByIndex", [owner, i, 0])
+    results = mc.execute()   # one list of felts per call, in order
+    """
+
+    def __init__(self, network, batch_size=DEFAULT_BATCH_SIZE, scheduler=None):
+        self.network = network
+        self.batch_size = batch_size
+        self.scheduler = scheduler or DEFAULT_SCHEDULER
+        self.calls = []
+        self.aliases = []
+        self.round_trips = 0
+        self._addresses = {}
+        # chunks run on the scheduler's threads
+        self._lock = threading.Lock()
+
+    def add(self, contract_alias, function, calldata) -> int:
+        """Queues a call and returns its index in the results."""
+        address = self._addresses.get(contract_alias)
+        if address is None:
+            address = resolve_address(contract_alias, self.network)
+            self._addresses[contract_alias] = address
+        self.calls.append(ViewCall(address, function, list(calldata)))
+        self.aliases.append(contract_alias)
+        return len(self.calls) - 1
+
+    def execute(self, return_exceptions=False, typed=False) -> list:
+        """Runs every queued call, returns their results in insertion order.
+
+        Results are lists of felts, or with `typed` outputs decoded with the
+        contract ABI (see decoder.py).
+        """
+        calls, self.calls = self.calls, []
+        aliases, self.aliases = self.aliases, []
+        rpc = get_rpc_client(self.network)
+        aggregator = None if rpc is not None else self._aggregator()
+        if rpc is not None:
+            results = self._execute_chunks(calls, lambda chunk: self._execute_chunk(rpc, calls, chunk))
+        elif aggregator is not None:
+            gateway = get_gateway(self.network)
+            results = self._execute_chunks(
+                calls, lambda chunk: self._aggregate_chunk(gateway, aggregator, calls, chunk))
+        else:
+            results = self._execute_gateway(calls)
+
+        errors = [r for r in results if isinstance(r, CallError)]
+        if errors and not return_exceptions:
+            raise MultiCallError(errors, results)
+        if typed:
+            results = [
+                result if isinstance(result, CallError)
+                else get_decoder(alias, self.network, call.function).decode(call.function, result)
+                for alias, call, result in zip(aliases, calls, results)
+            ]
+        return results
+
+    def _aggregator(self):
+        """Address of the network's multicall contract, None if it has none."""
+        deployment = registry.deployment(AGGREGATOR_ALIAS, self.network)
+        return None if deployment is None else deployment[0]
+
+    def _count_round_trips(self, count):
+        with self._lock:
+            self.round_trips += count
+
+    def _execute_chunks(self, calls, execute_chunk):
+        """Runs `execute_chunk` over batches of call indices, returns one result per call."""
+        chunks = [
+            list(range(start, min(start + self.batch_size, len(calls))))
+            for start in range(0, len(calls), self.batch_size)
+        ]
+        per_chunk = self.scheduler.run(execute_chunk, chunks, return_exceptions=True)
+        results = []
+        for chunk, chunk_results in zip(chunks, per_chunk):
+            if isinstance(chunk_results, CallError):
+                results.extend(
+                    CallError(i, calls[i], chunk_results.cause, chunk_results.attempts)
+                    for i in chunk)
+            else:
+                results.extend(chunk_results)
+        return results
+
+    def _execute_gateway(self, calls):
+        gateway = get_gateway(self.network)
+        self._count_round_trips(len(calls))
+        return self.scheduler.run(
+            lambda call: gateway.call_contract(*call), calls, return_exceptions=True)
+
+    def _aggregate_chunk(self, gateway, aggregator, calls, chunk):
+        from starkware.starknet.public.abi import get_selector_from_name
+
+        packed = []
+        for i in chunk:
+            call = calls[i]
+            packed += [call.address, get_selector_from_name(call.function), len(call.calldata)]
+            packed += call.calldata
+        try:
+            self._count_round_trips(1)
+            out = gateway.call_contract(aggregator, "aggregate", [len(packed)] + packed)
+        except GatewayError as exc:
+            if is_retryable(exc) or (len(chunk) == 1 and exc.status in TOO_LARGE_STATUSES):
+                raise
+            if len(chunk) == 1:
+                # the call itself reverted
+                return [CallError(chunk[0], calls[chunk[0]], exc, 1)]
+            half = len(chunk) // 2
+            return (
+                self._aggregate_chunk(gateway, aggregator, calls, chunk[:half])
+                + self._aggregate_chunk(gateway, aggregator, calls, chunk[half:])
+            )
+
+        # out is [result_len, *(size, *felts)] with one entry per call
+        results, position = [], 1
+        for _ in chunk:
+            size = out[position]
+            results.append(out[position + 1:position + 1 + size])
+            position += 1 + size
+        return results
+
+    def _execute_chunk(self, rpc, calls, chunk):
+        requests_ = [
+            rpc.call_request(i, calls[i].address, calls[i].function, calls[i].calldata)
+            for i in chunk
+        ]
+        try:
+            self._count_round_trips(1)
+            responses = rpc.batch(requests_)
+        except GatewayError as exc:
+            if exc.status not in TOO_LARGE_STATUSES or len(chunk) == 1:
+                raise
+            half = len(chunk) // 2
+            return (
+                self._execute_chunk(rpc, calls, chunk[:half])
+                + self._execute_chunk(rpc, calls, chunk[half:])
+            )
+
+        results = []
+        for i, response in zip(chunk, responses):
+            if response is None or "error" in response:
+                cause = response["error"] if response else "missing response"
+                results.append(CallError(i, calls[i], cause, 1))
+            else:
+                results.append([int(felt, 16) for felt in response["result"]])
+        return results
+
+
+def multicall(network, calls, batch_size=DEFAULT_BATCH_SIZE, return_exceptions=False) -> list:
+    """Executes (contract_alias, function, calldata) tuples through a Multicall."""
+    aggregator = Multicall(network, batch_size=batch_size)
+    for contract_alias, function, calldata in calls:
+        aggregator.add(contract_alias, function, calldata)
+    return aggregator.execute(return_exceptions=return_exceptions)
@@ -0,0 +1,126 @@
+"""Local nonce bookkeeping for account contracts.
+
+Nonces are reserved locally so several `__execute__` transactions of one account
+can be signed and submitted back-to-back, instead of reading `get_nonce` from the
+chain before every send.
+"""
+import threading
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+# tx hash -> (manager, nonce) of submissions whose outcome is still unknown
+_submitted = {}
+
+# how accounts word a nonce mismatch ("Account: nonce is invalid" for OpenZeppelin's)
+INVALID_NONCE_MESSAGES = ("nonce is invalid", "invalid nonce")
+
+
+class NonceManager:
+    """Hands out consecutive nonces of one account on one network.
+
+    The chain nonce (read on the pending block) is only fetched on first use and
+    whenever local state can no longer be trusted: after a rejection, after a
+    failed submission that leaves a gap, or when `sync` notices drift.
+    """
+
+    def __init__(self, address, network, fetch):
+        self.address = address
+        self.network = network
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._next = None
+        self._in_flight = set()
+
+    def _sync(self):
+        chain_nonce = self._fetch()
+        if self._next is None or not self._in_flight:
+            self._next = chain_nonce
+        elif chain_nonce > self._next:
+            # the account was used from somewhere else
+            print(f"nonce drift on {self.address}: local {self._next}, chain {chain_nonce}")
+            self._next = chain_nonce
+            self._in_flight = {n for n in self._in_flight if n >= chain_nonce}
+
+    def sync(self) -> int:
+        """Reconciles with the chain nonce, returns the next nonce to be reserved."""
+        with self._lock:
+            self._sync()
+            return self._next
+
+    def reserve(self) -> int:
+        """Returns the next free nonce and marks it as in flight."""
+        with self._lock:
+            if self._next is None:
+                self._sync()
+            nonce = self._next
+            self._next += 1
+            self._in_flight.add(nonce)
+            return nonce
+
+    def confirm(self, nonce: int):
+        """The transaction using `nonce` was accepted."""
+        with self._lock:
+            self._in_flight.discard(nonce)
+
+    def release(self, nonce: int):
+        """The transaction using `nonce` never reached the gateway."""
+        with self._lock:
+            self._in_flight.discard(nonce)
+            if self._next is not None and nonce == self._next - 1:
+                self._next = nonce
+            else:
+                # later nonces are already out, this one is now a gap
+                self._next = None
+
+    def reject(self, nonce: int):
+        """The transaction using `nonce` was rejected, so it did not consume it."""
+        with self._lock:
+            self._in_flight.discard(nonce)
+            # every nonce reserved after it is now ahead of the chain
+            self._in_flight = {n for n in self._in_flight if n < nonce}
+            self._next = None
+
+
+def is_invalid_nonce(exc) -> bool:
+    """Whether a failed submission was refused because of its nonce."""
+    message = str(getattr(exc, "message", exc)).lower()
+    return any(text in message for text in INVALID_NONCE_MESSAGES)
+
+
+def get_nonce_manager(address, network, fetch) -> NonceManager:
+    """Returns the process wide manager of (address, network).
+
+    `fetch` reads the current nonce from the chain, it is only used when the
+    manager is created.
+    """
+    key = (network, int(address, 16) if isinstance(address, str) else address)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = NonceManager(address, network, fetch)
+            _managers[key] = manager
+    return manager
+
+
+def track(tx_hash, manager: NonceManager, nonce: int):
+    """Remembers which reserved nonce a submitted transaction used."""
+    _submitted[int(tx_hash, 16)] = (manager, nonce)
+
+
+def settle(tx_hash, tx_status: str):
+    """Reports the final status of a tracked transaction to its nonce manager."""
+    manager, nonce = _submitted.pop(int(tx_hash, 16), (None, None))
+    if manager is None:
+        return
+    if tx_status == "REJECTED":
+        manager.reject(nonce)
+    else:
+        manager.confirm(nonce)
+
+
+def sync_submitted():
+    """Syncs every manager that has tracked transactions, to catch drift while they are pending."""
+    managers = {id(manager): manager for manager, _ in list(_submitted.values())}
+    for manager in managers.values():
+        manager.sync()
@@ -0,0 +1,141 @@
+"""Fixed-width binary store of packed metadata, one slot per token id.
+
+convert_json("data/realms_bit.json", "data/realms_bit.bin")
+store = PackedStore("data/realms_bit.bin")
+store[5042]                    # packed realm data, O(1) from the memory map
+store.values(1, 100)           # ids 1..100 as ints
+store.view(1, 8000)            # zero-copy memoryview of the raw slots
+
+Layout: a 32 byte header (magic, slot size, first id, count) then `count`
+little endian slots of `slot_size` bytes (a felt by default) for ids
+first_id, first_id + 1, ... A zero slot is an id without metadata.
+"""
+import json
+import mmap
+import os
+import struct
+
+MAGIC = b"RSTORE1\n"
+HEADER = struct.Struct("<8sHQQ")
+HEADER_SIZE = 32
+FELT_BYTES = 32
+
+REALMS_STORE = "data/realms_bit.bin"
+CRYPTS_STORE = "data/crypts_bit.bin"
+
+
+def write_store(path, items, slot_size=FELT_BYTES) -> int:
+    """Writes (token_id, packed) items in increasing id order, returns the number of slots.
+
+    Ids missing between two items get zero slots.
+    """
+    count = 0
+    first_id = None
+    slots = bytearray()
+    for token_id, packed in items:
+        token_id = int(token_id)
+        if first_id is None:
+            first_id = token_id
+        position = token_id - first_id
+        if position < count:
+            raise ValueError(f"token id {token_id} is out of order")
+        if position > count:
+            slots += bytes(slot_size * (position - count))
+        try:
+            slots += int(packed).to_bytes(slot_size, "little")
+        except OverflowError:
+            raise ValueError(f"token {token_id} does not fit {slot_size} bytes: {packed}") from None
+        count = position + 1
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, slot_size, first_id or 0, count).ljust(HEADER_SIZE, b"\0"))
+        f.write(slots)
+    return count
+
+
+def convert_json(json_path, store_path, slot_size=FELT_BYTES) -> int:
+    """Store of a [{token_id: packed}, ...] json list like data/realms_bit.json."""
+    with open(json_path) as f:
+        entries = json.load(f)
+    items = sorted(((int(id), packed) for entry in entries for id, packed in entry.items()))
+    return write_store(store_path, items, slot_size)
+
+
+class PackedStore:
+    """Read-only memory-mapped view of a store file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a packed store")
+            _, self.slot_size, self.first_id, self.count = HEADER.unpack_from(header)
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE + self.count * self.slot_size:
+                raise ValueError(f"{path} is truncated")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self.last_id = self.first_id + self.count - 1
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, token_id):
+        return self.first_id <= token_id <= self.last_id and self[token_id] != 0
+
+    def _offset(self, token_id):
+        position = int(token_id) - self.first_id
+        if not 0 <= position < self.count:
+            raise KeyError(f"token {token_id} is not in {self.path}")
+        return HEADER_SIZE + position * self.slot_size
+
+    def __getitem__(self, token_id) -> int:
+        offset = self._offset(token_id)
+        return int.from_bytes(self._map[offset:offset + self.slot_size], "little")
+
+    def get(self, token_id, default=None):
+        try:
+            value = self[token_id]
+        except KeyError:
+            return default
+        return value if value else default
+
+    def view(self, first_id=None, last_id=None) -> memoryview:
+        """Raw slots of ids first_id..last_id (inclusive), without copying."""
+        first_id = self.first_id if first_id is None else first_id
+        last_id = self.last_id if last_id is None else last_id
+        start = self._offset(first_id)
+        end = self._offset(last_id) + self.slot_size
+        return memoryview(self._map)[start:end]
+
+    def values(self, first_id=None, last_id=None) -> list:
+        """Packed values of ids first_id..last_id (inclusive)."""
+        view = self.view(first_id, last_id)
+        size = self.slot_size
+        return [int.from_bytes(view[i:i + size], "little") for i in range(0, len(view), size)]
+
+    def items(self):
+        """(token_id, packed) of every id with metadata."""
+        for i, value in enumerate(self.values()):
+            if value:
+                yield self.first_id + i, value
+
+    def slots(self, first_id=None, last_id=None):
+        """NumPy (n, slot_size) uint8 array over the mapped slots, without copying."""
+        import numpy as np
+
+        view = self.view(first_id, last_id)
+        return np.frombuffer(view, dtype=np.uint8).reshape(-1, self.slot_size)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    print(f"{convert_json('data/realms_bit.json', REALMS_STORE)} realm slots written to {REALMS_STORE}")
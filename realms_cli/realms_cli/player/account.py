@@ -1,8 +1,6 @@
 # First, import click dependency
 import click
 
-from ecdsa import SigningKey, SECP128r1
-
 from realms_cli.caller_invoker import wrapped_send
 from realms_cli.config import Config
 from realms_cli.utils import parse_multi_input
@@ -12,6 +10,8 @@ def create_pk():
     """
     Create private key
     """
+    from ecdsa import SigningKey, SECP128r1
+
     sk = SigningKey.generate(curve=SECP128r1)
     sk_string = sk.to_string()
     sk_hex = sk_string.hex()
@@ -1,14 +1,9 @@
 # First, import click dependency
-import json
 import click
 
-from nile.core.account import Account
-from ecdsa import SigningKey, SECP256k1
-
 from realms_cli.caller_invoker import wrapped_call, wrapped_send
 from realms_cli.config import Config
 from realms_cli.utils import print_over_colums
-from realms_cli.binary_converter import map_realm
 from realms_cli.shared import uint
 
 
@@ -54,12 +49,12 @@ def buildings(realm_token_id, network):
             realm_token_id,                 # uint 1
             0
         ],
+        typed=True,
     )
-    out = out.split(" ")
     pretty_out = []
-    for i, building in enumerate(config.BUILDINGS):
+    for building in config.BUILDINGS:
         pretty_out.append(
-            f"{building} : {int(out[i])}")
+            f"{building} : {getattr(out.realm_buildings, building)}")
     print("+------------------ BUILDINGS ON REALM ID: " +
           realm_token_id + " ---------------------+")
     print_over_colums(pretty_out)
@@ -82,12 +77,12 @@ def buildings_integrity(realm_token_id, network):
             realm_token_id,                 # uint 1
             0
         ],
+        typed=True,
     )
-    out = out.split(" ")
     pretty_out = []
-    for i, building in enumerate(config.BUILDINGS):
+    for building in config.BUILDINGS:
         pretty_out.append(
-            f"{building} : {int(out[i])}")
+            f"{building} : {getattr(out.realm_buildings, building)}")
     print("+------------------ BUILDINGS INTEGRETIY ON REALM ID: " +
           realm_token_id + " ---------------------+")
     print_over_colums(pretty_out)
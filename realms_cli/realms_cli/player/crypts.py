@@ -4,16 +4,11 @@
 # MIT License
 
 # First, import click dependency
-import json
 import click
 
-from nile.core.account import Account
-from ecdsa import SigningKey, SECP256k1
-
-from realms_cli.caller_invoker import wrapped_call, wrapped_send
+from realms_cli.caller_invoker import load_account, wrapped_call, wrapped_send
 from realms_cli.config import Config
-from realms_cli.utils import print_over_colums
-from realms_cli.binary_converter import map_crypt
+from realms_cli.crypt_pipeline import packed_crypt
 from realms_cli.shared import uint
 
 @click.command()
@@ -85,11 +80,7 @@ def set_crypt_data(crypt_token_id, network):
     """
     config = Config(nile_network=network)
 
-    crypts = json.load(open("data/crypts.json", "r"))
-    resources = json.load(open("data/resources.json", "r"))
-    legendary = json.load(open("data/legendary.json", "r"))
-
-    crypt_data_felt = map_crypt(crypts[str(crypt_token_id)], resources, legendary)
+    crypt_data_felt = packed_crypt(crypt_token_id)
 
     wrapped_send(
         network=config.nile_network,
@@ -114,7 +105,7 @@ def check_crypts(address, network):
     config = Config(nile_network=network)
 
     if address == "":
-        nile_account = Account(config.USER_ALIAS, network)
+        nile_account = load_account(config.USER_ALIAS, network)
         address = nile_account.address
 
     out = wrapped_call(
@@ -135,7 +126,7 @@ def check_s_crypts(address, network):
     config = Config(nile_network=network)
 
     if address == "":
-        nile_account = Account(config.USER_ALIAS, network)
+        nile_account = load_account(config.USER_ALIAS, network)
         address = nile_account.address
 
     out = wrapped_call(
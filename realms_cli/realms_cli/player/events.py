@@ -0,0 +1,32 @@
+# First, import click dependency
+import click
+
+from realms_cli.config import Config
+from realms_cli.event_indexer import EventIndexer
+
+
+@click.command()
+@click.option("--from_block", default=0, help="First block to index when nothing is indexed yet")
+@click.option("--network", default="goerli")
+def index_events(from_block, network):
+    """
+    Index settling, relic, trade and desiege events into the local store
+    """
+    config = Config(nile_network=network)
+    indexer = EventIndexer.for_network(config.nile_network)
+    indexer.sync(config.nile_network, from_block=from_block)
+
+
+@click.command()
+@click.argument("realm_token_id", nargs=1)
+@click.option("--network", default="goerli")
+def realm_events(realm_token_id, network):
+    """
+    Settling history of a Realm from the local event store
+    """
+    config = Config(nile_network=network)
+    indexer = EventIndexer.for_network(config.nile_network)
+    for table in ["settling", "settling_times"]:
+        for row in indexer.rows(table, token_id=int(realm_token_id)):
+            value = row.get("owner", row.get("time_staked"))
+            print(f"block {row['block_number']}: {row['kind']} {value} (tx {row['tx_hash']})")
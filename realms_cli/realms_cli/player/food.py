@@ -1,14 +1,8 @@
 # First, import click dependency
-import json
 import click
 
-from nile.core.account import Account
-from ecdsa import SigningKey, SECP256k1
-
 from realms_cli.caller_invoker import wrapped_call, wrapped_send
 from realms_cli.config import Config
-from realms_cli.utils import print_over_colums
-from realms_cli.binary_converter import map_realm
 from realms_cli.shared import uint
 
 
@@ -1,17 +1,14 @@
 # First, import click dependency
-import json
 import click
 
-from nile.core.account import Account
-from ecdsa import SigningKey, SECP256k1
-
-from realms_cli.caller_invoker import wrapped_call, wrapped_send
+from realms_cli.caller_invoker import load_account, wrapped_call, wrapped_send
+from realms_cli.multicall import Multicall
 from realms_cli.config import Config
 from realms_cli.utils import print_over_colums, parse_multi_input
 
 
 @click.command()
-@click.option("--address", default="", help="Account address in hex format 0x...")
+@click.option("--address", default="", help="Account address(es) in hex format 0x..., comma separated")
 @click.option("--network", default="goerli")
 def check_resources(address, network):
     """
@@ -21,8 +18,9 @@ def check_resources(address, network):
     config = Config(nile_network=network)
 
     if address == "":
-        nile_account = Account(config.USER_ALIAS, network)
+        nile_account = load_account(config.USER_ALIAS, network)
         address = nile_account.address
+    addresses = [a.strip() for a in address.split(",")]
 
     n_resources = len(config.RESOURCES)
 
@@ -39,25 +37,25 @@ def check_resources(address, network):
     uints.append("10001")
     uints.append("0")
 
-    out = wrapped_call(
-        network=config.nile_network,
-        contract_alias="proxy_resources",
-        function="balanceOfBatch",
-        arguments=[
+    # one balanceOfBatch per account, all of them aggregated
+    mc = Multicall(config.nile_network)
+    for account in addresses:
+        mc.add("proxy_resources", "balanceOfBatch", [
             n_resources,
-            *[address for _ in range(n_resources)],
+            *[account for _ in range(n_resources)],
             n_resources,
             *uints,
-        ],
-    )
+        ])
 
-    out = out.split(" ")
-    pretty_out = []
-    for i, resource in enumerate(config.RESOURCES):
-        pretty_out.append(
-            f"{resource} : {int(out[i*2+1], 16) / 1000000000000000000}")
+    for account, out in zip(addresses, mc.execute(typed=True)):
+        pretty_out = []
+        for resource, balance in zip(config.RESOURCES, out.balances):
+            pretty_out.append(
+                f"{resource} : {balance.value / 1000000000000000000}")
 
-    print_over_colums(pretty_out)
+        if len(addresses) > 1:
+            print(f"\n{account}")
+        print_over_colums(pretty_out)
 
 
 @click.command()
@@ -1,13 +1,11 @@
 # First, import click dependency
-import json
 import click
 
-from nile.core.account import Account
-
-from realms_cli.caller_invoker import call_multi, wrapped_call, wrapped_send
+from realms_cli.caller_invoker import load_account, wrapped_call, wrapped_send
+from realms_cli.multicall import Multicall
 from realms_cli.config import Config
 from realms_cli.utils import parse_multi_input
-from realms_cli.binary_converter import map_realm
+from realms_cli.packed_store import REALMS_STORE, PackedStore
 
 
 @click.command()
@@ -111,16 +109,9 @@ def set_realm_data(realm_token_id, network):
     """
     config = Config(nile_network=network)
 
-    realms = json.load(open("data/realms.json", "r"))
-    resources = json.load(open("data/resources.json", "r"))
-    orders = json.load(open("data/orders.json", "r"))
-    wonders = json.load(open("data/wonders.json", ))
-
     realm_token_ids = parse_multi_input(realm_token_id)
-    calldata = [
-        [id, 0, map_realm(realms[str(id)], resources, wonders, orders)]
-        for id in realm_token_ids
-    ]
+    with PackedStore(REALMS_STORE) as realms:
+        calldata = [[id, 0, realms[int(id)]] for id in realm_token_ids]
 
     wrapped_send(
         network=config.nile_network,
@@ -141,7 +132,7 @@ def check_realms(address, network) -> str:
     config = Config(nile_network=network)
 
     if address == "":
-        nile_account = Account(config.USER_ALIAS, network)
+        nile_account = load_account(config.USER_ALIAS, network)
         address = nile_account.address
 
     out = wrapped_call(
@@ -163,7 +154,7 @@ def check_s_realms(address, network):
     config = Config(nile_network=network)
 
     if address == "":
-        nile_account = Account(config.USER_ALIAS, network)
+        nile_account = load_account(config.USER_ALIAS, network)
         address = nile_account.address
 
     out = wrapped_call(
@@ -171,8 +162,9 @@ def check_s_realms(address, network):
         contract_alias="proxy_s_realms",
         function="balanceOf",
         arguments=[address],
+        typed=True,
     )
-    print('Ser, player has ' + out[0] + ' settled Realms...')
+    print(f'Ser, player has {out.balance.value} settled Realms...')
 
 
 @click.command()
@@ -237,63 +229,24 @@ def get_owned(address, network):
     Get owned realms and owned settled realms.
     """
     config = Config(nile_network=network)
-
-    # out = check_realms(address, network)
-    out = wrapped_call(
-        network=config.nile_network,
-        contract_alias="proxy_realms",
-        function="balanceOf",
-        arguments=[int(address or config.USER_ADDRESS, 16)],
-    )
-    n_realms, _ = out.split(" ")
-
-    print(f"You own {n_realms} unsettled realms.")
-    print("Quering which unsettled realms you own.")
-
-    # prepare for multi-call
-    calldata = [
-        [int(address or config.USER_ADDRESS, 16), i, 0]
-        for i in range(int(n_realms))
-    ]
-
-    stdout = call_multi(
-        network=config.nile_network,
-        contract_alias="proxy_realms",
-        function="tokenOfOwnerByIndex",
-        calldata=calldata,
-    )
-
-    realm_ids = [int(realm_id.strip(" 0\n")) for realm_id in stdout]
-    realm_ids.sort()
-    print(",".join(map(str, realm_ids)))
-
-    #
-    # s_realms
-    #
-
-    out = wrapped_call(
-        network=config.nile_network,
-        contract_alias="proxy_s_realms",
-        function="balanceOf",
-        arguments=[int(address or config.USER_ADDRESS, 16)],
-    )
-    n_realms, _ = out.split(" ")
-
-    print(f"You own {n_realms} settled realms.")
-
-    # prepare for multi-call
-    calldata = [
-        [int(address or config.USER_ADDRESS, 16), i, 0]
-        for i in range(int(n_realms))
-    ]
-
-    stdout = call_multi(
-        network=config.nile_network,
-        contract_alias="proxy_s_realms",
-        function="tokenOfOwnerByIndex",
-        calldata=calldata,
-    )
-
-    realm_ids = [int(realm_id.strip(" 0\n")) for realm_id in stdout]
-    realm_ids.sort()
-    print(",".join(map(str, realm_ids)))
+    owner = int(address or config.USER_ADDRESS, 16)
+
+    for contract_alias, kind in (("proxy_realms", "unsettled"), ("proxy_s_realms", "settled")):
+        out = wrapped_call(
+            network=config.nile_network,
+            contract_alias=contract_alias,
+            function="balanceOf",
+            arguments=[owner],
+            typed=True,
+        )
+        n_realms = out.balance.value
+
+        print(f"You own {n_realms} {kind} realms.")
+
+        # every index in as few round-trips as possible
+        mc = Multicall(config.nile_network)
+        for i in range(n_realms):
+            mc.add(contract_alias, "tokenOfOwnerByIndex", [owner, i, 0])
+
+        realm_ids = sorted(out.tokenId.value for out in mc.execute(typed=True))
+        print(",".join(map(str, realm_ids)))
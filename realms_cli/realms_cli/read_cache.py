@@ -0,0 +1,185 @@
+"""Block-aware read-through cache for view calls.
+
+Reads are keyed by (network, contract alias, selector, calldata, block). The
+block is the latest accepted block number, looked up at most once every
+`block_ttl` seconds per network, and the call is executed against exactly
+that block so a cached value is never older than its key says.
+
+Static functions (costs, realm metadata) are keyed without a block and served
+without touching the network once known. `wrapped_send` invalidates the
+contract it just changed; changes sent from elsewhere (the TS tasks, another
+machine) are picked up once the entry is `static_ttl` seconds old.
+
+Entries live in an in-memory LRU with a TTL and, when a path is given, in a
+sqlite file that survives between CLI invocations.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from realms_cli.calldata import to_int
+
+# environment variable holding the path of the on-disk tier
+CACHE_PATH_ENV = "REALMS_CLI_CACHE"
+
+MAX_ENTRIES = 4096
+TTL = 300.0
+# long but finite, an admin can change static values from outside this cli
+STATIC_TTL = 6 * 3600.0
+BLOCK_TTL = 5.0
+
+# values only the admin changes, through the same contract they are read from
+STATIC_FUNCTIONS = frozenset([
+    "get_troop_cost",
+    "get_building_cost",
+    "get_realm_info",
+])
+
+
+@lru_cache(maxsize=None)
+def _selector(function: str) -> str:
+    # imported on first use, it loads most of cairo-lang
+    from starkware.starknet.public.abi import get_selector_from_name
+
+    return hex(get_selector_from_name(function))
+
+
+class ReadCache:
+    """LRU + TTL cache of view call results with an optional sqlite tier.
+
+    `latest_block(network)` returns the current block number, it is only
+    consulted for non-static reads.
+    """
+
+    def __init__(
+        self,
+        latest_block,
+        path=None,
+        max_entries=MAX_ENTRIES,
+        ttl=TTL,
+        static_ttl=STATIC_TTL,
+        block_ttl=BLOCK_TTL,
+        static_functions=STATIC_FUNCTIONS,
+    ):
+        self.latest_block = latest_block
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.static_ttl = static_ttl
+        self.block_ttl = block_ttl
+        self.static_functions = frozenset(static_functions)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reads ("
+                "key TEXT PRIMARY KEY, network TEXT, alias TEXT, value TEXT, expires REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS reads_alias ON reads (network, alias)")
+            self._db.commit()
+
+    def block(self, network):
+        """Latest block number of `network`, refreshed every `block_ttl` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._blocks.get(network)
+        if cached is not None and now - cached[1] < self.block_ttl:
+            return cached[0]
+        number = self.latest_block(network)
+        with self._lock:
+            self._blocks[network] = (number, now)
+        return number
+
+    def key(self, network, contract_alias, function, calldata, block) -> tuple:
+        return (network, str(contract_alias), _selector(function), tuple(map(to_int, calldata)), block)
+
+    def get(self, key):
+        """Returns the cached value of `key`, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, expires FROM reads WHERE key = ?", (json.dumps(key),)
+            ).fetchone()
+        # rows without an expiry were written by versions that kept static reads forever
+        if row is None or row[1] is None or row[1] <= now:
+            return None
+        value = json.loads(row[0])
+        self._remember(key, value, row[1])
+        return value
+
+    def _remember(self, key, value, expires):
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key, value, static=False):
+        expires = time.time() + (self.static_ttl if static else self.ttl)
+        self._remember(key, value, expires)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO reads VALUES (?, ?, ?, ?, ?)",
+                    (json.dumps(key), key[0], key[1], json.dumps(value), expires),
+                )
+                self._db.commit()
+
+    def fetch(self, network, contract_alias, function, calldata, call):
+        """Returns the cached result or `call(block)` it, block being None for static reads."""
+        static = function in self.static_functions
+        block = None if static else self.block(network)
+        key = self.key(network, contract_alias, function, calldata, block)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = call(block)
+        self.put(key, value, static=static)
+        return value
+
+    def invalidate(self, network, contract_alias=None):
+        """Forgets the reads of one contract (all when None) and the known block of `network`."""
+        with self._lock:
+            self._blocks.pop(network, None)
+            for key in list(self._entries):
+                if key[0] == network and contract_alias in (None, key[1]):
+                    del self._entries[key]
+            if self._db is not None:
+                if contract_alias is None:
+                    self._db.execute("DELETE FROM reads WHERE network = ?", (network,))
+                else:
+                    self._db.execute(
+                        "DELETE FROM reads WHERE network = ? AND alias = ?",
+                        (network, str(contract_alias)),
+                    )
+                self._db.commit()
+
+    def prune(self):
+        """Drops expired rows of the on-disk tier."""
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM reads WHERE expires <= ?", (time.time(),))
+                self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,94 @@
+"""Indexed view of nile's deployment and declaration files.
+
+`nile.deployments.load` rescans `<network>.deployments.txt` on every lookup.
+Here each file is parsed once into a dict keyed by alias and address, kept in
+memory and in a compact json next to it (`.<network>.deployments.idx`). Both
+are keyed by the mtime and size of the source file, so entries registered by a
+running deploy script are picked up on the next lookup.
+"""
+import json
+import os
+
+from nile.common import DECLARATIONS_FILENAME, DEPLOYMENTS_FILENAME
+
+DEPLOYMENTS = "deployments"
+DECLARATIONS = "declarations"
+
+_FILENAMES = {
+    DEPLOYMENTS: DEPLOYMENTS_FILENAME,
+    DECLARATIONS: DECLARATIONS_FILENAME,
+}
+
+# (kind, network) -> (stamp, index)
+_indexes = {}
+
+
+def _parse(kind, path) -> dict:
+    index = {}
+    with open(path) as fp:
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            if kind == DEPLOYMENTS:
+                address, abi, *aliases = line.split(":")
+                entry = [address, abi]
+            else:
+                address, *aliases = line.split(":")
+                entry = address
+            # first match wins, as with nile's generators
+            for identifier in [address] + aliases:
+                index.setdefault(identifier, entry)
+    return index
+
+
+def load_index(network, kind=DEPLOYMENTS) -> dict:
+    """Returns {identifier: entry} of a network's deployments or declarations file.
+
+    Deployment entries are [address, abi], declaration entries the class hash.
+    """
+    path = f"{network}.{_FILENAMES[kind]}"
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _indexes.pop((kind, network), None)
+        return {}
+    stamp = [stat.st_mtime_ns, stat.st_size]
+
+    cached = _indexes.get((kind, network))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    cache_path = f".{network}.{kind}.idx"
+    index = None
+    try:
+        with open(cache_path) as fp:
+            stored = json.load(fp)
+        if stored["stamp"] == stamp:
+            index = stored["index"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if index is None:
+        index = _parse(kind, path)
+        try:
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "w") as fp:
+                json.dump({"stamp": stamp, "index": index}, fp, separators=(",", ":"))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    _indexes[(kind, network)] = (stamp, index)
+    return index
+
+
+def deployment(identifier, network):
+    """Returns (address, abi) of an alias or address, or None."""
+    entry = load_index(network, DEPLOYMENTS).get(str(identifier))
+    return None if entry is None else tuple(entry)
+
+
+def declaration(identifier, network):
+    """Returns the class hash of an alias or hash, or None."""
+    return load_index(network, DECLARATIONS).get(str(identifier))
@@ -0,0 +1,198 @@
+"""Resource production of many realms at once, by the rules of L02_Resources.
+
+with PackedStore(REALMS_STORE) as store:
+    resources = realm_resources(store.slots())      # (n, 7) resource ids
+amounts = claimable(now, time_staked, vault_staked, resources, houses)
+forecast = forecast_claims(start, 30, time_staked, vault_staked, resources, houses)
+forecast.by_resource        # (claims, RESOURCE_ID_SIZE) minted per claim and resource id
+
+Every function takes one value per realm as NumPy arrays (or scalars), from
+state cached off chain: the time staked and vault staked of Settling, the
+House count of get_effective_buildings (which L02_Resources passes to
+library_resources as `workhuts`) and the happiness of calculate_happiness.
+Amounts are whole resources in (n, 7) arrays following the resource slots of
+RealmData, 0 in empty slots; the contract mints them times 10**18 (`to_wei`).
+"""
+import numpy as np
+
+# contracts/settling_game/utils/constants.cairo
+DAY = 1800
+VAULT_LENGTH = 7
+MAX_DAYS_ACCURED = 2
+BASE_RESOURCES_PER_DAY = 250
+WORK_HUT_OUTPUT = BASE_RESOURCES_PER_DAY // 10
+PILLAGE_AMOUNT = 25
+BASE_HAPPINESS = 100
+
+RESOURCE_SLOTS = 7
+# resource ids of realms are 1 to 22 (data/resources.json)
+RESOURCE_ID_SIZE = 23
+# byte of resource_1 in a packed RealmData, the fields are 8 bits each
+RESOURCE_1_BYTE = 5
+WEI = 10 ** 18
+
+
+def realm_resources(slots) -> np.ndarray:
+    """(n, 7) resource ids of the (n, 32) byte slots of a realms store, see PackedStore.slots."""
+    return np.asarray(slots)[:, RESOURCE_1_BYTE:RESOURCE_1_BYTE + RESOURCE_SLOTS].astype(np.int64)
+
+
+def realm_resource_ids(resources) -> np.ndarray:
+    """_calculate_realm_resource_ids: resource_1 always, the other slots where they are set."""
+    resources = np.asarray(resources, dtype=np.int64)
+    return np.where(_minted_slots(resources), resources, 0)
+
+
+def _minted_slots(resources) -> np.ndarray:
+    minted = resources != 0
+    minted[:, 0] = True
+    return minted
+
+
+def resource_output(workhuts, happiness) -> np.ndarray:
+    """_calculate_resource_output: daily output of each resource of a realm."""
+    happiness = np.asarray(happiness, dtype=np.int64)
+    if (happiness < 0).any():
+        raise ValueError("happiness must not be negative, unsigned_div_rem would fail")
+    return BASE_RESOURCES_PER_DAY * happiness // 100 + np.asarray(workhuts, dtype=np.int64) * WORK_HUT_OUTPUT
+
+
+def resource_claimable(days, tax, output) -> np.ndarray:
+    """_calculate_resource_claimable in whole resources, `tax` percent of `days` of `output`."""
+    return np.asarray(days, dtype=np.int64) * tax * output // 100
+
+
+def total_mintable_resources(workhuts, happiness, resources, days, mint_percentage) -> np.ndarray:
+    """_calculate_total_mintable_resources: (n, 7) amounts, each resource of a realm has the same output."""
+    resources = np.asarray(resources, dtype=np.int64)
+    output = resource_output(workhuts, happiness)
+    amount = resource_claimable(days, mint_percentage, output)
+    amount = np.broadcast_to(amount, resources.shape[:1])
+    return np.where(_minted_slots(resources), amount[:, None], 0)
+
+
+def days_accrued(now, time_staked) -> tuple:
+    """(days, remainder) of days_accrued.
+
+    Like the contract, up to MAX_DAYS_ACCURED + 1 days are kept and more
+    become MAX_DAYS_ACCURED, so 3 days accrue 3 and 4 or more accrue 2.
+    """
+    days, remainder = np.divmod(np.asarray(now, dtype=np.int64) - time_staked, DAY)
+    return np.where(days <= MAX_DAYS_ACCURED + 1, days, MAX_DAYS_ACCURED), remainder
+
+
+def vault_days_accrued(now, vault_staked) -> tuple:
+    """(days, remainder) of vault_days_accrued, without a cap."""
+    return np.divmod(np.asarray(now, dtype=np.int64) - vault_staked, DAY)
+
+
+def available_vault_days(now, vault_staked) -> tuple:
+    """(days, remainder) of get_available_vault_days, (0, 0) before VAULT_LENGTH days."""
+    days, remainder = vault_days_accrued(now, vault_staked)
+    ready = days > VAULT_LENGTH - 1
+    return np.where(ready, days, 0), np.where(ready, remainder, 0)
+
+
+def claimable(now, time_staked, vault_staked, resources, workhuts, happiness=BASE_HAPPINESS) -> np.ndarray:
+    """get_all_resource_claimable: days plus available vault days at `happiness`."""
+    days, _ = days_accrued(now, time_staked)
+    vault_days, _ = available_vault_days(now, vault_staked)
+    return total_mintable_resources(workhuts, happiness, resources, days + vault_days, 100)
+
+
+def vault_raidable(now, vault_staked, resources, workhuts) -> np.ndarray:
+    """get_all_vault_raidable: PILLAGE_AMOUNT percent of every vault day, at base happiness."""
+    days, _ = vault_days_accrued(now, vault_staked)
+    return total_mintable_resources(workhuts, BASE_HAPPINESS, resources, days, PILLAGE_AMOUNT)
+
+
+def _claim(now, time_staked, vault_staked, output) -> tuple:
+    """(amount per resource, time_staked, vault_staked) of claim_resources for every realm."""
+    days, remainder = days_accrued(now, time_staked)
+    vault_days, vault_remainder = available_vault_days(now, vault_staked)
+    days = days + vault_days
+    claimed = days != 0
+    # set_time_staked(remainder) stores now - remainder
+    time_staked = np.where(claimed, now - remainder, time_staked)
+    vault_staked = np.where(claimed, now - vault_remainder, vault_staked)
+    return resource_claimable(days, 100, output), time_staked, vault_staked
+
+
+def claim_resources(now, time_staked, vault_staked, resources, workhuts) -> tuple:
+    """claim_resources of every realm at `now`: (amounts, time_staked, vault_staked) after the claims.
+
+    claim_resources mints at base happiness. A realm without days or vault
+    days reverts, it mints nothing and keeps its times. A claim before the
+    vault is available restarts the vault, like set_time_vault_staked(0).
+    """
+    resources = np.asarray(resources, dtype=np.int64)
+    output = resource_output(workhuts, BASE_HAPPINESS)
+    amount, time_staked, vault_staked = _claim(now, time_staked, vault_staked, output)
+    amount = np.broadcast_to(amount, resources.shape[:1])
+    return np.where(_minted_slots(resources), amount[:, None], 0), time_staked, vault_staked
+
+
+def totals_by_resource(resources, amounts) -> np.ndarray:
+    """(RESOURCE_ID_SIZE,) sum of (n, 7) `amounts` by the resource id of their slot."""
+    # bincount sums in float64, exact up to 2**53
+    totals = np.bincount(np.asarray(resources, dtype=np.int64).ravel(), weights=np.asarray(amounts).ravel(),
+                         minlength=RESOURCE_ID_SIZE)
+    return totals.astype(np.int64)
+
+
+def to_wei(amounts) -> np.ndarray:
+    """Whole resource amounts as the token amounts the contract mints, exact python ints."""
+    return np.asarray(amounts).astype(object) * WEI
+
+
+class Forecast:
+    """Resources minted by repeated claims of many realms."""
+
+    def __init__(self, times, by_resource, per_realm, claims):
+        self.times = times
+        self.by_resource = by_resource
+        self.per_realm = per_realm
+        self.claims = claims
+
+    def total(self) -> np.ndarray:
+        """(RESOURCE_ID_SIZE,) resources minted over the whole forecast, by resource id."""
+        return self.by_resource.sum(axis=0)
+
+
+def forecast_claims(start, days, time_staked, vault_staked, resources, workhuts, claim_every=1) -> Forecast:
+    """Every realm calling claim_resources each `claim_every` day cycles from `start`, for `days` cycles.
+
+    `times` are the claim timestamps, `by_resource` the (claims,
+    RESOURCE_ID_SIZE) resources minted at each, `per_realm` the (n, 7) totals of
+    every realm and `claims` how many of its claims minted anything.
+    """
+    resources = np.asarray(resources, dtype=np.int64)
+    n = len(resources)
+    time_staked = np.array(time_staked, dtype=np.int64) + np.zeros(n, dtype=np.int64)
+    vault_staked = np.array(vault_staked, dtype=np.int64) + np.zeros(n, dtype=np.int64)
+    output = resource_output(workhuts, BASE_HAPPINESS) + np.zeros(n, dtype=np.int64)
+    times = start + DAY * np.arange(claim_every, days + 1, claim_every, dtype=np.int64)
+    # every resource of a realm gets the same amount, so claims are simulated per realm
+    rows, previous = [], None
+    for now in times:
+        amount, time_staked, vault_staked = _claim(now, time_staked, vault_staked, output)
+        rows.append(amount)
+        # claims are evenly spaced and only see times relative to `now`, so
+        # once those repeat every later claim mints the same
+        relative = np.concatenate([now - time_staked, now - vault_staked])
+        if previous is not None and np.array_equal(relative, previous):
+            break
+        previous = relative
+    amounts = np.array(rows, dtype=np.int64).reshape(-1, n)
+    repeats = np.ones(len(amounts), dtype=np.int64)
+    if len(amounts):
+        repeats[-1] += len(times) - len(amounts)
+    # (n, RESOURCE_ID_SIZE) count of each resource id among the minted slots of a realm
+    minted = _minted_slots(resources)
+    slots = np.zeros((n, RESOURCE_ID_SIZE))
+    np.add.at(slots, (np.nonzero(minted)[0], resources[minted]), 1)
+    # exact in float64 like totals_by_resource
+    by_resource = np.repeat((amounts.astype(np.float64) @ slots).astype(np.int64), repeats, axis=0)
+    total = repeats @ amounts
+    return Forecast(times, by_resource.reshape(-1, RESOURCE_ID_SIZE), np.where(minted, total[:, None], 0),
+                    repeats @ (amounts != 0))
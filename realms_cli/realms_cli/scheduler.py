@@ -0,0 +1,160 @@
+"""Bounded, retrying scheduler for fanning out many gateway requests.
+
+Rows are executed with at most `concurrency` requests in flight, transient
+failures are retried with exponential backoff and jitter, and results come back
+in input order with failures kept per row.
+"""
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from realms_cli.gateway import GatewayError
+
+CONCURRENCY_ENV = "REALMS_CLI_CONCURRENCY"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.25
+MAX_BACKOFF = 8.0
+
+# rate limiting and gateway/proxy hiccups, contract errors come back as 500
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+
+class CallError(Exception):
+    """Failure of a single row, kept in place of its result."""
+
+    def __init__(self, index, arguments, cause, attempts):
+        super().__init__(f"row {index} {arguments} failed after {attempts} attempt(s): {cause}")
+        self.index = index
+        self.arguments = arguments
+        self.cause = cause
+        self.attempts = attempts
+
+
+class MultiCallError(Exception):
+    """Raised when one or more rows of a batch failed."""
+
+    def __init__(self, errors, results):
+        rows = ", ".join(str(e.index) for e in errors)
+        super().__init__(f"{len(errors)}/{len(results)} calls failed (rows {rows}): {errors[0]}")
+        self.errors = errors
+        self.results = results
+
+
+def is_retryable(exc) -> bool:
+    """Whether an exception is worth another attempt."""
+    if isinstance(exc, GatewayError):
+        return exc.status in RETRYABLE_STATUSES
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError))
+
+
+class SchedulerStats:
+    """Throughput and latency counters, cumulative over every run of a scheduler."""
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.busy_seconds = 0.0
+        self.max_in_flight = 0
+        self.latencies = []
+
+    @property
+    def throughput(self) -> float:
+        """Finished rows per second of wall time spent in runs."""
+        if self.busy_seconds == 0:
+            return 0.0
+        return (self.completed + self.failed) / self.busy_seconds
+
+    def latency(self, percentile: float) -> float:
+        """Latency in seconds of a successful attempt at the given percentile (0-100)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> str:
+        return (
+            f"{self.completed} ok, {self.failed} failed, {self.retries} retries, "
+            f"{self.throughput:.1f} calls/s, max in flight {self.max_in_flight}, "
+            f"p50 {self.latency(50) * 1000:.0f}ms, p95 {self.latency(95) * 1000:.0f}ms"
+        )
+
+
+class CallScheduler:
+    """Runs a blocking function over many rows with a concurrency cap and retries."""
+
+    def __init__(
+        self,
+        concurrency: int = None,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+        jitter: float = 0.5,
+    ):
+        if concurrency is None:
+            concurrency = int(os.environ.get(CONCURRENCY_ENV, DEFAULT_CONCURRENCY))
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.stats = SchedulerStats()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._in_flight = 0
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (starting at 1)."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    async def _run_row(self, semaphore, fn, index, arguments):
+        loop = asyncio.get_event_loop()
+        attempt = 0
+        while True:
+            attempt += 1
+            async with semaphore:
+                self._in_flight += 1
+                self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+                start = time.perf_counter()
+                try:
+                    result = await loop.run_in_executor(self._executor, fn, arguments)
+                except Exception as exc:
+                    error = exc
+                else:
+                    self.stats.latencies.append(time.perf_counter() - start)
+                    self.stats.completed += 1
+                    return result
+                finally:
+                    self._in_flight -= 1
+
+            if attempt > self.retries or not is_retryable(error):
+                self.stats.failed += 1
+                return CallError(index, arguments, error, attempt)
+            self.stats.retries += 1
+            await asyncio.sleep(self.delay(attempt))
+
+    async def run_async(self, fn, rows) -> list:
+        """Returns one entry per row, in order; failed rows hold a CallError."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        try:
+            return await asyncio.gather(*[
+                self._run_row(semaphore, fn, index, arguments)
+                for index, arguments in enumerate(rows)
+            ])
+        finally:
+            self.stats.busy_seconds += time.perf_counter() - start
+
+    def run(self, fn, rows, return_exceptions=False) -> list:
+        """Blocking wrapper of `run_async`, raises MultiCallError unless `return_exceptions`."""
+        results = asyncio.run(self.run_async(fn, rows))
+        errors = [r for r in results if isinstance(r, CallError)]
+        if errors and not return_exceptions:
+            raise MultiCallError(errors, results)
+        return results
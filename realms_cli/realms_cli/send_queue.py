@@ -0,0 +1,165 @@
+"""Coalesces many sends of one signer into few multicall transactions.
+
+with SendQueue(config.nile_network, config.ADMIN_ALIAS) as queue:
+    queue.add("proxy_s_realms", "Set_module_access", [settling])
+    queue.add("proxy_lords", "approve", [settling, supply, 0])
+# every queued call is now sent (in order) and accepted
+
+Queued calls, to any target contracts, are packed into one account
+`__execute__` until the next one would exceed the call, calldata or step
+budget, or `flush_interval` seconds passed since the first one was queued.
+Calls of one transaction succeed or revert together. When a transaction cannot
+be sent its calls get the error and the next `flush` raises it.
+"""
+import threading
+
+from realms_cli.caller_invoker import READ_CACHE, load_account, parse_send, wait_for_txs
+
+MAX_CALLS = 32
+# felts of __execute__ calldata, the gateway rejects much bigger transactions
+MAX_CALLDATA = 2000
+# conservative budget against the per transaction step limit
+MAX_STEPS = 1_000_000
+DEFAULT_STEPS_PER_CALL = 25_000
+FLUSH_INTERVAL = 10.0
+
+
+class QueuedCall:
+    """One logical call; `tx_hash` is set once the transaction carrying it is sent, `error` if that failed."""
+
+    __slots__ = ("contract_alias", "function", "calldata", "tx_hash", "status", "error")
+
+    def __init__(self, contract_alias, function, calldata):
+        self.contract_alias = contract_alias
+        self.function = function
+        self.calldata = calldata
+        self.tx_hash = None
+        self.status = None
+        self.error = None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"QueuedCall({self.contract_alias}.{self.function}, error={self.error!r})"
+        return f"QueuedCall({self.contract_alias}.{self.function}, tx_hash={self.tx_hash})"
+
+
+class SendQueue:
+    """Pending sends of one signer on one network."""
+
+    def __init__(
+        self,
+        network,
+        signer_alias,
+        max_calls=MAX_CALLS,
+        max_calldata=MAX_CALLDATA,
+        max_steps=MAX_STEPS,
+        step_costs=None,
+        flush_interval=FLUSH_INTERVAL,
+        wait=True,
+    ):
+        self.network = network
+        self.account = load_account(signer_alias, network)
+        self.max_calls = max_calls
+        self.max_calldata = max_calldata
+        self.max_steps = max_steps
+        # function name -> estimated steps of one call
+        self.step_costs = step_costs or {}
+        self.flush_interval = flush_interval
+        self.wait = wait
+        self.sent = []
+        # (error, handles) of transactions that could not be sent, raised by flush
+        self.failed = []
+        self._pending = []
+        self._calldata = 0
+        self._steps = 0
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def _cost(self, function, calldata):
+        # each call adds its (to, selector, offset, len) entry to the call array
+        return len(calldata) + 4, self.step_costs.get(function, DEFAULT_STEPS_PER_CALL)
+
+    def add(self, contract_alias, function, arguments) -> list:
+        """Queues calls as `wrapped_send` takes them, returns their QueuedCall handles."""
+        rows = arguments if arguments and isinstance(arguments[0], list) else [arguments]
+        handles = []
+        with self._lock:
+            for calldata in rows:
+                felts, steps = self._cost(function, calldata)
+                if self._pending and (
+                    len(self._pending) + 1 > self.max_calls
+                    or self._calldata + felts > self.max_calldata
+                    or self._steps + steps > self.max_steps
+                ):
+                    self._send()
+                handle = QueuedCall(contract_alias, function, list(calldata))
+                self._pending.append(handle)
+                self._calldata += felts
+                self._steps += steps
+                handles.append(handle)
+            if self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self._send)
+                self._timer.daemon = True
+                self._timer.start()
+        return handles
+
+    def _send(self):
+        # also runs on the timer thread, so errors are kept for flush instead of raised
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, []
+            self._calldata = self._steps = 0
+            if not pending:
+                return None
+            try:
+                out = self.account.send_calls(
+                    [(c.contract_alias, c.function, c.calldata) for c in pending])
+            except Exception as exc:
+                print(f"could not send {len(pending)} call(s): {exc}")
+                for handle in pending:
+                    handle.error = exc
+                self.failed.append((exc, pending))
+                return None
+            _, tx_hash = parse_send(out)
+            print(f"sent {len(pending)} call(s) with nonce {self.account.last_nonce}: {tx_hash}")
+            for handle in pending:
+                handle.tx_hash = tx_hash
+            self.sent.append((tx_hash, pending))
+            return tx_hash
+
+    def flush(self) -> list:
+        """Sends whatever is pending and, with `wait`, waits for every sent transaction.
+
+        Returns the QueuedCall handles sent since the last flush. Raises the
+        first error of a transaction that could not be sent since then, the
+        handles of every such transaction hold their error.
+        """
+        self._send()
+        with self._lock:
+            sent, self.sent = self.sent, []
+            failed, self.failed = self.failed, []
+        if self.wait and sent:
+            statuses = wait_for_txs(self.network, [tx_hash for tx_hash, _ in sent])
+            for (_, handles), status in zip(sent, statuses):
+                for handle in handles:
+                    handle.status = status["tx_status"]
+        for contract_alias in {h.contract_alias for _, handles in sent for h in handles}:
+            READ_CACHE.invalidate(self.network, contract_alias)
+        if failed:
+            raise failed[0][0]
+        return [handle for _, handles in sent for handle in handles]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._pending = []
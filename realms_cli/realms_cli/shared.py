@@ -1,5 +1,7 @@
 from collections import namedtuple
-import struct
+
+from realms_cli.bitfield import signed_bytes
+from realms_cli.calldata import encode_uint256s
 
 
 def str_to_felt(text: str) -> int:
@@ -13,7 +15,11 @@ def felt_to_str(felt: int) -> str:
 
 
 def pack_values(values: list) -> int:
-    return int.from_bytes(struct.pack(f"<{len(values)}b", *values), "little")
+    return signed_bytes(len(values)).pack(values)
+
+
+def unpack_values(packed: int, count: int) -> list:
+    return list(signed_bytes(count).unpack(packed))
 
 
 def uint(a):
@@ -29,18 +35,19 @@ def expanded_uint_list(arr):
     """
     Convert array of ints into flattened array of uints.
     """
-    return list(sum([uint(a) for a in arr], ()))
+    return encode_uint256s(arr)
 
 
 def expanded_uint_list_decimals(arr):
     """
     Convert array of ints into flattened array of uints.
     """
-    return list(sum([uint_decimal(a) for a in arr], ()))
+    return encode_uint256s(arr, scale=10 ** 18)
 
 
 def from_bn(a):
     """
     Convert 18 decimals into 4 decimals
     """
-    return round(int(a, 16) / 1000000000000000000, 4)
+    value = int(a, 16) if isinstance(a, str) else int(a)
+    return round(value / 1000000000000000000, 4)
@@ -0,0 +1,198 @@
+"""Watches many transactions at once until they are accepted or rejected.
+
+tx statuses:
+NOT_RECEIVED -> RECEIVED -> PENDING -> ACCEPTED_ON_L2 (-> ACCEPTED_ON_L1)
+                                    -> REJECTED
+
+Each transaction is polled on its own adaptive interval: it starts short, grows
+while the status stays the same and drops back after every transition.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from realms_cli import nonce as nonces
+from realms_cli.gateway import get_gateway
+
+FINAL_STATUSES = ("ACCEPTED_ON_L2", "ACCEPTED_ON_L1", "REJECTED")
+
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 30.0
+BACKOFF = 1.5
+CONCURRENCY = 8
+# seconds between nonce syncs of the accounts with watched transactions
+SYNC_INTERVAL = 60.0
+# seconds wait_for_txs waits before giving up
+TIMEOUT_ENV = "REALMS_CLI_TX_TIMEOUT"
+DEFAULT_TIMEOUT = 30 * 60.0
+
+
+class TxTimeout(Exception):
+    """Raised when transactions are still not final after the timeout."""
+
+    def __init__(self, pending):
+        super().__init__(f"{len(pending)} transaction(s) still not final: {', '.join(pending)}")
+        self.pending = pending
+
+
+class _Watched:
+    def __init__(self, future, interval):
+        self.future = future
+        self.callbacks = []
+        self.status = None
+        self.interval = interval
+        self.due = 0.0
+
+
+class TxTracker:
+    """Polls the feeder gateway for the status of every watched transaction.
+
+    tracker = TxTracker(network)
+    futures = [tracker.watch(tx_hash, on_change) for tx_hash in hashes]
+    statuses = await asyncio.gather(*futures)
+
+    Callbacks are called as callback(tx_hash, previous_status, status_dict) on
+    every transition, futures resolve with the final status dict.
+    """
+
+    def __init__(
+        self,
+        network,
+        min_interval=MIN_INTERVAL,
+        max_interval=MAX_INTERVAL,
+        backoff=BACKOFF,
+        concurrency=CONCURRENCY,
+        sync_interval=SYNC_INTERVAL,
+    ):
+        self.gateway = get_gateway(network)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.sync_interval = sync_interval
+        self.polls = 0
+        self._watched = {}
+        self._runner = None
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def watch(self, tx_hash, callback=None) -> asyncio.Future:
+        """Starts tracking `tx_hash`, returns a future of its final status dict."""
+        watched = self._watched.get(tx_hash)
+        if watched is None:
+            future = asyncio.get_event_loop().create_future()
+            watched = _Watched(future, self.min_interval)
+            self._watched[tx_hash] = watched
+        if callback is not None:
+            watched.callbacks.append(callback)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+        return watched.future
+
+    async def _poll(self, semaphore, tx_hash, watched):
+        loop = asyncio.get_event_loop()
+        async with semaphore:
+            self.polls += 1
+            try:
+                status = await loop.run_in_executor(
+                    self._executor, self.gateway.get_transaction_status, tx_hash)
+            except Exception as exc:
+                print(f"could not poll {tx_hash}: {exc}")
+                status = {"tx_status": watched.status}
+
+        # error payloads carry no status, keep the last one
+        tx_status = status.get("tx_status", watched.status)
+        if tx_status != watched.status:
+            previous, watched.status = watched.status, tx_status
+            watched.interval = self.min_interval
+            for callback in watched.callbacks:
+                callback(tx_hash, previous, status)
+        else:
+            watched.interval = min(self.max_interval, watched.interval * self.backoff)
+        watched.due = time.monotonic() + watched.interval
+
+        if tx_status in FINAL_STATUSES:
+            nonces.settle(tx_hash, tx_status)
+            del self._watched[tx_hash]
+            if not watched.future.done():
+                watched.future.set_result(status)
+
+    async def _sync_nonces(self):
+        try:
+            await asyncio.get_event_loop().run_in_executor(self._executor, nonces.sync_submitted)
+        except Exception as exc:
+            print(f"could not sync nonces: {exc}")
+
+    async def _run(self):
+        try:
+            await self._poll_all()
+        except asyncio.CancelledError:
+            self._fail(None)
+            raise
+        except Exception as exc:
+            # nothing polls anymore, waiters get the error instead of hanging
+            self._fail(exc)
+
+    def _fail(self, exc):
+        """Ends every watched future with `exc`, or cancels them when it is None."""
+        watched, self._watched = self._watched, {}
+        for w in watched.values():
+            if w.future.done():
+                continue
+            if exc is None:
+                w.future.cancel()
+            else:
+                w.future.set_exception(exc)
+
+    async def _poll_all(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        synced = time.monotonic()
+        while self._watched:
+            now = time.monotonic()
+            if now - synced >= self.sync_interval:
+                synced = now
+                await self._sync_nonces()
+            due = [(h, w) for h, w in self._watched.items() if w.due <= now]
+            if due:
+                await asyncio.gather(*[self._poll(semaphore, h, w) for h, w in due])
+            if self._watched:
+                next_due = min(w.due for w in self._watched.values())
+                await asyncio.sleep(max(0.0, next_due - time.monotonic()))
+
+    async def wait(self, tx_hashes, callback=None, timeout=None) -> list:
+        """Watches all hashes and returns their final status dicts in order."""
+        futures = [self.watch(tx_hash, callback) for tx_hash in tx_hashes]
+        done, pending = await asyncio.wait(futures, timeout=timeout)
+        if pending:
+            raise TxTimeout([h for h, f in zip(tx_hashes, futures) if f in pending])
+        # a failed runner fails every future, only the first error is raised
+        errors = [f.exception() for f in futures if not f.cancelled() and f.exception() is not None]
+        if errors:
+            raise errors[0]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def print_transition(tx_hash, previous, status):
+    """Default callback, one line per status change."""
+    print(f"{tx_hash}: {previous or 'UNKNOWN'} -> {status['tx_status']}")
+
+
+def wait_for_txs(network, tx_hashes, callback=print_transition, timeout=None) -> list:
+    """Blocks until every transaction is final, returns their status dicts in order.
+
+    Raises TxTimeout after `timeout` seconds, REALMS_CLI_TX_TIMEOUT or 30
+    minutes by default.
+    """
+    if not tx_hashes:
+        return []
+    if timeout is None:
+        timeout = float(os.environ.get(TIMEOUT_ENV, DEFAULT_TIMEOUT))
+
+    tracker = TxTracker(network)
+    try:
+        return asyncio.run(tracker.wait(tx_hashes, callback=callback, timeout=timeout))
+    finally:
+        tracker.close()
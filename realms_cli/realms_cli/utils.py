@@ -1,6 +1,8 @@
 import struct
 from typing import List
 
+from realms_cli.calldata import encode_uint256s
+
 
 def print_over_colums(array_of_strings, cols=2, width=40):
     """Takes in an array of strings and prints the content over a
@@ -59,18 +61,19 @@ def expanded_uint_list(arr):
     """
     Convert array of ints into flattened array of uints.
     """
-    return list(sum([uint(a) for a in arr], ()))
+    return encode_uint256s(arr)
 
 
 def expanded_uint_list_decimals(arr):
     """
     Convert array of ints into flattened array of uints.
     """
-    return list(sum([uint_decimal(a) for a in arr], ()))
+    return encode_uint256s(arr, scale=10 ** 18)
 
 
 def from_bn(a):
     """
     Convert 18 decimals into 4 decimals
     """
-    return round(int(a, 16) / 1000000000000000000, 4)
+    value = int(a, 16) if isinstance(a, str) else int(a)
+    return round(value / 1000000000000000000, 4)
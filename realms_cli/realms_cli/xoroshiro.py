@@ -0,0 +1,189 @@
+"""xoroshiro128** as computed by contracts/utils/xoroshiro128_starstar.cairo.
+
+rng = Xoroshiro(0x10AF)     # the seed passed to the contract's constructor
+rng.next()                  # the value of the contract's next()
+rng.random_raw(1_000_000)   # the next million values as a uint64 array
+rng.jump(2**64)             # skips 2**64 values
+rng.rolls(30)               # the next 30 roll_dice results of L06_Combat
+
+The state update is the reference xoroshiro128 (24, 16, 37) and the seeds are
+splitmix64(seed) and splitmix64(s0), like the constructor. The output is not
+the reference one: the contract rotates s0 * 5 before truncating it to 64
+bits, so the bits carried above bit 63 are ORed into bits 7 to 9. It is
+rotl(s0 * 5, 7) * 9 with that carry, which this module reproduces.
+
+Large batches are split into lanes, consecutive slices of the same stream
+started with jump-ahead, and stepped together with NumPy. Jumps are powers of
+the 128 x 128 bit matrix of the state update over GF(2), so any distance
+costs at most 128 products with cached powers of it. An Xoroshiro has the
+random_raw(size) of a NumPy BitGenerator and can be the `source` of
+combat_sim.
+"""
+import numpy as np
+
+M64 = 0xFFFFFFFFFFFFFFFF
+STATE_BITS = 128
+# batches smaller than this are generated one value at a time
+MIN_LANE_BATCH = 4096
+MAX_LANES = 4096
+
+_U = np.uint64
+_LOW57 = _U((1 << 57) - 1)
+
+
+def splitmix64(x) -> int:
+    """splitmix64 of the contract, one output for input `x`."""
+    z = (x + 0x9E3779B97F4A7C15) & M64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & M64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & M64
+    return z ^ (z >> 31)
+
+
+def seed_state(seed) -> tuple:
+    """(s0, s1) written by the constructor for `seed`."""
+    s0 = splitmix64(seed & M64)
+    return s0, splitmix64(s0)
+
+
+def _rotl(x, k):
+    return ((x << k) | (x >> (64 - k))) & M64
+
+
+def output(s0) -> int:
+    """The value next() returns for state s0, with the carry of s0 * 5 rotated in."""
+    x = s0 * 5
+    return ((((x << 7) | (x >> 57)) & M64) * 9) & M64
+
+
+def step(s0, s1) -> tuple:
+    """State after one next()."""
+    s1 ^= s0
+    return _rotl(s0, 24) ^ s1 ^ ((s1 << 16) & M64), _rotl(s1, 37)
+
+
+def _rotl_array(x, k):
+    return (x << _U(k)) | (x >> _U(64 - k))
+
+
+def _output_array(s0, out):
+    """output() of uint64 states into `out`; s0 * 5 >> 57 is computed without overflowing."""
+    carried = (s0 >> _U(57)) * _U(5) + (((s0 & _LOW57) * _U(5)) >> _U(57))
+    np.multiply(s0, _U(5), out=out)
+    out <<= _U(7)
+    out |= carried
+    out *= _U(9)
+
+
+def _step_array(s0, s1):
+    s1 ^= s0
+    s0[:] = _rotl_array(s0, 24) ^ s1 ^ (s1 << _U(16))
+    s1[:] = _rotl_array(s1, 37)
+
+
+def _bits(s0, s1) -> np.ndarray:
+    """(n, 128) bits of (n,) states, s0 first, least significant bit first."""
+    words = np.stack([s0, s1], axis=-1).astype("<u8")
+    return np.unpackbits(words.view(np.uint8), axis=1, bitorder="little").astype(np.float32)
+
+
+def _transform(matrix, s0, s1) -> tuple:
+    """A linear map given by its (128, 128) bit matrix applied to (n,) uint64 states."""
+    # float32 sums of at most 128 bits are exact, so the parity is their value mod 2
+    bits = (_bits(s0, s1) @ matrix % 2).astype(np.uint8)
+    words = np.packbits(bits, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+    return words[:, 0], words[:, 1]
+
+
+def _compose(second, first) -> np.ndarray:
+    """Bit matrix of applying `first`, then `second`."""
+    return first @ second % 2
+
+
+def _step_matrix() -> np.ndarray:
+    """Row i is the state after one next() from the state with only bit i set."""
+    images = [step(1 << bit, 0) for bit in range(64)] + [step(0, 1 << bit) for bit in range(64)]
+    return _bits(*(np.array(word, dtype=np.uint64) for word in zip(*images)))
+
+
+_POWERS = [_step_matrix()]
+
+
+def _power(k) -> np.ndarray:
+    """Bit matrix of the state update applied 2**k times."""
+    while len(_POWERS) <= k:
+        _POWERS.append(_compose(_POWERS[-1], _POWERS[-1]))
+    return _POWERS[k]
+
+
+def jump_states(s0, s1, steps) -> tuple:
+    """(n,) uint64 states, each advanced by its entry of `steps`."""
+    s0, s1 = np.array(s0, dtype=np.uint64, ndmin=1), np.array(s1, dtype=np.uint64, ndmin=1)
+    steps = [int(n) for n in np.broadcast_to(np.asarray(steps, dtype=object), s0.shape)]
+    if any(n < 0 for n in steps):
+        raise ValueError("cannot jump backwards")
+    for k in range(max(steps, default=0).bit_length()):
+        rows = np.array([n >> k & 1 for n in steps], dtype=bool)
+        if rows.any():
+            s0[rows], s1[rows] = _transform(_power(k), s0[rows], s1[rows])
+    return s0, s1
+
+
+class Xoroshiro:
+    """A xoroshiro128_starstar contract played locally, from its seed or its state."""
+
+    def __init__(self, seed=0, state=None):
+        s0, s1 = seed_state(int(seed)) if state is None else state
+        # the contract keeps s1 unmasked after rotl, only its low 64 bits are ever used
+        self.s0, self.s1 = int(s0) & M64, int(s1) & M64
+
+    @property
+    def state(self) -> tuple:
+        return self.s0, self.s1
+
+    def next(self) -> int:
+        value = output(self.s0)
+        self.s0, self.s1 = step(self.s0, self.s1)
+        return value
+
+    def random_raw(self, size=None):
+        """The next `size` values as a uint64 array, one int if size is None, like a BitGenerator."""
+        if size is None:
+            return self.next()
+        count = int(np.prod(size))
+        if count < MIN_LANE_BATCH:
+            values = np.array([self.next() for _ in range(count)], dtype=np.uint64)
+        else:
+            values = self._lanes(count)
+        return values.reshape(size)
+
+    def _lanes(self, count) -> np.ndarray:
+        # lanes 2**k values apart, so the jumps that start them by doubling are cached powers
+        k = max((count.bit_length() + 1) // 2, (-(-count // MAX_LANES) - 1).bit_length())
+        length = 1 << k
+        s0, s1 = np.array([self.s0], dtype=np.uint64), np.array([self.s1], dtype=np.uint64)
+        lanes = -(-count // length)
+        while len(s0) < lanes:
+            ahead = _transform(_power(k), s0, s1)
+            s0, s1 = np.concatenate([s0, ahead[0]]), np.concatenate([s1, ahead[1]])
+            k += 1
+        s0, s1 = s0[:lanes], s1[:lanes]
+        self.jump(count)
+        values = np.empty((length, lanes), dtype=np.uint64)
+        for row in values:
+            _output_array(s0, row)
+            _step_array(s0, s1)
+        return values.T.reshape(-1)[:count]
+
+    def jump(self, steps=2**64) -> "Xoroshiro":
+        """Skips `steps` values in place and returns self."""
+        s0, s1 = jump_states(self.s0, self.s1, int(steps))
+        self.s0, self.s1 = int(s0[0]), int(s1[0])
+        return self
+
+    def jumped(self, steps=2**64) -> "Xoroshiro":
+        """A copy `steps` values ahead, for a stream that does not overlap this one."""
+        return Xoroshiro(state=self.state).jump(steps)
+
+    def rolls(self, count, sides=12) -> np.ndarray:
+        """The next `count` dice rolls, `rnd % sides + 1` like roll_dice."""
+        return (self.random_raw(count) % _U(sides)).astype(np.int64) + 1
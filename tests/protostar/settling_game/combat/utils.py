@@ -1,7 +1,7 @@
 from collections import namedtuple
 from enum import IntEnum
 
-import struct
+from realms_cli.realms_cli.bitfield import SQUAD, TROOP
 
 
 class TroopId(IntEnum):
@@ -49,29 +49,11 @@ def build_partial_squad() -> Squad:
 
 
 def pack_troop(t: Troop):
-    return int.from_bytes(struct.pack("<2b", *[t.id, t.vitality]), "little")
+    return TROOP.pack(t)
 
 
 def pack_squad(squad: Squad) -> int:
-    shift = 0x100
-    packed = (
-        pack_troop(squad.t1_1)
-        + pack_troop(squad.t1_2) * shift**2
-        + pack_troop(squad.t1_3) * shift**4
-        + pack_troop(squad.t1_4) * shift**6
-        + pack_troop(squad.t1_5) * shift**8
-        + pack_troop(squad.t1_6) * shift**10
-        + pack_troop(squad.t1_7) * shift**12
-        + pack_troop(squad.t1_8) * shift**14
-        + pack_troop(squad.t1_9) * shift**16
-        + pack_troop(squad.t2_1) * shift**18
-        + pack_troop(squad.t2_2) * shift**20
-        + pack_troop(squad.t2_3) * shift**22
-        + pack_troop(squad.t2_4) * shift**24
-        + pack_troop(squad.t2_5) * shift**26
-        + pack_troop(squad.t3_1) * shift**28
-    )
-    return packed
+    return SQUAD.pack(squad)
 
 
 def assign_default_squad(squad_segment, segments):
@@ -203,10 +203,20 @@ async def ctx_factory(copyable_deployment):
 
 
 @pytest.fixture(scope="session")
-async def xoroshiro(starknet):
-    contract = compile("contracts/utils/xoroshiro128_starstar.cairo")
+def compiled_xoroshiro():
+    return compile("contracts/utils/xoroshiro128_starstar.cairo")
+
+
+@pytest.fixture(scope="session")
+async def xoroshiro(starknet, compiled_xoroshiro):
     seed = 0x10AF
-    return await starknet.deploy(contract_class=contract, constructor_calldata=[seed])
+    return await starknet.deploy(contract_class=compiled_xoroshiro, constructor_calldata=[seed])
+
+
+@pytest.fixture(scope="session")
+async def multicall(starknet):
+    contract = compile("contracts/utils/multicall.cairo")
+    return await starknet.deploy(contract_class=contract)
 
 
 @pytest.fixture(scope="session")
@@ -245,9 +255,14 @@ async def l06_combat(starknet, xoroshiro) -> StarknetContract:
     return combat_module
 
 
+@pytest.fixture(scope="session")
+def compiled_l06_combat_tests():
+    return compile("tests/pytest/settling_game/L06_Combat_tests.cairo")
+
+
 @pytest.fixture(scope="module")
-async def l06_combat_tests(starknet, xoroshiro) -> StarknetContract:
-    contract = compile("tests/pytest/settling_game/L06_Combat_tests.cairo")
+async def l06_combat_tests(starknet, xoroshiro, compiled_l06_combat_tests) -> StarknetContract:
+    contract = compiled_l06_combat_tests
     # a quirk of the testing framework, even though the L06_Combat_tests contract
     # doesn't have a constructor, it somehow calls (I guess) the constructor of
     # L06_Combat because it imports from it; hence when calling deploy, we need
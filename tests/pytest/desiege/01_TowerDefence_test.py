@@ -6,6 +6,8 @@ import logging
 from starkware.starknet.business_logic.state import BlockInfo
 from starkware.starkware_utils.error_handling import StarkException
 
+from realms_cli.realms_cli.event_indexer import EventIndexer, events_of_execution
+
 LOGGER = logging.getLogger(__name__)
 
 TOKEN_BASE_FACTOR = 10
@@ -15,6 +17,10 @@ DARK_TOKEN_ID_OFFSET = 2
 SHIELD_ROLE = 0
 ATTACK_ROLE = 1
 
+# ActionType of game_action events
+ACTION_ATTACK = 1
+ACTION_SHIELD = 2
+
 # Boost units are in basis points, so every value needs to be multiplied
 BOOST_UNIT_MULTIPLIER = 100
 
@@ -522,4 +528,54 @@ async def test_game_start_restrictions(game_factory):
             tower_defence.contract_address,
             "create_game",
             [ INITIAL_TOWER_HEALTH ]
-        )
\ No newline at end of file
+        )
+
+@pytest.mark.asyncio
+async def test_index_game_actions(game_factory):
+    starknet = game_factory.starknet
+    tower_defence = game_factory.tower_defence
+    elements_token = game_factory.elements_token
+
+    game_idx = 1
+    light_token_id = game_idx * TOKEN_BASE_FACTOR + LIGHT_TOKEN_ID_OFFSET
+    dark_token_id = game_idx * TOKEN_BASE_FACTOR + DARK_TOKEN_ID_OFFSET
+
+    starknet.state.state.block_info = BlockInfo(1, 123456789)
+    await game_factory.execute("admin", tower_defence.contract_address, "create_game", [INITIAL_TOWER_HEALTH])
+    await game_factory.execute(
+        "admin",
+        elements_token.contract_address,
+        "safeBatchTransferFrom",
+        [
+            game_factory.admin.contract_address,
+            game_factory.player1.contract_address,
+            2,
+            light_token_id, dark_token_id,
+            2,
+            100 * BOOST_UNIT_MULTIPLIER,
+            100 * BOOST_UNIT_MULTIPLIER
+        ]
+    )
+    await game_factory.execute("player1", elements_token.contract_address, "setApprovalForAll",
+                               [tower_defence.contract_address, 1])
+
+    shield = await game_factory.execute("player1", tower_defence.contract_address, "increase_shield",
+                                        [game_idx, light_token_id, 100 * BOOST_UNIT_MULTIPLIER])
+    starknet.state.state.block_info = BlockInfo(2, 123456800)
+    attack = await game_factory.execute("player1", tower_defence.contract_address, "attack_tower",
+                                        [game_idx, dark_token_id, 50 * BOOST_UNIT_MULTIPLIER])
+
+    indexer = EventIndexer(sources={tower_defence.contract_address: ["game_action"]})
+    try:
+        # the in-memory state has no transaction hashes, any unique ones do
+        events = events_of_execution(1, shield, 0xA, 123456789) + events_of_execution(2, attack, 0xB, 123456800)
+        # the token transfers of the elements contract are not tracked
+        assert indexer.ingest(events) == 2
+        rows = indexer.rows("game_actions", game_idx=game_idx)
+        assert [(r["token_id"], r["token_offset"], r["amount"], r["action_type"], r["block_number"]) for r in rows] == [
+            (light_token_id, LIGHT_TOKEN_ID_OFFSET, 100 * BOOST_UNIT_MULTIPLIER, ACTION_SHIELD, 1),
+            (dark_token_id, DARK_TOKEN_ID_OFFSET, 50 * BOOST_UNIT_MULTIPLIER, ACTION_ATTACK, 2),
+        ]
+        assert indexer.rows("game_actions", token_id=dark_token_id)[0]["tx_hash"] == "0xb"
+    finally:
+        indexer.close()
@@ -0,0 +1,89 @@
+import json
+import os
+import random
+
+import pytest
+
+from realms_cli.realms_cli.binary_converter import (
+    CryptPacker,
+    RealmPacker,
+    decimalToBinary,
+    map_crypt,
+    map_realm,
+    pack_bits,
+    pack_crypts,
+    pack_realms,
+)
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "data")
+
+
+def load(name):
+    with open(os.path.join(DATA, name)) as f:
+        return json.load(f)
+
+
+resources = load("resources.json")
+wonders = load("wonders.json")
+orders = load("orders.json")
+
+
+def realm_of(packed):
+    """Realm metadata that map_realm packs back into `packed`."""
+    meta = list(packed.to_bytes(16, "little"))
+    traits = [("Regions", meta[0]), ("Cities", meta[1]), ("Harbors", meta[2]), ("Rivers", meta[3])]
+    count = meta[4]
+    ids = meta[5:5 + max(count, 7)][:count]
+    wonder, order = meta[5 + max(count, 7):7 + max(count, 7)]
+    attributes = [{"trait_type": t, "value": v} for t, v in traits]
+    names = {r["id"]: r["trait"] for r in resources}
+    attributes += [{"trait_type": "Resource", "value": names[i]} for i in reversed(ids)]
+    if wonder:
+        attributes.append({"trait_type": "Wonder (translated)", "value": wonders[wonder - 1]["trait"]})
+    name = next(o["name"] for o in orders if o["id"] == order)
+    attributes.append({"trait_type": "Order", "value": f"The Order of {name}"})
+    return {"attributes": attributes}
+
+
+@pytest.mark.parametrize("chunksize", [6, 8, 12])
+def test_pack_bits_matches_decimal_to_binary(chunksize):
+    rng = random.Random(chunksize)
+    for _ in range(500):
+        values = [rng.choice([0, 1, rng.randrange(2 ** chunksize), rng.randrange(2 ** 20)])
+                  for _ in range(rng.randrange(1, 16))]
+        assert pack_bits(values, chunksize) == decimalToBinary(values, chunksize)
+
+
+def test_pack_realms_matches_map_realm():
+    stored = load("realms_bit.json")[:500]
+    realms = {id: realm_of(packed) for entry in stored for id, packed in entry.items()}
+    expected = [{id: map_realm(realm, resources, wonders, orders)} for id, realm in realms.items()]
+    assert pack_realms(realms, resources, wonders, orders) == expected
+    # realms_bit.json is what map_realm packs, resource ids sorted
+    assert expected == stored
+
+
+def test_packer_keeps_map_realm_quirks():
+    realm = {"attributes": [
+        {"trait_type": "Cities", "value": 300},
+        {"trait_type": "Resource", "value": "Gold"},
+        {"trait_type": "Resource", "value": "Wood"},
+        {"trait_type": "Resource", "value": "Unknown"},
+        {"trait_type": "Wonder (translated)", "value": wonders[3]["trait"]},
+        {"trait_type": "Order", "value": "The Order of the Twins"},
+    ]}
+    packer = RealmPacker(resources, wonders, orders)
+    assert packer.meta(realm) == [300, 2, 1, 9, 0, 0, 0, 0, 0, 4, 16]
+    assert packer.pack(realm) == map_realm(realm, resources, wonders, orders)
+
+
+def test_crypt_packer_matches_map_crypt():
+    crypts = load("crypts.json")
+    environments = load("crypts_environments.json")
+    affinities = load("crypts_affinities.json")
+    packer = CryptPacker(environments, affinities)
+    with_metadata = {id: crypt for id, crypt in crypts.items() if crypt is not None}
+    for id, crypt in list(with_metadata.items())[::7]:
+        assert packer.pack(crypt) == map_crypt(crypt, environments, affinities)
+    packed = dict(pack_crypts(crypts.items(), environments, affinities))
+    assert list(packed) == list(with_metadata)
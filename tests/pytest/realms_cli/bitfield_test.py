@@ -0,0 +1,135 @@
+import random
+import struct
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from realms_cli.realms_cli.binary_converter import decimalToBinary
+from realms_cli.realms_cli.bitfield import (
+    CRYPT,
+    FOOD_BUILDINGS,
+    REALM,
+    SQUAD,
+    TROOP,
+    Schema,
+    pack_cost,
+    signed_bytes,
+    unpack_cost,
+)
+
+RUNS = 300
+
+# as in tests/pytest/settling_game/game_structs.py
+Troop = namedtuple('Troop', 'id type tier building agility attack defense vitality wisdom')
+Squad = namedtuple(
+    'Squad',
+    't1_1 t1_2 t1_3 t1_4 t1_5 t1_6 t1_7 t1_8 t1_9 t2_1 t2_2 t2_3 t2_4 t2_5 t3_1',
+)
+
+
+# the encoders the codec replaces, as they were written
+def struct_pack_values(values):
+    return int.from_bytes(struct.pack(f"<{len(values)}b", *values), "little")
+
+
+def struct_pack_troop(troop):
+    return int.from_bytes(struct.pack("<2b", *[troop.id, troop.vitality]), "little")
+
+
+def shift_pack_squad(squad):
+    return sum(struct_pack_troop(troop) * 0x100 ** (2 * i) for i, troop in enumerate(squad))
+
+
+def shift_pack_food_buildings(number_built, collections_left, update_time):
+    return number_built + collections_left * 2 ** 41 + update_time * 2 ** 82
+
+
+def random_troop(rng):
+    return Troop(rng.randrange(13), rng.randrange(5), rng.randrange(4), rng.randrange(21),
+                 rng.randrange(10), rng.randrange(10), rng.randrange(10), rng.randrange(128),
+                 rng.randrange(10))
+
+
+@pytest.mark.parametrize("schema,chunksize", [(REALM, 8), (CRYPT, 6)])
+def test_metadata_matches_decimal_to_binary(schema, chunksize):
+    rng = random.Random(schema.name)
+    for _ in range(RUNS):
+        values = [rng.randrange(2 ** chunksize) for _ in schema.names]
+        packed = schema.pack(values)
+        assert packed == decimalToBinary(values, chunksize)
+        assert list(schema.unpack(packed)) == values
+
+
+def test_signed_bytes_match_pack_values():
+    rng = random.Random(1)
+    for _ in range(RUNS):
+        values = [rng.randrange(-128, 128) for _ in range(rng.randrange(0, 20))]
+        packed = signed_bytes(len(values)).pack(values)
+        assert packed == struct_pack_values(values)
+        assert list(signed_bytes(len(values)).unpack(packed)) == values
+
+
+def test_costs_round_trip():
+    rng = random.Random(2)
+    for _ in range(RUNS):
+        ids = [rng.randrange(1, 23) for _ in range(rng.randrange(1, 8))]
+        amounts = [rng.randrange(0, 128) for _ in ids]
+        cost = pack_cost(ids, amounts)
+        assert cost == (len(ids), 8, struct_pack_values(ids), struct_pack_values(amounts))
+        assert unpack_cost(cost) == (ids, amounts)
+
+
+def test_squads_match_shift_packing():
+    rng = random.Random(3)
+    for _ in range(RUNS):
+        squad = Squad(*[random_troop(rng) for _ in range(15)])
+        packed = SQUAD.pack(squad)
+        assert packed == shift_pack_squad(squad)
+        assert TROOP.pack(squad.t2_3) == struct_pack_troop(squad.t2_3)
+        unpacked = SQUAD.unpack(packed)
+        assert [(t.id, t.vitality) for t in unpacked] == [(t.id, t.vitality) for t in squad]
+
+
+def test_food_buildings_match_shift_41():
+    rng = random.Random(4)
+    for _ in range(RUNS):
+        values = [rng.randrange(2 ** 41) for _ in range(3)]
+        packed = FOOD_BUILDINGS.pack(values)
+        assert packed == shift_pack_food_buildings(*values)
+        assert list(FOOD_BUILDINGS.unpack(packed)) == values
+
+
+@pytest.mark.parametrize("schema", [REALM, CRYPT, FOOD_BUILDINGS, signed_bytes(7)])
+def test_columns_round_trip(schema):
+    rng = random.Random(schema.name)
+    low = -128 if schema.signed else 0
+    rows = [[rng.randrange(low, low + 2 ** bits) for _, _, bits, _ in schema.fields] for _ in range(200)]
+    packed = schema.pack_many(rows)
+    assert [list(record) for record in schema.unpack_many(packed)] == rows
+
+    columns = schema.unpack_columns(packed)
+    assert schema.pack_columns(columns) == packed
+    arrays = schema.unpack_columns(np.array(packed, dtype=np.uint64 if schema.bits <= 64 else object))
+    assert [[int(arrays[name][i]) for name in schema.names] for i in range(len(rows))] == rows
+    assert [int(p) for p in schema.pack_columns(arrays)] == packed
+
+
+def test_out_of_range_values_raise():
+    with pytest.raises(ValueError):
+        CRYPT.pack([64, 0, 0, 0, 0, 0, 0])
+    with pytest.raises(ValueError):
+        REALM.pack([-1] + [0] * 13)
+    with pytest.raises(ValueError):
+        signed_bytes(1).pack([128])
+    with pytest.raises(ValueError):
+        CRYPT.pack([1, 2])
+    with pytest.raises(ValueError):
+        CRYPT.pack_columns({name: np.array([64]) for name in CRYPT.names})
+    # bits above the layout are ignored, like unpack_data
+    assert CRYPT.unpack(CRYPT.pack([1] * 7) | 1 << 42) == CRYPT.unpack(CRYPT.pack([1] * 7))
+
+
+def test_mapping_and_attribute_values():
+    schema = Schema("Pair", [("low", 4), ("high", 4)])
+    assert schema.pack({"high": 1, "low": 2}) == schema.pack(schema.record(low=2, high=1)) == 0x12
@@ -0,0 +1,88 @@
+import random
+
+from nile.signer import from_call_to_call_array
+from starkware.starknet.public.abi import get_selector_from_name
+
+from realms_cli.realms_cli import shared, utils
+from realms_cli.realms_cli.calldata import Calldata, CalldataReader, encode_uint256s, to_int
+
+
+def legacy_expanded_uint_list(arr):
+    return list(sum([(a, 0) for a in arr], ()))
+
+
+def test_matches_legacy_encoding():
+    values = list(range(1, 31))
+    assert encode_uint256s(values) == legacy_expanded_uint_list(values)
+    assert encode_uint256s(["1", "0x2", 3]) == [1, 0, 2, 0, 3, 0]
+    assert encode_uint256s(["2"], scale=10 ** 18) == [2 * 10 ** 18, 0]
+    assert encode_uint256s([2 ** 130 + 5]) == [5, 4]
+
+
+def legacy_expanded_uint_list_decimals(arr):
+    return list(sum([(int(a) * 10 ** 18, 0) for a in arr], ()))
+
+
+def test_decimals_truncate_floats_like_before():
+    values = [2.7, 1.0, 0.5, 3, "4"]
+    expected = legacy_expanded_uint_list_decimals(values)
+    assert expected[:2] == [2 * 10 ** 18, 0]
+    assert shared.expanded_uint_list_decimals(values) == expected
+    assert utils.expanded_uint_list_decimals(values) == expected
+
+
+def test_buy_tokens_layout():
+    data = (
+        Calldata(capacity=1)
+        .uint256("3", scale=10 ** 18)
+        .uint256_array(["1", "2"])
+        .uint256_array(["10", "20"], scale=10 ** 18)
+        .felt(1234)
+        .to_list()
+    )
+    assert data == [
+        3 * 10 ** 18, 0,
+        2, 1, 0, 2, 0,
+        2, 10 * 10 ** 18, 0, 20 * 10 ** 18, 0,
+        1234,
+    ]
+
+
+def test_round_trip():
+    rng = random.Random(0x10AF)
+    felts = [rng.getrandbits(251) for _ in range(50)]
+    uints = [rng.getrandbits(256) for _ in range(50)]
+
+    data = Calldata().felt(7).array(felts).uint256_array(uints).uint256(2 ** 255).to_list()
+    reader = CalldataReader(data)
+    assert reader.felt() == 7
+    assert reader.array() == felts
+    assert reader.uint256_array() == uints
+    assert reader.uint256() == 2 ** 255
+    assert reader.remaining() == 0
+
+
+def test_call_array_matches_nile():
+    calls = [
+        ["0x123", "claim_resources", [1, 0]],
+        ["0x456", "build", [5, 0, 3]],
+        ["0x123", "settle", []],
+    ]
+    call_array, calldata = from_call_to_call_array(calls)
+    expected = [len(call_array), *[x for t in call_array for x in t], len(calldata), *calldata]
+
+    data = Calldata().call_array(
+        (to, get_selector_from_name(function), args) for to, function, args in calls
+    ).to_list()
+    assert data == expected
+    assert Calldata().struct_array(call_array).array(calldata).to_list() == expected
+
+    decoded = CalldataReader(data).call_array()
+    assert decoded == [
+        (int(to, 16), get_selector_from_name(function), args) for to, function, args in calls
+    ]
+
+
+def test_to_int():
+    # the felt parser of the gateway, read cache and event indexer too
+    assert [to_int(v) for v in [7, "7", " 0x7 ", "-0x7", "-7", 7.9]] == [7, 7, 7, -7, -7, 7]
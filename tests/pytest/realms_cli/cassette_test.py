@@ -0,0 +1,117 @@
+import pytest
+
+from realms_cli.realms_cli.cassette import Cassette, CassetteMiss
+from realms_cli.realms_cli.gateway import GatewayClient, GatewayError
+
+CONTRACT = 0x123
+
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+
+class Session:
+    """Stands in for requests.Session, answers tx statuses in sequence."""
+
+    def __init__(self):
+        self.statuses = iter(["RECEIVED", "PENDING", "ACCEPTED_ON_L2"])
+        self.requests = 0
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None):
+        self.requests += 1
+        if url.endswith("call_contract"):
+            if '"calldata": ["0"]' in data:
+                return Response(500, "StarknetErrorCode.TRANSACTION_FAILED")
+            return Response(200, {"result": ["0x2a", "0x0"]})
+        return Response(200, {"tx_status": next(self.statuses)})
+
+    def close(self):
+        pass
+
+
+class Offline:
+    def request(self, *args, **kwargs):
+        raise AssertionError("replay went to the network")
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = str(tmp_path / "goerli.cassette")
+    client = GatewayClient("http://gateway", cassette=Cassette(path, "record"))
+    client.session = Session()
+    assert client.call_contract(CONTRACT, "balanceOf", [1]) == [42, 0]
+    with pytest.raises(GatewayError):
+        client.call_contract(CONTRACT, "balanceOf", [0])
+    for _ in range(3):
+        client.get_transaction_status("0x5f3a")
+    client.cassette.close()
+    return path
+
+
+def test_replay(recorded):
+    cassette = Cassette(recorded)
+    assert len(cassette) == 5
+    client = GatewayClient("http://gateway", cassette=cassette)
+    client.session = Offline()
+
+    assert client.call_contract(CONTRACT, "balanceOf", [1]) == [42, 0]
+    with pytest.raises(GatewayError) as err:
+        client.call_contract(CONTRACT, "balanceOf", [0])
+    assert err.value.status == 500
+    statuses = [client.get_transaction_status("0x5f3a")["tx_status"] for _ in range(4)]
+    assert statuses == ["RECEIVED", "PENDING", "ACCEPTED_ON_L2", "ACCEPTED_ON_L2"]
+    assert cassette.served == 6
+
+    with pytest.raises(CassetteMiss):
+        client.call_contract(CONTRACT, "balanceOf", [2])
+
+
+def test_truncated_recording(recorded):
+    with open(recorded, "rb") as fp:
+        data = fp.read()
+    with open(recorded, "wb") as fp:
+        fp.write(data[:-3])
+    # the interrupted last record is dropped, the rest still replays
+    assert len(Cassette(recorded)) == 4
+
+
+def test_record_appends(recorded):
+    # a second command of the same session
+    cassette = Cassette(recorded, "record")
+    assert len(cassette) == 5
+    client = GatewayClient("http://gateway", cassette=cassette)
+    client.session = Session()
+    client.call_contract(CONTRACT, "balanceOf", [2])
+    cassette.close()
+
+    client = GatewayClient("http://gateway", cassette=Cassette(recorded))
+    client.session = Offline()
+    assert client.call_contract(CONTRACT, "balanceOf", [1]) == [42, 0]
+    assert client.call_contract(CONTRACT, "balanceOf", [2]) == [42, 0]
+    assert len(client.cassette) == 6
+
+
+def test_record_drops_interrupted_record(recorded):
+    with open(recorded, "rb") as fp:
+        data = fp.read()
+    with open(recorded, "wb") as fp:
+        fp.write(data[:-3])
+    cassette = Cassette(recorded, "record")
+    cassette.record(Cassette.key("GET", "get_block"), 200, {"block_number": 7})
+    cassette.close()
+    cassette = Cassette(recorded)
+    assert len(cassette) == 5
+    assert cassette.play(Cassette.key("GET", "get_block")) == (200, {"block_number": 7})
+
+
+def test_record_rejects_foreign_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("not a cassette")
+    with pytest.raises(ValueError):
+        Cassette(str(path), "record")
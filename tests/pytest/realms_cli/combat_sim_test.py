@@ -0,0 +1,146 @@
+import random
+
+import numpy as np
+import pytest
+
+from realms_cli.realms_cli.combat_sim import (
+    COMBAT_OUTCOME_ATTACKER_WINS,
+    COMBAT_OUTCOME_DEFENDER_WINS,
+    TROOP_PROPS,
+    build_squad,
+    pack_squads,
+    run_battles,
+    simulate,
+    unpack_squads,
+)
+
+PIKEMAN, KNIGHT, PALADIN = 4, 5, 6
+DEFAULT_SQUAD = [PIKEMAN] * 9 + [KNIGHT] * 5 + [PALADIN]
+
+
+# library_combat and run_combat_loop one troop at a time, as they are written
+def troop(id, vitality):
+    _, agility, attack, armor, _, wisdom = TROOP_PROPS[id].tolist()
+    return {"id": id, "agility": agility, "attack": attack, "armor": armor, "vitality": vitality,
+            "wisdom": wisdom}
+
+
+def get_first_vital_troop(squad):
+    for idx, t in enumerate(squad):
+        if t["vitality"] != 0:
+            return t, idx
+    return troop(0, 0), 0
+
+
+def calculate_hit_points(a, d, dice_roll):
+    h = (a["agility"] - d["agility"]) + a["attack"] * (dice_roll - d["armor"]) - (d["wisdom"] - a["wisdom"])
+    return h if h >= 0 else 0
+
+
+def hit_troop(t, hits):
+    if hits == 0:
+        return t
+    if t["vitality"] <= hits:
+        return troop(0, 0)
+    return dict(t, vitality=t["vitality"] - hits)
+
+
+def attack(a, d, draws):
+    attacker, _ = get_first_vital_troop(a)
+    defender, d_index = get_first_vital_troop(d)
+    dice_roll = next(draws) % 12 + 1
+    hits = calculate_hit_points(attacker, defender, dice_roll)
+    return d[:d_index] + [hit_troop(d[d_index], hits)] + d[d_index + 1:]
+
+
+def run_combat_loop(attacker, defender, draws):
+    while True:
+        defender = attack(attacker, defender, draws)
+        if sum(t["vitality"] for t in defender) == 0:
+            return attacker, defender, COMBAT_OUTCOME_ATTACKER_WINS
+        attacker = attack(defender, attacker, draws)
+        if sum(t["vitality"] for t in attacker) == 0:
+            return attacker, defender, COMBAT_OUTCOME_DEFENDER_WINS
+
+
+def unpack(packed):
+    return [troop((packed >> (16 * i)) & 0xFF, (packed >> (16 * i + 8)) & 0xFF) for i in range(15)]
+
+
+def pack(squad):
+    return sum((t["id"] + t["vitality"] * 0x100) << (16 * i) for i, t in enumerate(squad))
+
+
+def random_squad(rng):
+    squad = 0
+    for slot in range(15):
+        if rng.random() < 0.7:
+            id = rng.randrange(1, 13)
+            squad |= (id + rng.randrange(0, 256) * 0x100) << (16 * slot)
+    return squad
+
+
+def test_battles_match_the_contract_rules():
+    rng = random.Random(23)
+    for seed in range(200):
+        attacker, defender = random_squad(rng), random_squad(rng)
+        if not unpack_squads(attacker)[1].any() and not unpack_squads(defender)[1].any():
+            continue
+        draws = iter(np.random.PCG64(seed).random_raw(10000).tolist())
+        a_end, d_end, outcome = run_combat_loop(unpack(attacker), unpack(defender), draws)
+        battles = run_battles(unpack_squads(attacker), unpack_squads(defender), np.random.PCG64(seed))
+        assert battles.outcome[0] == outcome
+        assert battles.packed() == ([pack(a_end)], [pack(d_end)])
+
+
+def test_squads_round_trip():
+    squad = build_squad(DEFAULT_SQUAD)
+    ids, vitality = unpack_squads([squad, 0])
+    assert ids[0].tolist() == DEFAULT_SQUAD and vitality[0].tolist() == [53] * 9 + [79] * 5 + [106]
+    assert pack_squads(ids, vitality) == [squad, 0]
+    assert build_squad([PALADIN, PIKEMAN]) == build_squad([PIKEMAN, PALADIN])
+    with pytest.raises(ValueError):
+        build_squad([PALADIN, PALADIN])
+    with pytest.raises(ValueError):
+        unpack_squads(13)
+
+
+def test_outcome_distribution():
+    strong, weak = build_squad(DEFAULT_SQUAD), build_squad(DEFAULT_SQUAD[:7])
+    battles = simulate(strong, weak, battles=2000, seed=1)
+    summary = battles.summary()
+    assert summary["attacker_wins"] > 0.9
+    assert summary["attacker_wins"] + summary["defender_wins"] + summary["undecided"] == 1
+    assert summary["expected_defender_troops_lost"] > 6
+    assert sum(summary["defender_survivors"]) == pytest.approx(1)
+    # the loser always ends without vitality, the winner never does
+    (_, a_vit), (_, d_vit) = battles.attacker_end, battles.defender_end
+    attacker_won = battles.outcome == COMBAT_OUTCOME_ATTACKER_WINS
+    assert (d_vit[attacker_won].sum(axis=1) == 0).all() and (a_vit[attacker_won].sum(axis=1) > 0).all()
+
+    even = simulate(strong, strong, battles=2000, seed=1).summary()
+    assert 0.4 < even["attacker_wins"] < 0.6
+    hungry = simulate(strong, strong, battles=2000, seed=1, attacker_hungry=True).summary()
+    assert hungry["attacker_wins"] < 0.1
+    assert simulate(strong, weak, battles=10, seed=7).packed() == simulate(strong, weak, battles=10, seed=7).packed()
+
+
+def test_stalemate_is_undecided():
+    # a defender without vitality loses on the first attack, like in run_combat_loop
+    battles = simulate(build_squad([PIKEMAN]), 0, battles=3, seed=1, max_steps=10)
+    assert battles.outcome.tolist() == [COMBAT_OUTCOME_ATTACKER_WINS] * 3
+    assert battles.steps.tolist() == [1] * 3
+    # pikemen never hit each other on a roll of 1
+    pikeman = PIKEMAN + 200 * 0x100
+    battles = run_battles(unpack_squads([pikeman]), unpack_squads([pikeman]), _Rolls(1), max_steps=50)
+    assert battles.outcome.tolist() == [0] and battles.steps.tolist() == [50]
+
+
+class _Rolls:
+    """Raw values that all roll `roll`."""
+
+    def __init__(self, roll):
+        self.roll = roll
+
+    def random_raw(self, size):
+        return np.full(size, self.roll - 1, dtype=np.uint64)
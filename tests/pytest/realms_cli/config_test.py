@@ -0,0 +1,63 @@
+import copy
+
+import pytest
+
+from realms_cli import config as configs
+from realms_cli import registry
+from realms_cli.config import Config
+
+DEPLOYMENTS = """0x01:artifacts/abis/Realms.json:realms
+0x02:artifacts/abis/PROXY_Logic.json:proxy_realms
+0x03:artifacts/abis/Account.json:account-0
+"""
+
+
+@pytest.fixture
+def lookups(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry._indexes.clear()
+    # nile writes localhost deployments as 127.0.0.1
+    (tmp_path / "127.0.0.1.deployments.txt").write_text(DEPLOYMENTS)
+    lookups = []
+    load = registry.deployment
+
+    def deployment(alias, network):
+        lookups.append((alias, network))
+        return load(alias, network)
+
+    monkeypatch.setattr(configs.registry, "deployment", deployment)
+    return lookups
+
+
+def test_aliases_resolve_on_first_access(lookups):
+    config = Config("localhost")
+    assert lookups == []
+    assert config.REALMS_PROXY_ADDRESS == "0x02"
+    assert config.ADMIN_ADDRESS == "0x03"
+    assert lookups == [("proxy_realms", "127.0.0.1"), ("account-0", "127.0.0.1")]
+
+
+def test_aliases_are_memoized(lookups):
+    config = Config("localhost")
+    assert config.REALMS_ADDRESS == "0x01"
+    assert config.REALMS_ADDRESS == "0x01"
+    # missing deployments are remembered as None too
+    assert config.LORDS_ADDRESS is None
+    assert config.LORDS_ADDRESS is None
+    assert lookups == [("realms", "127.0.0.1"), ("lords", "127.0.0.1")]
+    assert config.__dict__["REALMS_ADDRESS"] == "0x01"
+
+
+def test_unknown_attributes_raise(lookups):
+    config = Config("localhost")
+    with pytest.raises(AttributeError):
+        config.NOT_AN_ADDRESS
+    assert not hasattr(config, "REALMS_ADDRESS_2")
+    assert lookups == []
+
+
+def test_copies_before_init(lookups):
+    config = Config("localhost")
+    # copy builds the instance without __init__, its lookups must not recurse
+    assert copy.copy(config).REALMS_ADDRESS == "0x01"
+    assert copy.deepcopy(config).nile_network == "127.0.0.1"
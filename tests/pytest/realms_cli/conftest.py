@@ -0,0 +1,28 @@
+import importlib
+import importlib.abc
+import importlib.util
+import sys
+
+
+class InstalledLayout(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Imports `realms_cli.<module>` as the `realms_cli.realms_cli.<module>` the tests use.
+
+    The modules import each other as the installed package does; from the repo
+    root `realms_cli` is the project directory, so those names are mapped to
+    the same module objects instead of loading a second copy.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        package, _, module = fullname.partition(".")
+        if package == "realms_cli" and module and module.split(".")[0] != "realms_cli":
+            return importlib.util.spec_from_loader(fullname, self)
+        return None
+
+    def create_module(self, spec):
+        return importlib.import_module("realms_cli.realms_cli." + spec.name.partition(".")[2])
+
+    def exec_module(self, module):
+        pass
+
+
+sys.meta_path.append(InstalledLayout())
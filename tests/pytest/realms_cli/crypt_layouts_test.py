@@ -0,0 +1,115 @@
+import json
+import os
+import random
+from collections import deque
+
+import numpy as np
+
+from realms_cli.realms_cli.crypt_layouts import (
+    MAX_SIZE,
+    build,
+    decode,
+    label_components,
+    load_layouts,
+)
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "data")
+
+
+def bfs_components(grid):
+    """Sizes of the 4-connected floor components, largest first."""
+    height, width = grid.shape
+    seen = np.zeros_like(grid)
+    sizes = []
+    for y in range(height):
+        for x in range(width):
+            if not grid[y, x] or seen[y, x]:
+                continue
+            seen[y, x] = True
+            queue, size = deque([(y, x)]), 0
+            while queue:
+                cy, cx = queue.popleft()
+                size += 1
+                for ny, nx in ((cy + 1, cx), (cy - 1, cx), (cy, cx + 1), (cy, cx - 1)):
+                    if 0 <= ny < height and 0 <= nx < width and grid[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        queue.append((ny, nx))
+            sizes.append(size)
+    return sorted(sizes, reverse=True)
+
+
+def load_crypts():
+    with open(os.path.join(DATA, "crypts.json")) as f:
+        return json.load(f)
+
+
+def test_decodes_crypt_1():
+    crypt = load_crypts()["1"]
+    grid = decode([crypt["layout"]], [crypt["size"]])[0]
+    assert grid.shape == (MAX_SIZE, MAX_SIZE)
+    assert grid[:8, :8].astype(int).tolist() == [
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 1, 0, 0, 0, 0, 0],
+        [0, 1, 1, 1, 1, 1, 0, 0],
+        [0, 1, 1, 0, 1, 1, 0, 0],
+        [0, 1, 1, 0, 1, 1, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ]
+    assert not grid[8:].any() and not grid[:, 8:].any()
+
+
+def test_grids_encode_back_to_layouts():
+    crypts = {id: crypt for id, crypt in load_crypts().items() if crypt is not None}
+    layouts = build(crypts)
+    for id in layouts.ids[::7]:
+        crypt = crypts[str(id)]
+        bits = "".join("1" if floor else "0" for floor in layouts.grid(id).ravel())
+        width = 4 * (len(crypt["layout"]) - 2)
+        assert int(bits.ljust(width, "0"), 2) == int(crypt["layout"], 16)
+
+
+def test_components_match_bfs():
+    crypts = {id: crypt for id, crypt in load_crypts().items() if crypt is not None}
+    subset = dict(random.Random(21).sample(sorted(crypts.items()), 300))
+    layouts = build(subset)
+    for row, id in enumerate(layouts.ids):
+        grid = layouts.grid(id)
+        expected = bfs_components(grid)
+        assert layouts.stats["floor"][row] == grid.sum()
+        assert layouts.stats["components"][row] == len(expected)
+        assert layouts.stats["largest_component"][row] == (expected[0] if expected else 0)
+        floor = sum(expected)
+        reachability = sum(size ** 2 for size in expected) / floor ** 2 if floor else 0.0
+        assert np.isclose(layouts.stats["door_reachability"][row], reachability)
+
+
+def test_labels_random_grids():
+    rng = np.random.default_rng(21)
+    grids = rng.random((200, 12, 12)) < 0.6
+    labels = label_components(grids)
+    for grid, grid_labels in zip(grids, labels):
+        assert (grid_labels[~grid] == -1).all()
+        _, counts = np.unique(grid_labels[grid], return_counts=True)
+        assert sorted(counts, reverse=True) == bfs_components(grid)
+
+
+def test_cache_round_trip(tmp_path):
+    crypts = load_crypts()
+    subset = {id: crypts[id] for id in list(crypts)[:50]}
+    src = tmp_path / "crypts.json"
+    src.write_text(json.dumps(subset))
+    cache = str(tmp_path / "layouts.npz")
+
+    built = load_layouts(str(src), cache)
+    cached = load_layouts(str(src), cache)
+    assert np.array_equal(built.ids, cached.ids)
+    assert np.array_equal(built.packed, cached.packed)
+    for name, values in built.stats.items():
+        assert np.array_equal(values, cached.stats[name])
+    assert cached.row(1) == built.row(1)
+
+    subset.pop("1")
+    src.write_text(json.dumps(subset))
+    assert 1 not in load_layouts(str(src), cache).ids
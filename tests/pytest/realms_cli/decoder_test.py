@@ -0,0 +1,92 @@
+import pytest
+
+from realms_cli.realms_cli.decoder import ArrayView, Decoder, Uint256
+
+TROOP_MEMBERS = ["id", "type", "tier", "building", "agility", "attack", "armor", "vitality", "wisdom"]
+SQUAD_SLOTS = [f"t1_{i}" for i in range(1, 10)] + [f"t2_{i}" for i in range(1, 6)] + ["t3_1"]
+
+
+def struct(name, members):
+    offset, entries = 0, []
+    for member, type_, size in members:
+        entries.append({"name": member, "offset": offset, "type": type_})
+        offset += size
+    return {"type": "struct", "name": name, "size": offset, "members": entries}
+
+
+def function(name, outputs):
+    return {
+        "type": "function",
+        "name": name,
+        "inputs": [],
+        "outputs": [{"name": n, "type": t} for n, t in outputs],
+        "stateMutability": "view",
+    }
+
+
+ABI = [
+    struct("Uint256", [("low", "felt", 1), ("high", "felt", 1)]),
+    struct("Troop", [(m, "felt", 1) for m in TROOP_MEMBERS]),
+    struct("Squad", [(slot, "Troop", 9) for slot in SQUAD_SLOTS]),
+    struct("RealmData", [(m, "felt", 1) for m in [
+        "regions", "cities", "harbours", "rivers", "resource_number",
+        "resource_1", "resource_2", "resource_3", "resource_4", "resource_5",
+        "resource_6", "resource_7", "wonder", "order"]]),
+    function("balanceOf", [("balance", "Uint256")]),
+    function("balanceOfBatch", [("balances_len", "felt"), ("balances", "Uint256*")]),
+    function("get_realm_data", [("realm_data", "RealmData")]),
+    function("get_squad", [("squad", "Squad"), ("stats", "(attack: felt, armor: felt)")]),
+    function("get_troops", [("troops_len", "felt"), ("troops", "Troop*"), ("ids_len", "felt"), ("ids", "felt*")]),
+]
+
+
+@pytest.fixture
+def decoder():
+    return Decoder(ABI)
+
+
+def test_uint256(decoder):
+    out = decoder.decode("balanceOf", [5, 1])
+    assert out.balance == Uint256(5, 1)
+    assert out.balance.value == 5 + (1 << 128)
+    assert int(out.balance) == out.balance.value
+
+
+def test_uint256_array(decoder):
+    felts = [3, 10, 0, 20, 0, 30, 1]
+    out = decoder.decode("balanceOfBatch", felts)
+    assert out.balances_len == 3
+    assert isinstance(out.balances, ArrayView)
+    assert [b.value for b in out.balances] == [10, 20, 30 + (1 << 128)]
+    assert out.balances[-1].low == 30
+    assert out.balances[1:] == [Uint256(20, 0), Uint256(30, 1)]
+    with pytest.raises(IndexError):
+        out.balances[3]
+
+
+def test_structs(decoder):
+    realm = decoder.decode("get_realm_data", list(range(14))).realm_data
+    assert realm.regions == 0 and realm.order == 13
+    assert type(realm).__name__ == "RealmData"
+
+    troops = [[slot] + [slot * 10 + i for i in range(8)] for slot in range(15)]
+    out = decoder.decode("get_squad", [f for troop in troops for f in troop] + [7, 8])
+    assert out.squad.t1_1.id == 0
+    assert out.squad.t3_1.id == 14
+    assert out.squad.t2_5.vitality == 13 * 10 + 6
+    assert out.stats == (7, 8)
+
+
+def test_struct_and_felt_arrays(decoder):
+    felts = [2] + list(range(9)) + list(range(100, 109)) + [3, 7, 8, 9]
+    out = decoder.decode("get_troops", felts)
+    assert [t.id for t in out.troops] == [0, 100]
+    assert out.troops[1].wisdom == 108
+    assert list(out.ids) == [7, 8, 9]
+
+
+def test_length_mismatch(decoder):
+    with pytest.raises(ValueError):
+        decoder.decode("balanceOf", [1, 0, 0])
+    with pytest.raises(KeyError):
+        decoder.decode("ownerOf", [1])
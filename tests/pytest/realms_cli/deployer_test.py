@@ -0,0 +1,53 @@
+import pytest
+
+from realms_cli import deployer
+from realms_cli.caller_invoker import parse_declare
+
+NILE_DECLARE = """🚀 Declaring Settling
+⏳ Declaration of Settling successfully sent at 0x5c1d7e0a3b
+🧾 Transaction hash: 0x2f4b6a"""
+
+DEPLOY = """Deploy transaction was sent.
+Contract address: 0x{address:064x}
+Transaction hash: 0x{tx:x}"""
+
+
+class Nre:
+    network = "goerli"
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    monkeypatch.setattr(deployer, "_pending_deploys", [])
+    waited = []
+
+    def wait_for_txs(network, tx_hashes):
+        waited.append(list(tx_hashes))
+        return [{"tx_status": "ACCEPTED_ON_L2"} for _ in tx_hashes]
+
+    deploys = iter(range(1, 100))
+
+    def deploy(network, alias, arguments=None, contract_name=None):
+        n = next(deploys)
+        return DEPLOY.format(address=n, tx=0x100 + n)
+
+    monkeypatch.setattr(deployer, "wait_for_txs", wait_for_txs)
+    monkeypatch.setattr(deployer, "deploy", deploy)
+    monkeypatch.setattr(deployer, "declare", lambda contract_name, alias, network: NILE_DECLARE)
+    return waited
+
+
+def test_parse_declare():
+    assert parse_declare(NILE_DECLARE) == "0x2f4b6a"
+    # declared in-process, there is nothing to wait for
+    assert parse_declare("Contract class hash: 0x5c1d7e0a3b") is None
+
+
+def test_waits_for_declares_and_deploys(sent):
+    nre = Nre()
+    deployer.logged_deploy(nre, "Settling", alias="Settling", arguments=[])
+    deployer.logged_declare(nre, "Settling", "Settling")
+    deployer.logged_deploy(nre, "PROXY_Logic", alias="proxy_Settling", arguments=[])
+    assert len(deployer.wait_for_deploys(nre)) == 3
+    assert sent == [["0x101", "0x2f4b6a", "0x102"]]
+    assert deployer.wait_for_deploys(nre) == []
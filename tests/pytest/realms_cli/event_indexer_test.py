@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from starkware.starknet.public.abi import get_selector_from_name
+
+from realms_cli.realms_cli.binary_converter import map_realm
+from realms_cli.realms_cli.event_indexer import EventIndexer, RawEvent, events_of_execution
+
+SETTLING = 0x111
+MARKETPLACE = 0x222
+OWNER = 0x3A1B2C
+PRICE = 10 * 10 ** 18
+
+# not used by the settling tests sharing the session deployment
+TOKEN_ID = (5042, 0)
+
+
+def event(name, data, from_address=SETTLING):
+    return {"from_address": hex(from_address), "keys": [hex(get_selector_from_name(name))],
+            "data": [hex(felt) for felt in data]}
+
+
+def block(number, *transactions):
+    return {
+        "block_number": number,
+        "timestamp": 1000 + number,
+        "transaction_receipts": [
+            {"transaction_hash": hex(number * 100 + i), "events": events}
+            for i, events in enumerate(transactions)
+        ],
+    }
+
+
+class Serial:
+    def run(self, fn, rows):
+        return [fn(row) for row in rows]
+
+
+@pytest.fixture
+def indexer():
+    indexer = EventIndexer(sources={
+        SETTLING: ["Settled", "UnSettled", "VaultTime", "ClaimTime"],
+        MARKETPLACE: ["TradeAction"],
+    })
+    yield indexer
+    indexer.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('account_factory', [dict(num_signers=2)], indirect=True)
+async def test_index_settling(game_factory):
+    admin_account, _, starknet, _, signers, _, _, settling_logic, realms, *_ = game_factory
+    admin = signers[0]
+    realms_data = json.load(open('data/realms.json'))
+    meta = [json.load(open(f'data/{name}.json')) for name in ('resources', 'wonders', 'orders')]
+    await admin.send_transaction(admin_account, realms.contract_address, 'set_realm_data', [
+        *TOKEN_ID, map_realm(realms_data[str(TOKEN_ID[0])], *meta)])
+    await admin.send_transaction(admin_account, realms.contract_address, 'mint',
+                                 [admin_account.contract_address, *TOKEN_ID])
+    await admin.send_transaction(admin_account, realms.contract_address, 'setApprovalForAll',
+                                 [settling_logic.contract_address, 1])
+
+    settle = await admin.send_transaction(admin_account, settling_logic.contract_address, 'settle', [*TOKEN_ID])
+    unsettle = await admin.send_transaction(admin_account, settling_logic.contract_address, 'unsettle', [*TOKEN_ID])
+    block_info = starknet.state.state.block_info
+    # the in-memory state has no transaction hashes, any unique ones do
+    events = (events_of_execution(10, settle, 0xA, block_info.block_timestamp)
+              + events_of_execution(12, unsettle, 0xB, block_info.block_timestamp))
+
+    indexer = EventIndexer(sources={settling_logic.contract_address: ["Settled", "UnSettled", "VaultTime", "ClaimTime"]})
+    try:
+        # realm and s_realm transfers are not tracked, ClaimTime and VaultTime come with both
+        assert indexer.ingest(events) == 6
+        # replays are ignored
+        assert indexer.ingest(events) == 0
+
+        owner = admin_account.contract_address
+        rows = indexer.rows("settling", token_id=TOKEN_ID[0])
+        assert [(r["kind"], r["owner"], r["block_number"], r["tx_hash"]) for r in rows] == [
+            ("settled", hex(owner), 10, "0xa"), ("unsettled", hex(owner), 12, "0xb")]
+        assert indexer.rows("settling", owner=owner, kind="unsettled")[0]["from_address"] == hex(
+            settling_logic.contract_address)
+        times = indexer.rows("settling_times", token_id=TOKEN_ID[0])
+        assert [r["kind"] for r in times] == ["claim", "vault", "claim", "vault"]
+        # both restart the staking times at the block timestamp
+        assert {r["time_staked"] for r in times} == {block_info.block_timestamp}
+    finally:
+        indexer.close()
+
+
+def test_big_values(indexer):
+    trade = [0x999, 7921, 1, 1700000000, PRICE, OWNER, 1, 3]
+    indexer.ingest([RawEvent(3, None, "0xc", 0, MARKETPLACE, [get_selector_from_name("TradeAction")], trade)])
+    row = indexer.rows("trades", token_id=7921 + (1 << 128))[0]
+    assert int(row["price"]) == PRICE
+    assert row["token_id"] == str(7921 + (1 << 128))
+    assert row["poster"] == hex(OWNER)
+
+    with pytest.raises(ValueError):
+        indexer.ingest([RawEvent(4, None, "0xd", 0, MARKETPLACE, [get_selector_from_name("TradeAction")], trade[:-1])])
+
+
+def test_sync_cursor(indexer):
+    chain = {
+        1: block(1, [event("Settled", [OWNER, 1, 0])]),
+        2: block(2),
+        3: block(3, [event("Settled", [OWNER, 2, 0]), event("Settled", [OWNER, 3, 0], from_address=0x999)],
+                 [event("ClaimTime", [2, 0, 60])]),
+        4: block(4, [event("UnSettled", [OWNER, 1, 0])]),
+    }
+    reads = []
+
+    def get_block(number):
+        reads.append(number)
+        return chain[number]
+
+    assert indexer.cursor("goerli") is None
+    assert indexer.sync("goerli", from_block=1, to_block=3, get_block=get_block, scheduler=Serial()) == 3
+    assert indexer.cursor("goerli") == 3
+    assert indexer.sync("goerli", from_block=1, to_block=4, get_block=get_block, scheduler=Serial()) == 1
+    assert reads == [1, 2, 3, 4]
+    assert [r["token_id"] for r in indexer.rows("settling", owner=OWNER)] == [1, 2, 1]
+    # filters are felts as ints, decimal or hex strings
+    assert indexer.rows("settling", owner=str(OWNER)) == indexer.rows("settling", owner=hex(OWNER))
+    assert [r["token_id"] for r in indexer.rows("settling", token_id="2")] == [2]
+    claim = indexer.rows("settling_times")[0]
+    assert (claim["kind"], claim["event_index"], claim["timestamp"]) == ("claim", 2, 1003)
@@ -0,0 +1,68 @@
+import pytest
+
+from realms_cli.realms_cli.fee_oracle import FALLBACK_MAX_FEE, FeeOracle, fee_of, length_bucket
+
+REALMS = 0x123
+MINT = 0x456
+SET_COSTS = 0x789
+
+
+class Estimates:
+    def __init__(self, fee=1000):
+        self.fee = fee
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"overall_fee": self.fee, "unit": "wei"}
+
+
+@pytest.fixture
+def block():
+    return {"number": 1}
+
+
+@pytest.fixture
+def oracle(block):
+    return FeeOracle(lambda network: block["number"], multiplier=1.5)
+
+
+def test_length_bucket():
+    assert [length_bucket(n) for n in [0, 1, 2, 3, 4, 5, 17]] == [1, 1, 2, 4, 4, 8, 32]
+    assert fee_of({"amount": "0x10", "unit": "wei"}) == 16
+
+
+def test_reused_across_a_batch(oracle):
+    estimate = Estimates()
+    fees = [oracle.max_fee("goerli", [(REALMS, MINT)], 4, estimate) for _ in range(10)]
+    assert fees == [1500] * 10
+    assert estimate.calls == 1
+    assert (oracle.estimates, oracle.reused) == (1, 9)
+
+
+def test_keys(oracle, block):
+    estimate = Estimates()
+    oracle.max_fee("goerli", [(REALMS, MINT)], 4, estimate)
+    # other selector set, other length bucket, other block
+    oracle.max_fee("goerli", [(REALMS, MINT), (REALMS, SET_COSTS)], 4, estimate)
+    oracle.max_fee("goerli", [(REALMS, MINT)], 40, estimate)
+    block["number"] = 2
+    oracle.max_fee("goerli", [(REALMS, MINT)], 4, estimate)
+    assert estimate.calls == 4
+
+
+def test_scaled_within_a_bucket(oracle):
+    oracle.max_fee("goerli", [(REALMS, MINT)], 5, Estimates(1000))
+    # same bucket (8) but more calldata than what was estimated
+    assert oracle.max_fee("goerli", [(REALMS, MINT)], 8, Estimates()) == int(1000 * 8 / 5 * 1.5)
+    assert oracle.max_fee("goerli", [(REALMS, MINT)], 6, Estimates()) == int(1000 * 6 / 5 * 1.5)
+
+
+def test_fallback(oracle):
+    def failing():
+        raise RuntimeError("nonce ahead of the chain")
+
+    assert oracle.max_fee("goerli", [(REALMS, MINT)], 4, failing) == FALLBACK_MAX_FEE
+    assert oracle.fallbacks == 1
+    # nothing was cached, the next one estimates
+    assert oracle.max_fee("goerli", [(REALMS, MINT)], 4, Estimates()) == 1500
@@ -0,0 +1,104 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from starkware.starknet.public.abi import get_selector_from_name
+
+from realms_cli.realms_cli.gateway import GatewayClient, GatewayError, felt_formatter, format_result
+
+FELT_PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
+CONTRACT = 0x123
+TX_HASH = "0x5f3a"
+
+
+class StandInGateway(BaseHTTPRequestHandler):
+    """Answers the handful of gateway endpoints the CLI uses."""
+
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((url.path, parse_qs(url.query), body))
+
+        if url.path == "/feeder_gateway/call_contract":
+            if int(body["entry_point_selector"], 16) != get_selector_from_name("balanceOf"):
+                return self._reply(500, {"code": "StarknetErrorCode.ENTRY_POINT_NOT_FOUND_IN_CONTRACT"})
+            owner = int(body["calldata"][0])
+            return self._reply(200, {"result": [hex(owner * 5), "0x0"]})
+        if url.path == "/gateway/add_transaction":
+            return self._reply(200, {
+                "code": "TRANSACTION_RECEIVED",
+                "transaction_hash": TX_HASH,
+                "address": hex(CONTRACT),
+            })
+        self._reply(404, {})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requests.append((url.path, parse_qs(url.query), None))
+        if url.path == "/feeder_gateway/get_transaction_status":
+            return self._reply(200, {"tx_status": "ACCEPTED_ON_L2", "block_hash": "0x1"})
+        self._reply(404, {})
+
+
+@pytest.fixture
+def gateway():
+    StandInGateway.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInGateway)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = GatewayClient(f"http://127.0.0.1:{server.server_address[1]}/")
+    yield client
+    client.close()
+    server.shutdown()
+
+
+def test_felt_formatter():
+    assert felt_formatter("0x5") == "5"
+    assert felt_formatter(FELT_PRIME - 1) == "-1"
+    assert felt_formatter(2 ** 64) == hex(2 ** 64)
+    assert felt_formatter(2 ** 200) == hex(2 ** 200)
+    assert format_result(["0x1f", "0x0"]) == "31 0"
+
+
+def test_call_contract(gateway):
+    for owner in range(1, 20):
+        assert gateway.call_contract(CONTRACT, "balanceOf", [owner]) == [owner * 5, 0]
+
+    path, query, body = StandInGateway.requests[0]
+    assert path == "/feeder_gateway/call_contract"
+    assert query["blockNumber"] == ["pending"]
+    assert body["contract_address"] == hex(CONTRACT)
+    assert body["calldata"] == ["1"]
+
+
+def test_call_contract_error(gateway):
+    with pytest.raises(GatewayError):
+        gateway.call_contract(CONTRACT, "ownerOf", [1, 0])
+
+
+def test_invoke_and_status(gateway):
+    out = gateway.invoke(CONTRACT, "__execute__", [0, "0x10", -1], signature=[1, 2], max_fee=100)
+    assert out["transaction_hash"] == TX_HASH
+
+    _, _, body = StandInGateway.requests[-1]
+    assert body["type"] == "INVOKE_FUNCTION"
+    assert body["calldata"] == ["0", "16", str(FELT_PRIME - 1)]
+    assert body["signature"] == ["1", "2"]
+    assert body["max_fee"] == hex(100)
+
+    assert gateway.get_transaction_status(TX_HASH)["tx_status"] == "ACCEPTED_ON_L2"
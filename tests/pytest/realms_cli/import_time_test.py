@@ -0,0 +1,52 @@
+import importlib.util
+import os
+import time
+
+import pytest
+
+pytest.importorskip("nile")
+
+PACKAGE = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "realms_cli")
+# import_bench.py --budget-ms defaults to 500, this leaves room for slow CI machines
+BUDGET_S = 2.0
+
+
+def import_bench():
+    spec = importlib.util.spec_from_file_location(
+        "import_bench", os.path.join(PACKAGE, "benchmarks", "import_bench.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def bench(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PYTHONPATH", os.path.abspath(PACKAGE))
+    return import_bench()
+
+
+def test_plugin_modules_stop_at_the_next_section(bench, tmp_path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        '[tool.poetry.plugins."nile_plugins"]\n'
+        '"settle" = "realms_cli.player.settle.settle_realm"\n'
+        '\n'
+        '[tool.other]\n'
+        '"not_a_command" = "somewhere.else.entry"\n'
+    )
+    assert bench.plugin_modules(str(pyproject)) == ["realms_cli.player.settle"]
+
+
+def test_plugin_modules_defer_heavy_imports(bench):
+    modules = bench.plugin_modules()
+    assert "realms_cli.player.settle" in modules
+    start = time.perf_counter()
+    bench.sample([])
+    interpreter = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, eager = bench.sample(modules)
+    elapsed = time.perf_counter() - start - interpreter
+    assert eager == []
+    assert elapsed < BUDGET_S
@@ -0,0 +1,200 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from realms_cli import incremental
+from realms_cli.incremental import GROUP, manifest_path, regenerate_crypts
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "data")
+RECORDS = 10 * GROUP
+
+
+@pytest.fixture(scope="module")
+def crypts():
+    with open(os.path.join(DATA, "crypts.json")) as f:
+        records = json.load(f)
+    return dict(list(records.items())[:RECORDS])
+
+
+@pytest.fixture
+def tables(tmp_path):
+    paths = {}
+    for name, path in incremental.CRYPT_TABLES.items():
+        paths[name] = str(tmp_path / os.path.basename(path))
+        shutil.copy(os.path.join(DATA, os.path.basename(path)), paths[name])
+    return paths
+
+
+def write(path, records, **dumps):
+    # the layout of data/crypts.json
+    with open(path, "w") as f:
+        f.write(json.dumps(records, **(dumps or {"separators": (",", ":")})))
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def full(src, tmp_path, tables, suffix):
+    """The artifact of a pass without a previous artifact or manifest."""
+    dst = str(tmp_path / f"full{suffix}")
+    for path in (dst, manifest_path(dst)):
+        if os.path.exists(path):
+            os.remove(path)
+    regenerate_crypts(src, dst, tables)
+    return read(dst)
+
+
+def edit(records):
+    records = dict(records)
+    record = dict(records["300"])
+    record["environment"] = "Stone Temple" if record["environment"] != "Stone Temple" else "Mountain Deep"
+    records["300"] = record
+    return records
+
+
+def insert(records):
+    items = list(records.items())
+    return dict(items[:200] + [("9999", records["5"])] + items[200:])
+
+
+def delete(records):
+    records = dict(records)
+    del records["130"]
+    del records["131"]
+    return records
+
+
+def null(records):
+    return dict(records, **{"77": None})
+
+
+def swap_keys(records):
+    # the values of two keys trade places, each group keeps its text length
+    records = dict(records)
+    records["10"], records["400"] = records["400"], records["10"]
+    return records
+
+
+def reorder_keys(records):
+    items = list(records.items())
+    items[64], items[65] = items[65], items[64]
+    return dict(items)
+
+
+@pytest.mark.parametrize("suffix", [".bin", ".json"])
+@pytest.mark.parametrize("mutate", [edit, insert, delete, null, swap_keys, reorder_keys])
+def test_matches_full_pass_after_mutation(crypts, tables, tmp_path, suffix, mutate):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / f"packed{suffix}")
+    write(src, crypts)
+    first = regenerate_crypts(src, dst, tables)
+    assert (first["packed"] + first["skipped"], first["reused"]) == (RECORDS, 0)
+
+    write(src, mutate(crypts))
+    stats = regenerate_crypts(src, dst, tables)
+    assert read(dst) == full(src, tmp_path, tables, suffix)
+    # only the groups around the change were packed again
+    assert 0 < stats["packed"] <= 3 * GROUP
+    assert stats["reused"] > 0
+
+
+def test_unchanged_source_is_not_scanned(crypts, tables, tmp_path, monkeypatch):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / "packed.bin")
+    write(src, crypts)
+    regenerate_crypts(src, dst, tables)
+    monkeypatch.setattr(incremental, "scan_object", None)
+    stats = regenerate_crypts(src, dst, tables)
+    assert (stats["packed"], stats["reused"] + stats["skipped"]) == (0, RECORDS)
+
+
+def test_changed_table_packs_everything(crypts, tables, tmp_path):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / "packed.bin")
+    write(src, crypts)
+    regenerate_crypts(src, dst, tables)
+
+    with open(tables["affinities"]) as f:
+        affinities = json.load(f)
+    with open(tables["affinities"], "w") as f:
+        json.dump(affinities[::-1], f)
+    stats = regenerate_crypts(src, dst, tables)
+    assert (stats["packed"] + stats["skipped"], stats["reused"]) == (RECORDS, 0)
+    assert read(dst) == full(src, tmp_path, tables, ".bin")
+
+
+def test_reformatted_source_packs_everything(crypts, tables, tmp_path):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / "packed.json")
+    write(src, crypts)
+    regenerate_crypts(src, dst, tables)
+
+    write(src, crypts, indent=2)
+    stats = regenerate_crypts(src, dst, tables)
+    assert (stats["packed"] + stats["skipped"], stats["reused"]) == (RECORDS, 0)
+    assert read(dst) == full(src, tmp_path, tables, ".json")
+
+
+def test_interrupted_manifest_write(crypts, tables, tmp_path, monkeypatch):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / "packed.bin")
+    write(src, crypts)
+    regenerate_crypts(src, dst, tables)
+    stale = read(manifest_path(dst))
+
+    # the new artifact is in place, the process dies before its manifest is
+    replace = incremental.replace_atomically
+
+    def crash_on_manifest(path, write_file):
+        if path == manifest_path(dst):
+            raise KeyboardInterrupt
+        replace(path, write_file)
+
+    monkeypatch.setattr(incremental, "replace_atomically", crash_on_manifest)
+    write(src, edit(crypts))
+    with pytest.raises(KeyboardInterrupt):
+        regenerate_crypts(src, dst, tables)
+    monkeypatch.undo()
+    assert read(manifest_path(dst)) == stale
+
+    # the artifact no longer matches the manifest digest, everything is packed again
+    stats = regenerate_crypts(src, dst, tables)
+    assert (stats["packed"] + stats["skipped"], stats["reused"]) == (RECORDS, 0)
+    assert read(dst) == full(src, tmp_path, tables, ".bin")
+
+
+def test_interrupted_artifact_write(crypts, tables, tmp_path, monkeypatch):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / "packed.bin")
+    write(src, crypts)
+    regenerate_crypts(src, dst, tables)
+    before = read(dst)
+
+    def crash(path, items, slot_size=32):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(incremental, "write_store", crash)
+    write(src, edit(crypts))
+    with pytest.raises(KeyboardInterrupt):
+        regenerate_crypts(src, dst, tables)
+    monkeypatch.undo()
+    # the previous artifact is untouched and no temporary file is left behind
+    assert read(dst) == before
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["crypts.json", "packed.bin", "packed.bin.manifest.json"] + [os.path.basename(p) for p in tables.values()])
+
+    regenerate_crypts(src, dst, tables)
+    assert read(dst) == full(src, tmp_path, tables, ".bin")
+
+
+def test_artifact_changed_by_hand(crypts, tables, tmp_path):
+    src, dst = str(tmp_path / "crypts.json"), str(tmp_path / "packed.bin")
+    write(src, crypts)
+    regenerate_crypts(src, dst, tables)
+    with open(dst, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"\x01")
+
+    stats = regenerate_crypts(src, dst, tables)
+    assert (stats["packed"] + stats["skipped"], stats["reused"]) == (RECORDS, 0)
+    assert read(dst) == full(src, tmp_path, tables, ".bin")
@@ -0,0 +1,50 @@
+import io
+import json
+import os
+
+import pytest
+
+from realms_cli.realms_cli.json_stream import iter_object_items, write_json_list
+
+CRYPTS = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "data", "crypts.json")
+
+DOCUMENT = {
+    "1": {"size": 12345678901234567890, "name": "Halls {of} \"Needles\"", "list": [1, 2.5, -3e10]},
+    "two": None,
+    "3": True,
+    "4": 10203040506070,
+    "é": {"nested": {"deeper": []}},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 16])
+def test_items_match_json_load(chunk_size):
+    text = json.dumps(DOCUMENT, indent=2)
+    assert list(iter_object_items(io.StringIO(text), chunk_size)) == list(DOCUMENT.items())
+
+
+def test_empty_and_malformed_objects():
+    assert list(iter_object_items(io.StringIO(" { } "), 1)) == []
+    with pytest.raises(ValueError):
+        list(iter_object_items(io.StringIO("[1, 2]")))
+    with pytest.raises(ValueError):
+        list(iter_object_items(io.StringIO('{"1": {"size": 8}'), 4))
+
+
+def test_crypts_stream_like_json_load():
+    with open(CRYPTS) as f:
+        expected = json.load(f)
+    assert dict(iter_object_items(CRYPTS, 4096)) == expected
+
+
+@pytest.mark.parametrize("items", [
+    [],
+    [{"1": 2}],
+    [{"1": 40564819207303341694527483217926}, {"2": 5}, {"3": 7}],
+    [{"a": [1, {"b": None}]}, 3, "x", {}],
+])
+def test_written_list_matches_json_dumps(tmp_path, items):
+    path = str(tmp_path / "out.json")
+    assert write_json_list(path, iter(items), write_every=2) == len(items)
+    with open(path) as f:
+        assert f.read() == json.dumps(items, indent=4)
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from realms_cli import caller_invoker
+from realms_cli import memory_network
+from realms_cli import nonce as nonces
+from realms_cli import registry
+from realms_cli.caller_invoker import declare, load_account, parse_send, send, wrapped_call, wrapped_send
+from realms_cli.gateway import MEMORY_NETWORK, get_gateway
+from realms_cli.memory_network import SNAPSHOT_ENV, save_snapshot
+from realms_cli.xoroshiro import Xoroshiro
+
+SEED = 0x10AF
+SIGNER = "STARKNET_PRIVATE_KEY"
+# conftest signs with MockSigner(DUMMY_PRIVATE + i)
+DUMMY_PRIVATE = 123456789987654321
+
+
+@pytest.fixture
+async def memory(account_factory, compiled_xoroshiro, tmp_path, monkeypatch):
+    """The memory network booted from a snapshot of a pytest deployment."""
+    starknet, accounts, signers = account_factory
+    xoroshiro = await starknet.deploy(contract_class=compiled_xoroshiro, constructor_calldata=[SEED])
+
+    monkeypatch.chdir(tmp_path)
+    registry._indexes.clear()
+    caller_invoker.READ_CACHE.invalidate(MEMORY_NETWORK)
+    monkeypatch.setattr(nonces, "_managers", {})
+    monkeypatch.setattr(memory_network, "_gateway", None)
+
+    path = tmp_path / "memory.snapshot"
+    save_snapshot(
+        str(path), starknet.state,
+        deployments=[
+            (xoroshiro.contract_address, "artifacts/abis/xoroshiro128_starstar.json", "xoroshiro"),
+            (accounts[0].contract_address, "artifacts/abis/Account.json", "account-0"),
+        ],
+        accounts={signers[0].public_key: accounts[0].contract_address},
+    )
+    monkeypatch.setenv(SNAPSHOT_ENV, str(path))
+    monkeypatch.setenv(SIGNER, str(DUMMY_PRIVATE))
+    return get_gateway(MEMORY_NETWORK)
+
+
+def nonce_of(gateway, account):
+    return gateway.call_contract(account.address, "get_nonce", [])[0]
+
+
+@pytest.mark.parametrize("account_factory", [dict(num_signers=2)], indirect=True)
+def test_snapshot_restores_deployments(memory):
+    with open(memory_network.FILES[0]) as fp:
+        assert "xoroshiro" in fp.read()
+    # the account of the signer key is resolved from the snapshot, not deployed again
+    account = load_account(SIGNER, MEMORY_NETWORK)
+    assert account.address == registry.deployment("account-0", MEMORY_NETWORK)[0]
+
+
+@pytest.mark.parametrize("account_factory", [dict(num_signers=2)], indirect=True)
+def test_call(memory):
+    rng = Xoroshiro(SEED)
+    assert wrapped_call(MEMORY_NETWORK, "xoroshiro", "next", [], cached=False) == hex(rng.next())
+    # a view call does not advance the state
+    assert wrapped_call(MEMORY_NETWORK, "xoroshiro", "next", [], cached=False) == hex(Xoroshiro(SEED).next())
+
+
+@pytest.mark.parametrize("account_factory", [dict(num_signers=2)], indirect=True)
+def test_send_advances_state_and_nonce(memory):
+    account = load_account(SIGNER, MEMORY_NETWORK)
+    # account_factory is shared with other modules, which may have sent from it
+    start = nonce_of(memory, account)
+    rng = Xoroshiro(SEED)
+    wrapped_send(MEMORY_NETWORK, SIGNER, "xoroshiro", "next", [[]])
+    rng.next()
+    assert wrapped_call(MEMORY_NETWORK, "xoroshiro", "next", []) == hex(rng.next())
+    assert nonce_of(memory, account) == start + 1
+
+    wrapped_send(MEMORY_NETWORK, SIGNER, "xoroshiro", "next", [[]])
+    assert nonce_of(memory, account) == start + 2
+    _, tx_hash = parse_send(send(MEMORY_NETWORK, SIGNER, "xoroshiro", "next", [[]]))
+    status = memory.get_transaction_status(tx_hash)
+    assert status["tx_status"] == "ACCEPTED_ON_L2"
+    assert memory.get_transaction_receipt(tx_hash)["block_number"] == memory.get_block("latest")["block_number"]
+    assert nonce_of(memory, account) == start + 3
+
+
+@pytest.mark.parametrize("account_factory", [dict(num_signers=2)], indirect=True)
+def test_rejected_send(memory):
+    account = load_account(SIGNER, MEMORY_NETWORK)
+    start = nonce_of(memory, account)
+    _, tx_hash = parse_send(send(MEMORY_NETWORK, SIGNER, "xoroshiro", "not_a_function", [[]]))
+    status = caller_invoker.get_tx_status(MEMORY_NETWORK, tx_hash)
+    assert status["tx_status"] == "REJECTED"
+    assert "tx_failure_reason" in status
+    assert nonce_of(memory, account) == start
+    assert memory.get_transaction_status("0x1234") == {"tx_status": "NOT_RECEIVED"}
+
+
+@pytest.mark.parametrize("account_factory", [dict(num_signers=2)], indirect=True)
+def test_declare(memory, compiled_xoroshiro, tmp_path):
+    (tmp_path / "artifacts").mkdir()
+    (tmp_path / "artifacts" / "xoroshiro128_starstar.json").write_text(compiled_xoroshiro.dumps())
+    out = declare("xoroshiro128_starstar", "xoroshiro_class", MEMORY_NETWORK)
+    class_hash = out.split(": ")[1]
+    assert int(class_hash, 16) == int(memory.declare(json.loads(compiled_xoroshiro.dumps()))["class_hash"], 16)
+    registry._indexes.clear()
+    assert registry.declaration("xoroshiro_class", MEMORY_NETWORK) == class_hash
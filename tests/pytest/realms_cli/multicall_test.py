@@ -0,0 +1,180 @@
+import pytest
+from starkware.starknet.public.abi import get_selector_from_name
+
+from realms_cli import multicall as multicalls
+from realms_cli import registry
+from realms_cli.gateway import GatewayError, JsonRpcClient
+from realms_cli.multicall import Multicall
+from realms_cli.scheduler import CallError, CallScheduler, MultiCallError
+from realms_cli.xoroshiro import Xoroshiro
+
+NETWORK = "goerli"
+AGGREGATOR = "0x0999"
+# calls with this argument revert
+REVERT = 1000
+
+
+def view(address, calldata):
+    """Result of the stand-in view function, the address and its arguments."""
+    calldata = [int(str(felt), 0) for felt in calldata]
+    if REVERT in calldata:
+        raise GatewayError(500, "Transaction reverted")
+    return [int(str(address), 0), sum(calldata)]
+
+
+class Rpc:
+    """JSON-RPC node that rejects batches over `max_batch` requests as too large."""
+
+    call_request = staticmethod(JsonRpcClient.call_request)
+
+    def __init__(self, max_batch=1000):
+        self.max_batch = max_batch
+        self.batches = []
+
+    def batch(self, requests_):
+        if len(requests_) > self.max_batch:
+            raise GatewayError(413, "Payload Too Large")
+        self.batches.append(len(requests_))
+        responses = []
+        for request in requests_:
+            call = request["params"][0]
+            try:
+                result = view(call["contract_address"], call["calldata"])
+            except GatewayError as exc:
+                responses.append({"id": request["id"], "error": {"code": 40, "message": exc.message}})
+            else:
+                responses.append({"id": request["id"], "result": [hex(felt) for felt in result]})
+        return responses
+
+
+class Gateway:
+    """Feeder gateway running `aggregate` like contracts/utils/multicall.cairo."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call_contract(self, address, function, calldata):
+        self.calls.append((address, function))
+        if function != "aggregate":
+            return view(address, calldata)
+        assert address == AGGREGATOR and calldata[0] == len(calldata) - 1
+        packed, out = calldata[1:], []
+        while packed:
+            to, selector, size = packed[:3]
+            assert selector == get_selector_from_name("get")
+            result = view(to, packed[3:3 + size])
+            out += [len(result)] + result
+            packed = packed[3 + size:]
+        return [len(out)] + out
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry._indexes.clear()
+    return tmp_path
+
+
+@pytest.fixture
+def gateway(monkeypatch, workdir):
+    gateway = Gateway()
+    monkeypatch.setattr(multicalls, "get_rpc_client", lambda network: None)
+    monkeypatch.setattr(multicalls, "get_gateway", lambda network: gateway)
+    return gateway
+
+
+@pytest.fixture
+def aggregator(gateway, workdir):
+    (workdir / f"{NETWORK}.deployments.txt").write_text(
+        f"{AGGREGATOR}:artifacts/abis/multicall.json:multicall\n")
+    return gateway
+
+
+def queue(calls, rows):
+    for address, argument in rows:
+        calls.add(hex(address), "get", [argument, 1])
+    return calls
+
+
+def expected(rows):
+    return [[address, argument + 1] for address, argument in rows]
+
+
+def scheduler():
+    return CallScheduler(4, retries=1, backoff=0.001)
+
+
+ROWS = [(address, argument) for address in range(1, 6) for argument in range(20)]
+
+
+def test_rpc_batches(monkeypatch):
+    rpc = Rpc()
+    monkeypatch.setattr(multicalls, "get_rpc_client", lambda network: rpc)
+    calls = queue(Multicall(NETWORK, batch_size=30, scheduler=scheduler()), ROWS)
+    assert calls.execute() == expected(ROWS)
+    assert sorted(rpc.batches) == [10, 30, 30, 30]
+    assert calls.round_trips == 4
+    assert calls.calls == []
+
+
+def test_rpc_splits_batches_too_large(monkeypatch):
+    rpc = Rpc(max_batch=13)
+    monkeypatch.setattr(multicalls, "get_rpc_client", lambda network: rpc)
+    calls = queue(Multicall(NETWORK, batch_size=50, scheduler=scheduler()), ROWS)
+    assert calls.execute() == expected(ROWS)
+    assert max(rpc.batches) <= 13 and sum(rpc.batches) == len(ROWS)
+    # 2 rejected batches of 50, 4 of 25 and 8 accepted ones
+    assert calls.round_trips == 14
+
+
+def test_rpc_errors_stay_in_their_row(monkeypatch):
+    monkeypatch.setattr(multicalls, "get_rpc_client", lambda network: Rpc())
+    rows = [(1, 0), (2, REVERT), (3, 2)]
+    calls = queue(Multicall(NETWORK, scheduler=scheduler()), rows)
+    with pytest.raises(MultiCallError) as raised:
+        calls.execute()
+    assert [error.index for error in raised.value.errors] == [1]
+
+    results = queue(Multicall(NETWORK, scheduler=scheduler()), rows).execute(return_exceptions=True)
+    assert results[0] == [1, 1] and results[2] == [3, 3]
+    assert isinstance(results[1], CallError) and results[1].index == 1
+
+
+def test_aggregates_on_chain(aggregator):
+    calls = queue(Multicall(NETWORK, batch_size=40, scheduler=scheduler()), ROWS)
+    assert calls.execute() == expected(ROWS)
+    assert aggregator.calls == [(AGGREGATOR, "aggregate")] * 3
+    assert calls.round_trips == 3
+
+
+def test_aggregate_finds_reverted_calls(aggregator):
+    rows = ROWS[:16]
+    rows[5] = (1, REVERT)
+    calls = queue(Multicall(NETWORK, batch_size=16, scheduler=scheduler()), rows)
+    results = calls.execute(return_exceptions=True)
+    assert [i for i, result in enumerate(results) if isinstance(result, CallError)] == [5]
+    assert isinstance(results[5].cause, GatewayError)
+    assert [result for result in results if not isinstance(result, CallError)] == expected(rows[:5] + rows[6:])
+    # the batch, then halves of 8, 4, 2 and 1 calls down to the reverted one
+    assert calls.round_trips == 1 + 2 * 4
+
+
+def test_calls_one_by_one_without_aggregator(gateway):
+    calls = queue(Multicall(NETWORK, scheduler=scheduler()), ROWS[:10])
+    assert calls.execute() == expected(ROWS[:10])
+    assert [function for _, function in gateway.calls] == ["get"] * 10
+    assert calls.round_trips == 10
+
+
+@pytest.mark.asyncio
+async def test_aggregate_contract(starknet, multicall, compiled_xoroshiro):
+    first = await starknet.deploy(contract_class=compiled_xoroshiro, constructor_calldata=[1])
+    second = await starknet.deploy(contract_class=compiled_xoroshiro, constructor_calldata=[2])
+    selector = get_selector_from_name("next")
+    packed = [first.contract_address, selector, 0, second.contract_address, selector, 0,
+              first.contract_address, selector, 0]
+    out = (await multicall.aggregate(packed).call()).result.result
+    # the calls run in order within the view, the second next() of `first` sees the first one
+    one, two = Xoroshiro(1), Xoroshiro(2)
+    assert out == [1, one.next(), 1, two.next(), 1, one.next()]
+    assert (await multicall.aggregate([]).call()).result.result == []
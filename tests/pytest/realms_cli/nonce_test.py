@@ -0,0 +1,113 @@
+import pytest
+
+from realms_cli.realms_cli import nonce as nonces
+from realms_cli.realms_cli.nonce import NonceManager, is_invalid_nonce
+
+ADDRESS = "0x0123"
+
+
+class Chain:
+    """get_nonce of the account, counting reads."""
+
+    def __init__(self, nonce=5):
+        self.nonce = nonce
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return self.nonce
+
+
+@pytest.fixture
+def chain():
+    return Chain()
+
+
+@pytest.fixture
+def manager(chain):
+    return NonceManager(ADDRESS, "goerli", chain)
+
+
+def test_reserve_reads_the_chain_once(manager, chain):
+    assert [manager.reserve() for _ in range(3)] == [5, 6, 7]
+    assert chain.reads == 1
+
+
+def test_release_last_nonce_is_reused(manager, chain):
+    manager.reserve()
+    nonce = manager.reserve()
+    manager.release(nonce)
+    assert manager.reserve() == nonce
+    assert chain.reads == 1
+
+
+def test_release_leaves_a_gap(manager, chain):
+    first, second = manager.reserve(), manager.reserve()
+    manager.release(first)
+    # `second` was already submitted, the chain tells where to continue
+    chain.nonce = 5
+    assert manager.reserve() == 5
+    assert chain.reads == 2
+    assert manager._in_flight == {second, 5}
+
+
+def test_release_after_reject(manager, chain):
+    first, second = manager.reserve(), manager.reserve()
+    manager.reject(first)
+    manager.release(second)
+    assert manager.reserve() == 5
+    assert chain.reads == 2
+
+
+def test_reject_drops_later_nonces(manager, chain):
+    nonces_ = [manager.reserve() for _ in range(4)]
+    manager.confirm(nonces_[0])
+    manager.reject(nonces_[1])
+    chain.nonce = 6
+    assert manager.reserve() == 6
+    assert manager._in_flight == {6}
+
+
+def test_sync_drift(manager, chain, capsys):
+    manager.reserve()
+    manager.reserve()
+    # the account sent 3 transactions from somewhere else
+    chain.nonce = 8
+    assert manager.sync() == 8
+    assert "nonce drift" in capsys.readouterr().out
+    assert manager._in_flight == set()
+    assert manager.reserve() == 8
+
+
+def test_sync_keeps_nonces_ahead_of_the_chain(manager, chain):
+    manager.reserve()
+    manager.reserve()
+    # the submitted transactions are not in the pending block yet
+    assert manager.sync() == 7
+
+
+def test_sync_submitted(monkeypatch, manager, chain):
+    monkeypatch.setattr(nonces, "_submitted", {})
+    idle = NonceManager("0x0456", "goerli", Chain())
+    nonces.track("0xaa", manager, manager.reserve())
+    nonces.track("0xbb", manager, manager.reserve())
+    nonces.sync_submitted()
+    assert chain.reads == 2
+    assert idle._fetch.reads == 0
+
+    nonces.settle("0xaa", "ACCEPTED_ON_L2")
+    nonces.settle("0xbb", "REJECTED")
+    assert manager._in_flight == set()
+    assert manager._next is None
+
+
+def test_get_nonce_manager_is_shared(monkeypatch, chain):
+    monkeypatch.setattr(nonces, "_managers", {})
+    manager = nonces.get_nonce_manager("0x00123", "goerli", chain)
+    assert nonces.get_nonce_manager(ADDRESS, "goerli", chain) is manager
+    assert nonces.get_nonce_manager(ADDRESS, "mainnet", chain) is not manager
+
+
+def test_is_invalid_nonce():
+    assert is_invalid_nonce(Exception("Error message: Account: nonce is invalid"))
+    assert not is_invalid_nonce(Exception("Error message: insufficient balance"))
@@ -0,0 +1,65 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from realms_cli.realms_cli.packed_store import (
+    HEADER_SIZE,
+    PackedStore,
+    convert_json,
+    write_store,
+)
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "data")
+
+
+def test_converts_realms_bit_json(tmp_path):
+    path = str(tmp_path / "realms.bin")
+    with open(os.path.join(DATA, "realms_bit.json")) as f:
+        entries = json.load(f)
+    assert convert_json(os.path.join(DATA, "realms_bit.json"), path) == 8000
+    assert os.path.getsize(path) == HEADER_SIZE + 8000 * 32
+    with PackedStore(path) as store:
+        for entry in entries[::97]:
+            (id, packed), = entry.items()
+            assert store[int(id)] == packed
+        assert store.values(1, 3) == [list(e.values())[0] for e in entries[:3]]
+        assert store.slots(1, 10).shape == (10, 32)
+        assert len(store.view()) == 8000 * 32
+
+
+def test_checked_in_stores_are_current():
+    with open(os.path.join(DATA, "realms_bit.json")) as f:
+        entries = json.load(f)
+    with PackedStore(os.path.join(DATA, "realms_bit.bin")) as store:
+        assert dict(store.items()) == {int(id): v for e in entries for id, v in e.items()}
+    with PackedStore(os.path.join(DATA, "crypts_bit.bin")) as store:
+        assert len(store) == 8999
+        assert store.get(269) is None
+
+
+def test_gaps_bounds_and_order(tmp_path):
+    path = str(tmp_path / "store.bin")
+    assert write_store(path, [(3, 7), (4, 2 ** 250), (7, 1)]) == 5
+    with PackedStore(path) as store:
+        assert (store.first_id, store.last_id) == (3, 7)
+        assert store.values() == [7, 2 ** 250, 0, 0, 1]
+        assert 5 not in store and 7 in store
+        assert store.get(5) is None and store.get(99, "missing") == "missing"
+        with pytest.raises(KeyError):
+            store[2]
+        assert np.array_equal(store.slots(7, 7)[0][:2], [1, 0])
+        assert dict(store.items()) == {3: 7, 4: 2 ** 250, 7: 1}
+
+    with pytest.raises(ValueError):
+        write_store(path, [(2, 1), (1, 1)])
+    with pytest.raises(ValueError):
+        write_store(path, [(1, 2 ** 16)], slot_size=2)
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"[1, 2, 3]")
+    with pytest.raises(ValueError):
+        PackedStore(str(path))
@@ -0,0 +1,121 @@
+import json
+import time
+
+import pytest
+
+from realms_cli.realms_cli.read_cache import ReadCache
+
+
+class Chain:
+    """Counts block lookups and calls, the block only moves when told to."""
+
+    def __init__(self):
+        self.block_number = 10
+        self.block_lookups = 0
+        self.calls = []
+
+    def latest_block(self, network):
+        self.block_lookups += 1
+        return self.block_number
+
+    def caller(self, value):
+        def _call(block):
+            self.calls.append(block)
+            return f"{value} {block}"
+        return _call
+
+
+@pytest.fixture
+def chain():
+    return Chain()
+
+
+def test_block_keyed_reads(chain):
+    cache = ReadCache(chain.latest_block, block_ttl=0)
+
+    assert cache.fetch("goerli", "proxy_Exchange_ERC20_1155", "get_currency_reserves", [1, 0], chain.caller("7")) == "7 10"
+    # same read, decimal and hex calldata alike
+    assert cache.fetch("goerli", "proxy_Exchange_ERC20_1155", "get_currency_reserves", ["0x1", "0"], chain.caller("8")) == "7 10"
+    assert chain.calls == [10]
+
+    chain.block_number = 11
+    assert cache.fetch("goerli", "proxy_Exchange_ERC20_1155", "get_currency_reserves", [1, 0], chain.caller("9")) == "9 11"
+    assert chain.calls == [10, 11]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_static_reads_skip_the_network(chain):
+    cache = ReadCache(chain.latest_block)
+
+    for _ in range(3):
+        assert cache.fetch("goerli", "proxy_L06_Combat", "get_troop_cost", [1], chain.caller("cost")) == "cost None"
+    assert chain.calls == [None]
+    assert chain.block_lookups == 0
+
+
+def test_lru_and_ttl(chain, monkeypatch):
+    cache = ReadCache(chain.latest_block, max_entries=2, ttl=10)
+
+    for token in range(3):
+        cache.fetch("goerli", "proxy_realms", "balanceOf", [token], chain.caller(token))
+    cache.fetch("goerli", "proxy_realms", "balanceOf", [0], chain.caller(0))
+    assert len(chain.calls) == 4
+
+    now = time.time()
+    monkeypatch.setattr("realms_cli.realms_cli.read_cache.time.time", lambda: now + 11)
+    cache.fetch("goerli", "proxy_realms", "balanceOf", [0], chain.caller(0))
+    assert len(chain.calls) == 5
+
+
+def test_invalidate(chain):
+    cache = ReadCache(chain.latest_block)
+
+    cache.fetch("goerli", "proxy_L06_Combat", "get_troop_cost", [1], chain.caller("old"))
+    cache.fetch("goerli", "proxy_L03_Buildings", "get_building_cost", [1], chain.caller("old"))
+    cache.invalidate("goerli", "proxy_L06_Combat")
+
+    assert cache.fetch("goerli", "proxy_L06_Combat", "get_troop_cost", [1], chain.caller("new")) == "new None"
+    assert cache.fetch("goerli", "proxy_L03_Buildings", "get_building_cost", [1], chain.caller("new")) == "old None"
+
+
+def test_disk_tier(chain, tmp_path):
+    path = str(tmp_path / "reads.sqlite")
+    cache = ReadCache(chain.latest_block, path=path)
+    cache.fetch("goerli", "proxy_realms", "get_realm_info", [5, 0], chain.caller("info"))
+    cache.close()
+
+    cache = ReadCache(chain.latest_block, path=path)
+    assert cache.fetch("goerli", "proxy_realms", "get_realm_info", [5, 0], chain.caller("other")) == "info None"
+    assert len(chain.calls) == 1
+
+    cache.invalidate("goerli", "proxy_realms")
+    cache.close()
+    cache = ReadCache(chain.latest_block, path=path)
+    assert cache.fetch("goerli", "proxy_realms", "get_realm_info", [5, 0], chain.caller("other")) == "other None"
+
+
+def test_static_reads_expire(chain, tmp_path, monkeypatch):
+    path = str(tmp_path / "reads.sqlite")
+    cache = ReadCache(chain.latest_block, path=path, ttl=10, static_ttl=100)
+    cache.fetch("goerli", "proxy_L06_Combat", "get_troop_cost", [1], chain.caller("old"))
+    cache.close()
+
+    now = time.time()
+    monkeypatch.setattr("realms_cli.realms_cli.read_cache.time.time", lambda: now + 50)
+    cache = ReadCache(chain.latest_block, path=path, ttl=10, static_ttl=100)
+    # older than ttl, static reads keep longer
+    assert cache.fetch("goerli", "proxy_L06_Combat", "get_troop_cost", [1], chain.caller("new")) == "old None"
+
+    # a set_troop_cost sent from another machine shows up after static_ttl
+    monkeypatch.setattr("realms_cli.realms_cli.read_cache.time.time", lambda: now + 101)
+    assert cache.fetch("goerli", "proxy_L06_Combat", "get_troop_cost", [1], chain.caller("new")) == "new None"
+    cache.close()
+
+
+def test_rows_without_expiry_are_stale(chain, tmp_path):
+    path = str(tmp_path / "reads.sqlite")
+    cache = ReadCache(chain.latest_block, path=path)
+    key = cache.key("goerli", "proxy_realms", "get_realm_info", [5, 0], None)
+    cache._db.execute("INSERT INTO reads VALUES (?, ?, ?, ?, NULL)", (json.dumps(key), "goerli", "proxy_realms", '"old"'))
+    cache._db.commit()
+    assert cache.fetch("goerli", "proxy_realms", "get_realm_info", [5, 0], chain.caller("info")) == "info None"
@@ -0,0 +1,51 @@
+import pytest
+from nile import deployments
+
+from realms_cli.realms_cli import registry
+
+DEPLOYMENTS = """0x01:artifacts/abis/Realms.json:realms
+0x02:artifacts/abis/PROXY_Logic.json:proxy_realms
+0x03:artifacts/abis/Account.json:account-0
+0x04:artifacts/abis/Realms.json:realms
+"""
+
+DECLARATIONS = """0xaa:Settling
+0xbb:L06_Combat
+"""
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry._indexes.clear()
+    (tmp_path / "goerli.deployments.txt").write_text(DEPLOYMENTS)
+    (tmp_path / "goerli.declarations.txt").write_text(DECLARATIONS)
+    return tmp_path
+
+
+def test_matches_nile(workdir):
+    for identifier in ["realms", "proxy_realms", "account-0", "0x04", "missing"]:
+        expected = next(deployments.load(identifier, "goerli"), None)
+        assert registry.deployment(identifier, "goerli") == expected
+
+    for identifier in ["Settling", "0xbb", "missing"]:
+        expected = next(deployments.load_class(identifier, "goerli"), None)
+        assert registry.declaration(identifier, "goerli") == expected
+
+    assert registry.deployment("realms", "mainnet") is None
+
+
+def test_on_disk_index(workdir, monkeypatch):
+    registry.deployment("realms", "goerli")
+    assert (workdir / ".goerli.deployments.idx").exists()
+
+    # a fresh process reads the index instead of parsing the text file
+    registry._indexes.clear()
+    monkeypatch.setattr(registry, "_parse", None)
+    assert registry.deployment("proxy_realms", "goerli")[0] == "0x02"
+
+
+def test_picks_up_new_registrations(workdir):
+    assert registry.deployment("proxy_Settling", "goerli") is None
+    deployments.register("0x05", "artifacts/abis/PROXY_Logic.json", "goerli", "proxy_Settling")
+    assert registry.deployment("proxy_Settling", "goerli") == ("0x05", "artifacts/abis/PROXY_Logic.json")
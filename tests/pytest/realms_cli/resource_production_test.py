@@ -0,0 +1,126 @@
+import json
+import os
+import random
+
+import numpy as np
+
+from realms_cli.realms_cli.bitfield import REALM
+from realms_cli.realms_cli.resource_production import (
+    DAY,
+    available_vault_days,
+    claim_resources,
+    claimable,
+    days_accrued,
+    forecast_claims,
+    realm_resource_ids,
+    realm_resources,
+    to_wei,
+    totals_by_resource,
+    vault_raidable,
+)
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, "data")
+
+
+# L02_Resources and library_resources one realm at a time, as they are written
+def contract_days_accrued(now, time_staked):
+    days, remainder = divmod(now - time_staked, DAY)
+    return (days, remainder) if days <= 3 else (2, remainder)
+
+
+def contract_vault_days(now, vault_staked):
+    days, remainder = divmod(now - vault_staked, DAY)
+    return (0, 0) if days <= 6 else (days, remainder)
+
+
+def contract_mint(workhuts, happiness, resources, days, mint_percentage):
+    output = 250 * happiness // 100 + workhuts * 25
+    amount = days * mint_percentage * output // 100
+    return [amount if slot == 0 or resource != 0 else 0 for slot, resource in enumerate(resources)]
+
+
+def contract_claim(now, realm):
+    days, remainder = contract_days_accrued(now, realm["time_staked"])
+    vault_days, vault_remainder = contract_vault_days(now, realm["vault_staked"])
+    if days + vault_days == 0:
+        return [0] * 7
+    realm["time_staked"] = now - remainder
+    realm["vault_staked"] = now - vault_remainder
+    return contract_mint(realm["houses"], 100, realm["resources"], days + vault_days, 100)
+
+
+def load_resources():
+    with open(os.path.join(DATA, "realms_bit.json")) as f:
+        packed = [value for entry in json.load(f) for value in entry.values()]
+    return packed, [[getattr(REALM.unpack(p), f"resource_{i}") for i in range(1, 8)] for p in packed]
+
+
+def random_realms(rng, count):
+    _, resources = load_resources()
+    now = 10 ** 7
+    return now, [
+        {"time_staked": now - rng.randrange(0, 12 * DAY), "vault_staked": now - rng.randrange(0, 12 * DAY),
+         "houses": rng.randrange(0, 6), "resources": rng.choice(resources)}
+        for _ in range(count)
+    ]
+
+
+def columns(realms):
+    return [np.array([realm[name] for realm in realms]) for name in ("time_staked", "vault_staked", "resources",
+                                                                      "houses")]
+
+
+def test_realm_resources_of_store_slots():
+    packed, resources = load_resources()
+    slots = np.frombuffer(b"".join(p.to_bytes(32, "little") for p in packed[:500]), dtype=np.uint8).reshape(-1, 32)
+    assert realm_resources(slots).tolist() == resources[:500]
+    assert realm_resource_ids([[0, 3, 0, 0, 0, 0, 0], [5, 0, 0, 0, 0, 0, 0]]).tolist() == [
+        [0, 3, 0, 0, 0, 0, 0], [5, 0, 0, 0, 0, 0, 0]]
+
+
+def test_days():
+    now = 100 * DAY
+    staked = now - np.array([0, DAY - 1, DAY, 3 * DAY + 5, 4 * DAY, 40 * DAY])
+    days, remainder = days_accrued(now, staked)
+    # more than MAX_DAYS_ACCURED + 1 days drop back to MAX_DAYS_ACCURED
+    assert days.tolist() == [0, 0, 1, 3, 2, 2] and remainder.tolist() == [0, DAY - 1, 0, 5, 0, 0]
+    days, remainder = available_vault_days(now, now - np.array([6 * DAY + 10, 7 * DAY + 10]))
+    assert days.tolist() == [0, 7] and remainder.tolist() == [0, 10]
+
+
+def test_amounts():
+    resources = np.array([[1, 2, 0, 0, 0, 0, 0]] * 3)
+    now = 100 * DAY
+    amounts = claimable(now, now - np.array([DAY, DAY, 8 * DAY]), now, resources, np.array([0, 2, 0]),
+                        happiness=np.array([100, 100, 50]))
+    assert amounts.tolist() == [[250, 250, 0, 0, 0, 0, 0], [300, 300, 0, 0, 0, 0, 0], [250, 250, 0, 0, 0, 0, 0]]
+    raidable = vault_raidable(now, now - 8 * DAY, resources[:1], 0)
+    assert raidable.tolist() == [[500, 500, 0, 0, 0, 0, 0]]
+    assert to_wei(raidable)[0, 0] == 500 * 10 ** 18
+    assert totals_by_resource(resources, amounts)[:3].tolist() == [0, 800, 800]
+
+
+def test_claims_match_the_contract_rules():
+    rng = random.Random(25)
+    now, realms = random_realms(rng, 300)
+    time_staked, vault_staked, resources, houses = columns(realms)
+    amounts, time_staked, vault_staked = claim_resources(now, time_staked, vault_staked, resources, houses)
+    assert amounts.tolist() == [contract_claim(now, realm) for realm in realms]
+    assert time_staked.tolist() == [realm["time_staked"] for realm in realms]
+    assert vault_staked.tolist() == [realm["vault_staked"] for realm in realms]
+
+
+def test_forecast_matches_repeated_claims():
+    rng = random.Random(26)
+    for claim_every in (1, 3, 4, 9):
+        now, realms = random_realms(rng, 100)
+        forecast = forecast_claims(now, 40, *columns(realms), claim_every=claim_every)
+        expected_by_resource, expected_per_realm = [], np.zeros((len(realms), 7), dtype=np.int64)
+        for time in forecast.times.tolist():
+            amounts = [contract_claim(time, realm) for realm in realms]
+            expected_per_realm += amounts
+            expected_by_resource.append(totals_by_resource([realm["resources"] for realm in realms], amounts))
+        assert len(forecast.times) == 40 // claim_every
+        assert forecast.by_resource.tolist() == np.array(expected_by_resource).tolist()
+        assert forecast.per_realm.tolist() == expected_per_realm.tolist()
+        assert forecast.total().sum() == expected_per_realm.sum()
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from realms_cli.gateway import GatewayError
+from realms_cli.scheduler import CallError, CallScheduler, MultiCallError, is_retryable
+
+
+class Gateway:
+    """Answers row n after `latency(n)` seconds, failing it with each of its queued errors first."""
+
+    def __init__(self, failures=None, latency=lambda row: 0.01):
+        self.failures = {row: list(errors) for row, errors in (failures or {}).items()}
+        self.latency = latency
+        self.attempts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, row):
+        with self.lock:
+            self.attempts[row] = self.attempts.get(row, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failures = self.failures.get(row)
+            error = failures.pop(0) if failures else None
+        try:
+            time.sleep(self.latency(row))
+            if error is not None:
+                raise error
+            return row * 10
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def scheduler(concurrency=4, retries=3):
+    return CallScheduler(concurrency, retries=retries, backoff=0.001, max_backoff=0.002)
+
+
+def test_results_in_input_order():
+    # later rows answer first
+    gateway = Gateway(latency=lambda row: (20 - row) * 0.002)
+    calls = scheduler()
+    assert calls.run(gateway, range(20)) == [row * 10 for row in range(20)]
+    assert calls.stats.completed == 20 and calls.stats.failed == 0 and calls.stats.retries == 0
+
+
+def test_concurrency_cap():
+    gateway = Gateway(latency=lambda row: 0.02)
+    calls = scheduler(concurrency=3)
+    calls.run(gateway, range(12))
+    assert gateway.max_in_flight == 3
+    assert calls.stats.max_in_flight == 3
+
+
+def test_retries_transient_failures():
+    gateway = Gateway({
+        1: [GatewayError(429, "Too Many Requests")],
+        2: [GatewayError(503, "unavailable"), requests.ConnectionError("reset")],
+    })
+    calls = scheduler()
+    assert calls.run(gateway, range(4)) == [0, 10, 20, 30]
+    assert gateway.attempts == {0: 1, 1: 2, 2: 3, 3: 1}
+    assert calls.stats.retries == 3
+
+
+def test_non_retryable_failure_is_kept_in_its_row():
+    error = GatewayError(500, "contract error")
+    gateway = Gateway({1: [error]})
+    results = scheduler().run(gateway, range(3), return_exceptions=True)
+    assert results[0] == 0 and results[2] == 20
+    assert isinstance(results[1], CallError)
+    assert (results[1].index, results[1].arguments, results[1].cause, results[1].attempts) == (1, 1, error, 1)
+    assert gateway.attempts[1] == 1
+
+
+def test_gives_up_after_retries():
+    gateway = Gateway({0: [GatewayError(502, "bad gateway")] * 5, 2: [GatewayError(500, "reverted")]})
+    calls = scheduler(retries=2)
+    with pytest.raises(MultiCallError) as raised:
+        calls.run(gateway, range(3))
+    errors = raised.value.errors
+    assert [(e.index, e.attempts) for e in errors] == [(0, 3), (2, 1)]
+    assert raised.value.results[1] == 10
+    assert gateway.attempts[0] == 3
+    assert calls.stats.retries == 2 and calls.stats.failed == 2
+
+
+def test_is_retryable():
+    assert is_retryable(GatewayError(429, ""))
+    assert is_retryable(requests.Timeout())
+    assert not is_retryable(GatewayError(500, ""))
+    assert not is_retryable(ValueError())
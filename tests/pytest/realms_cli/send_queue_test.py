@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from realms_cli import send_queue as send_queues
+from realms_cli.gateway import GatewayError
+from realms_cli.send_queue import SendQueue
+
+NETWORK = "goerli"
+
+
+class Account:
+    """nile Account whose send_calls records each transaction, failing the ones in `failures`."""
+
+    address = "0x0123"
+
+    def __init__(self, failures=()):
+        self.failures = set(failures)
+        self.transactions = []
+        self.last_nonce = None
+
+    def send_calls(self, calls):
+        index = len(self.transactions)
+        self.transactions.append(calls)
+        if index in self.failures:
+            raise GatewayError(500, "Account: nonce is invalid")
+        self.last_nonce = index
+        return (
+            "Invoke transaction was sent.\n"
+            f"Contract address: {self.address}\n"
+            f"Transaction hash: {hex(0xaa0 + index)}"
+        )
+
+
+@pytest.fixture
+def account(monkeypatch):
+    account = Account()
+    waited = []
+
+    def wait_for_txs(network, tx_hashes):
+        waited.append(tx_hashes)
+        return [{"tx_status": "REJECTED" if tx_hash == "0xaa1" else "ACCEPTED_ON_L2"} for tx_hash in tx_hashes]
+
+    monkeypatch.setattr(send_queues, "load_account", lambda signer_alias, network: account)
+    monkeypatch.setattr(send_queues, "wait_for_txs", wait_for_txs)
+    monkeypatch.setattr(send_queues.READ_CACHE, "invalidate", lambda network, contract_alias=None: None)
+    account.waited = waited
+    return account
+
+
+def eventually(predicate, timeout=5.0):
+    done = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        done.wait(0.01)
+    return predicate()
+
+
+def queue(**limits):
+    return SendQueue(NETWORK, "STARKNET_PRIVATE_KEY", **dict(dict(flush_interval=None), **limits))
+
+
+def test_splits_on_call_count(account):
+    sends = queue(max_calls=3)
+    handles = sends.add("proxy_lords", "approve", [[i, 1, 0] for i in range(7)])
+    assert [len(calls) for calls in account.transactions] == [3, 3]
+    assert sends.flush() == handles
+    assert [len(calls) for calls in account.transactions] == [3, 3, 1]
+    assert [h.tx_hash for h in handles] == ["0xaa0"] * 3 + ["0xaa1"] * 3 + ["0xaa2"]
+    assert account.transactions[0][1] == ("proxy_lords", "approve", [1, 1, 0])
+    assert account.waited == [["0xaa0", "0xaa1", "0xaa2"]]
+
+
+def test_splits_on_calldata_and_steps(account):
+    # each call costs its calldata plus the 4 felts of its call array entry
+    sends = queue(max_calldata=19, max_steps=100, step_costs={"mint": 10, "heavy": 60})
+    sends.add("realms", "mint", [1, 2, 3, 4, 5, 6])
+    sends.add("realms", "mint", [1, 2, 3, 4, 5, 6])
+    assert len(account.transactions) == 1
+    sends.add("realms", "heavy", [1])
+    sends.add("realms", "heavy", [2])
+    sends.flush()
+    assert [[call[1] for call in calls] for calls in account.transactions] == [
+        ["mint"], ["mint", "heavy"], ["heavy"]]
+
+
+def test_statuses(account):
+    sends = queue(max_calls=2)
+    handles = sends.add("realms", "mint", [[1], [2], [3]])
+    assert [h.status for h in handles] == [None] * 3
+    sends.flush()
+    assert [h.status for h in handles] == ["ACCEPTED_ON_L2", "ACCEPTED_ON_L2", "REJECTED"]
+    assert sends.flush() == []
+
+
+def test_timer_flush(account):
+    sends = queue(flush_interval=0.01)
+    [handle] = sends.add("realms", "mint", [1])
+    assert eventually(lambda: handle.tx_hash == "0xaa0")
+    assert sends.flush() == [handle]
+    assert len(account.transactions) == 1
+
+
+def test_send_failure_is_raised_by_flush(account):
+    account.failures = {0}
+    sends = queue(max_calls=2)
+    failed = sends.add("realms", "mint", [[1], [2]])
+    later = sends.add("realms", "mint", [[3]])
+    # the failure keeps its calls out of later transactions
+    assert len(account.transactions) == 1
+    with pytest.raises(GatewayError):
+        sends.flush()
+    assert all(isinstance(h.error, GatewayError) and h.tx_hash is None for h in failed)
+    assert later[0].error is None and later[0].status == "REJECTED"
+    assert account.transactions[1] == [("realms", "mint", [3])]
+    # reported once
+    assert sends.flush() == []
+
+
+def test_timer_failure_is_raised_by_flush(account):
+    account.failures = {0}
+    sends = queue(flush_interval=0.01)
+    [handle] = sends.add("realms", "mint", [1])
+    assert eventually(lambda: handle.error is not None)
+    assert isinstance(handle.error, GatewayError)
+    with pytest.raises(GatewayError):
+        sends.flush()
+
+
+def test_exit_with_error_drops_pending(account):
+    with pytest.raises(ValueError):
+        with queue(flush_interval=10) as sends:
+            sends.add("realms", "mint", [1])
+            raise ValueError
+    assert account.transactions == []
+    assert sends._timer is None
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from realms_cli import nonce as nonces
+from realms_cli import tx_tracker
+from realms_cli.gateway import GatewayError
+from realms_cli.nonce import NonceManager
+from realms_cli.tx_tracker import TIMEOUT_ENV, TxTimeout, TxTracker, wait_for_txs
+
+NETWORK = "goerli"
+
+
+class Gateway:
+    """Feeder gateway walking each transaction through its list of statuses, one per poll."""
+
+    def __init__(self, statuses):
+        self.statuses = {tx_hash: list(walk) for tx_hash, walk in statuses.items()}
+        self.polls = {}
+
+    def get_transaction_status(self, tx_hash):
+        self.polls[tx_hash] = self.polls.get(tx_hash, 0) + 1
+        walk = self.statuses[tx_hash]
+        status = walk.pop(0) if len(walk) > 1 else walk[0]
+        if isinstance(status, Exception):
+            raise status
+        return status if isinstance(status, dict) else {"tx_status": status}
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    gateway = Gateway({})
+    monkeypatch.setattr(tx_tracker, "get_gateway", lambda network: gateway)
+    monkeypatch.setattr(nonces, "_submitted", {})
+    return gateway
+
+
+def tracker(**intervals):
+    intervals = dict(dict(min_interval=0.001, max_interval=0.004, backoff=2.0), **intervals)
+    return TxTracker(NETWORK, **intervals)
+
+
+def wait(tx_hashes, callback=None, timeout=5, **intervals):
+    watcher = tracker(**intervals)
+    try:
+        return asyncio.run(watcher.wait(tx_hashes, callback=callback, timeout=timeout))
+    finally:
+        watcher.close()
+
+
+def test_status_transitions(gateway):
+    gateway.statuses.update({
+        "0xaa": ["NOT_RECEIVED", "RECEIVED", "PENDING", "ACCEPTED_ON_L2"],
+        "0xbb": ["RECEIVED", "RECEIVED", "RECEIVED", "REJECTED"],
+        "0xcc": ["ACCEPTED_ON_L1"],
+    })
+    transitions = []
+    statuses = wait(["0xaa", "0xbb", "0xcc"], lambda *change: transitions.append(change))
+    assert [status["tx_status"] for status in statuses] == ["ACCEPTED_ON_L2", "REJECTED", "ACCEPTED_ON_L1"]
+    assert [(previous, status["tx_status"]) for tx_hash, previous, status in transitions if tx_hash == "0xaa"] == [
+        (None, "NOT_RECEIVED"), ("NOT_RECEIVED", "RECEIVED"), ("RECEIVED", "PENDING"), ("PENDING", "ACCEPTED_ON_L2")]
+    assert [previous for tx_hash, previous, _ in transitions if tx_hash == "0xbb"] == [None, "RECEIVED"]
+    assert gateway.polls == {"0xaa": 4, "0xbb": 4, "0xcc": 1}
+
+
+def test_settles_nonces(gateway):
+    chain = Chain(4)
+    manager = NonceManager("0x0123", NETWORK, chain)
+    accepted, rejected = manager.reserve(), manager.reserve()
+    nonces.track("0xaa", manager, accepted)
+    nonces.track("0xbb", manager, rejected)
+    gateway.statuses.update({"0xaa": ["PENDING", "ACCEPTED_ON_L2"], "0xbb": ["RECEIVED", "REJECTED"]})
+    wait(["0xaa", "0xbb"])
+    assert manager._in_flight == set()
+    assert manager.reserve() == 4
+    assert chain.reads == 2
+
+
+def test_poll_errors_keep_the_status(gateway):
+    error = {"code": "StarknetErrorCode.UNDEFINED", "message": "overloaded"}
+    gateway.statuses["0xaa"] = ["RECEIVED", error, GatewayError(503, "unavailable"), "ACCEPTED_ON_L2"]
+    transitions = []
+    [status] = wait(["0xaa"], lambda *change: transitions.append(change))
+    assert status["tx_status"] == "ACCEPTED_ON_L2"
+    assert [(previous, status["tx_status"]) for _, previous, status in transitions] == [
+        (None, "RECEIVED"), ("RECEIVED", "ACCEPTED_ON_L2")]
+
+
+def test_failed_runner_fails_the_waiters(gateway):
+    gateway.statuses.update({"0xaa": ["RECEIVED"], "0xbb": ["RECEIVED"]})
+
+    def callback(tx_hash, previous, status):
+        raise RuntimeError("callback failed")
+
+    with pytest.raises(RuntimeError, match="callback failed"):
+        wait(["0xaa", "0xbb"], callback)
+
+
+def test_timeout(gateway):
+    gateway.statuses.update({"0xaa": ["ACCEPTED_ON_L2"], "0xbb": ["RECEIVED"]})
+    with pytest.raises(TxTimeout) as raised:
+        wait(["0xaa", "0xbb"], timeout=0.05)
+    assert raised.value.pending == ["0xbb"]
+
+
+def test_wait_for_txs_gives_up(gateway, monkeypatch):
+    gateway.statuses["0xaa"] = ["PENDING"]
+    monkeypatch.setenv(TIMEOUT_ENV, "0.05")
+    with pytest.raises(TxTimeout):
+        wait_for_txs(NETWORK, ["0xaa"], callback=None)
+    assert wait_for_txs(NETWORK, []) == []
+
+
+class Chain:
+    def __init__(self, nonce=0):
+        self.nonce = nonce
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return self.nonce
+
+
+def test_syncs_nonces_while_watching(gateway):
+    chain = Chain()
+    manager = NonceManager("0x0123", NETWORK, chain)
+    nonces.track("0xaa", manager, manager.reserve())
+    gateway.statuses["0xaa"] = ["RECEIVED"] * 20 + ["ACCEPTED_ON_L2"]
+    # the account was used elsewhere meanwhile
+    chain.nonce = 3
+    watcher = tracker(sync_interval=0.005)
+    try:
+        asyncio.run(watcher.wait(["0xaa"], timeout=5))
+    finally:
+        watcher.close()
+    assert chain.reads > 1
+    assert manager.reserve() == 3
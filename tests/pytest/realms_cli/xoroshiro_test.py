@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from realms_cli.realms_cli.combat_sim import build_squad, run_battles, unpack_squads
+from realms_cli.realms_cli.xoroshiro import M64, Xoroshiro, seed_state, step
+
+# next() of contracts/utils/xoroshiro128_starstar.cairo deployed with these seeds
+CONTRACT_VALUES = {
+    0x10AF: [5205697771054709048, 1083853704488966052, 2371717860414544350, 1672773639577242568,
+             12868336594088442790, 4522923403640259178],
+    921374095: [9559431628961193715, 13870607326612882273, 8135585247494760577, 12197734842603781913,
+                10138470860510624992, 16846400131636553563],
+    0: [16053376993090336093, 2294193908532683983, 15891568027386125368, 11254524714108626818,
+        12371507696096294308, 8273927655009324021],
+}
+
+# the reference jump() of xoroshiro128, 2**64 values ahead
+JUMP = [0xDF900294D8F554A5, 0x170865DF4B3201FC]
+
+
+def reference_jump(s0, s1):
+    t0 = t1 = 0
+    for word in JUMP:
+        for bit in range(64):
+            if word >> bit & 1:
+                t0, t1 = t0 ^ s0, t1 ^ s1
+            s0, s1 = step(s0, s1)
+    return t0, t1
+
+
+def reference_output(s0):
+    """rotl(s0 * 5, 7) * 9 truncated like in C."""
+    x = (s0 * 5) & M64
+    return ((((x << 7) | (x >> 57)) & M64) * 9) & M64
+
+
+@pytest.mark.parametrize("seed", sorted(CONTRACT_VALUES))
+def test_matches_contract(seed):
+    values = CONTRACT_VALUES[seed]
+    rng = Xoroshiro(seed)
+    assert [rng.next() for _ in values] == values
+    assert Xoroshiro(seed).random_raw(len(values)).tolist() == values
+    # seeds are taken mod 2**64, like and64 in splitmix64
+    assert Xoroshiro(seed + 2**64).next() == values[0]
+
+
+def test_carry_differs_from_reference_output():
+    rng, states = Xoroshiro(0x10AF), []
+    for _ in range(200):
+        states.append(rng.state[0])
+        rng.next()
+    assert any(Xoroshiro(state=(s0, 0)).next() != reference_output(s0) for s0 in states)
+    assert all(Xoroshiro(state=(s0, 0)).next() == reference_output(s0) for s0 in states if s0 * 5 <= M64)
+
+
+@pytest.mark.parametrize("count", [0, 1, 4095, 4096, 5000, 100003])
+def test_batches_continue_the_stream(count):
+    batched, single = Xoroshiro(7), Xoroshiro(7)
+    values = batched.random_raw(count)
+    assert values.dtype == np.uint64
+    assert values.tolist() == [single.next() for _ in range(count)]
+    assert batched.state == single.state
+    assert batched.random_raw((2, 3)).ravel().tolist() == [single.next() for _ in range(6)]
+
+
+def test_jump():
+    jumped, stepped = Xoroshiro(9), Xoroshiro(9)
+    jumped.jump(1000)
+    stepped.random_raw(1000)
+    assert jumped.state == stepped.state
+    assert Xoroshiro(9).jumped().state == reference_jump(*seed_state(9))
+    assert Xoroshiro(9).jump(0).state == seed_state(9)
+    with pytest.raises(ValueError):
+        Xoroshiro(9).jump(-1)
+
+
+def test_source_of_the_combat_simulator():
+    squad = unpack_squads(build_squad([4] * 9 + [5] * 5 + [6]))
+    source = Xoroshiro(0x10AF)
+    battles = run_battles(squad, squad, source)
+    # a single battle takes one value per attack, like the contract
+    assert source.state == Xoroshiro(0x10AF).jump(battles.steps[0]).state
+    rolls = Xoroshiro(0x10AF).rolls(battles.steps[0])
+    assert rolls.tolist() == [value % 12 + 1 for value in CONTRACT_VALUES[0x10AF]] + rolls[6:].tolist()
+    assert 1 <= rolls.min() and rolls.max() <= 12
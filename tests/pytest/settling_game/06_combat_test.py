@@ -1,9 +1,12 @@
 import math
-import struct
 
 import pytest
 from starkware.starkware_utils.error_handling import StarkException
 
+from realms_cli.realms_cli.bitfield import SQUAD, TROOP
+from realms_cli.realms_cli.combat_sim import run_battles, unpack_squads
+from realms_cli.realms_cli.xoroshiro import Xoroshiro
+
 from .game_structs import Troop, Squad, BuildingId, ResourceIds, TroopId, TroopType, TROOP_COSTS
 
 EMPTY_TROOP = Troop(0, 0, 0, 0, 0, 0, 0, 0, 0)
@@ -55,30 +58,11 @@ def build_empty_squad() -> Squad:
 
 
 def pack_squad(squad: Squad) -> int:
-    shift = 0x100
-    packed = (
-        pack_troop(squad.t1_1)
-        + pack_troop(squad.t1_2) * shift**2
-        + pack_troop(squad.t1_3) * shift**4
-        + pack_troop(squad.t1_4) * shift**6
-        + pack_troop(squad.t1_5) * shift**8
-        + pack_troop(squad.t1_6) * shift**10
-        + pack_troop(squad.t1_7) * shift**12
-        + pack_troop(squad.t1_8) * shift**14
-        + pack_troop(squad.t1_9) * shift**16
-        + pack_troop(squad.t2_1) * shift**18
-        + pack_troop(squad.t2_2) * shift**20
-        + pack_troop(squad.t2_3) * shift**22
-        + pack_troop(squad.t2_4) * shift**24
-        + pack_troop(squad.t2_5) * shift**26
-        + pack_troop(squad.t3_1) * shift**28
-    )
-
-    return packed
+    return SQUAD.pack(squad)
 
 
 def pack_troop(troop: Troop) -> int:
-    return int.from_bytes(struct.pack("<2b", *[troop.id, troop.vitality]), "little")
+    return TROOP.pack(troop)
 
 
 def assert_equal_troops(trooplike1, trooplike2):
@@ -110,6 +94,33 @@ async def test_run_combat_loop(l06_combat_tests):
     assert res.outcome == 1  # attacker wins, most likely outcome since defender is weak
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seed", [0x10AF, 2022])
+async def test_run_combat_loop_matches_simulator(starknet, compiled_l06_combat_tests, compiled_xoroshiro, seed):
+    # own contracts, set_xoroshiro on the module's l06_combat_tests would leak into the other tests
+    combat = await starknet.deploy(contract_class=compiled_l06_combat_tests, constructor_calldata=[])
+    xoroshiro = await starknet.deploy(contract_class=compiled_xoroshiro, constructor_calldata=[seed])
+    await combat.set_xoroshiro(xoroshiro.contract_address).invoke()
+    attacker = build_default_squad()
+    defender = build_partial_squad(7)
+
+    tx = await combat.test_run_combat_loop(attacker, defender).invoke()
+
+    battles = run_battles(unpack_squads(pack_squad(attacker)), unpack_squads(pack_squad(defender)), Xoroshiro(seed))
+    assert battles.outcome.tolist() == [tx.result.outcome]
+    assert battles.packed() == ([pack_squad(tx.result.attacker)], [pack_squad(tx.result.defender)])
+
+
+@pytest.mark.asyncio
+async def test_xoroshiro_matches_contract(starknet, compiled_xoroshiro):
+    # not the shared xoroshiro fixture, other tests advance it
+    seed = 0x10AF
+    xoroshiro = await starknet.deploy(contract_class=compiled_xoroshiro, constructor_calldata=[seed])
+    rng = Xoroshiro(seed)
+    for _ in range(20):
+        assert (await xoroshiro.next().invoke()).result.rnd == rng.next()
+
+
 @pytest.mark.asyncio
 async def test_attack(l06_combat_tests):
     a = build_default_squad()
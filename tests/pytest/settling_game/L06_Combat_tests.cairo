@@ -8,6 +8,7 @@ from contracts.settling_game.L06_Combat import (
     attack,
     load_troop_costs,
     set_troop_cost,
+    set_xoroshiro,
 )
 from contracts.settling_game.utils.game_structs import Troop, Squad, Cost
 